@@ -0,0 +1,55 @@
+"""Benchmark of verification of stubs one after another (HTTPHelper) vs concurrently (AsyncHTTPHelper).
+
+Run: python -m benchmarks.bench_async_verification
+"""
+import asyncio
+import time
+
+from helpers.api.async_wiremock_api import AsyncWiremockApi
+from helpers.async_http_helper import AsyncHTTPHelper
+from helpers.http_helper import HTTPHelper
+from helpers.stub_server import StubServer
+
+COUNT = 2000
+DELAY = 5  # Milliseconds of every stub response, as of a remote WireMock
+
+
+def mappings():
+    return [
+        {
+            "request": {"method": "GET", "urlPath": f"/verify/{i}"},
+            "response": {"body": str(i), "fixedDelayMilliseconds": DELAY},
+        }
+        for i in range(COUNT)
+    ]
+
+
+def verify_sync(host: str, port: int) -> list:
+    with HTTPHelper(host=host, protocol=HTTPHelper.HTTP, port=port) as http:
+        return [http.get(f"/verify/{i}") for i in range(COUNT)]
+
+
+async def verify_async(host: str, port: int) -> list:
+    async with AsyncHTTPHelper(host=host, protocol=HTTPHelper.HTTP, port=port) as http:
+        return await http.gather(http.get(f"/verify/{i}") for i in range(COUNT))
+
+
+async def create(host: str, port: int):
+    async with AsyncWiremockApi(host=host, port=port) as api:
+        await api.post_mappings(mappings())
+
+
+if __name__ == "__main__":
+    with StubServer() as server:
+        asyncio.run(create(server.host, server.port))
+        start = time.perf_counter()
+        sync_bodies = verify_sync(server.host, server.port)
+        sync_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        async_bodies = asyncio.run(verify_async(server.host, server.port))
+        async_elapsed = time.perf_counter() - start
+    assert async_bodies == sync_bodies
+    print(
+        f"{COUNT} stubs: sync={sync_elapsed:.2f} s  async={async_elapsed:.2f} s  "
+        f"speedup=x{sync_elapsed / async_elapsed:.2f}"
+    )
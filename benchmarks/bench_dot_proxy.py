@@ -0,0 +1,72 @@
+"""Micro-benchmark of DotProxy path access: compiled cached paths vs split + reduce on every access.
+
+Run: python -m benchmarks.bench_dot_proxy
+"""
+import timeit
+from functools import reduce
+
+from helpers.dot_proxy import DotProxy, SequenceTypes
+
+
+class LegacyDotProxy(DotProxy):
+    """Getter as it was before path compilation: split + reduce + recursive fan-out on every access."""
+
+    def __getitem__(self, k):
+        return reduce(self._legacy_get_item, k.split(self._delimiter), self._data)
+
+    def _legacy_get_item(self, data, key):
+        if isinstance(data, dict):
+            return data[key]
+        elif key == "[]":
+            if not isinstance(data, SequenceTypes):
+                raise KeyError("Can't get list")
+            return data
+        elif isinstance(data, SequenceTypes):
+            result_data = []
+            for d in data:
+                try:
+                    result = self._legacy_get_item(d, key)
+                except KeyError:
+                    if self._strict:
+                        raise
+                    continue
+                if isinstance(result, list):
+                    result_data.extend(result)
+                else:
+                    result_data.append(result)
+            return result_data
+        raise KeyError(f"Can't get {key=} from value with type={type(data)}")
+
+
+def deep_document(depth=50):
+    data = value = {}
+    for _ in range(depth):
+        value["k"] = {}
+        value = value["k"]
+    value["leaf"] = 1
+    return data, ".".join(["k"] * depth + ["leaf"])
+
+
+def wide_document(width=10_000):
+    return {"d": [{"e": {"f": i}} for i in range(width)]}, "d.[].e.f"
+
+
+def bench(name, data, path, number):
+    results = {}
+    for proxy_cls in (LegacyDotProxy, DotProxy):
+        proxy = proxy_cls(data)
+        assert proxy[path] == LegacyDotProxy(data)[path]
+        results[proxy_cls.__name__] = min(
+            timeit.repeat(lambda: proxy[path], number=number, repeat=5)
+        )
+    legacy, compiled = results["LegacyDotProxy"], results["DotProxy"]
+    print(
+        f"{name:<6} legacy={legacy / number * 1e6:10.2f} us  compiled={compiled / number * 1e6:10.2f} us  "
+        f"speedup=x{legacy / compiled:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    bench("deep", *deep_document(), number=20_000)
+    bench("wide", *wide_document(), number=100)
+    bench("small", {"a": {"b": 1}}, "a.b", number=200_000)
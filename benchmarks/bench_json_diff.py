@@ -0,0 +1,44 @@
+"""Benchmark of comparison of large responses with one changed value: assertpy is_equal_to() vs assert_json_equal().
+
+Run: python -m benchmarks.bench_json_diff
+"""
+import copy
+import time
+
+from assertpy import assert_that
+
+from helpers.json_diff import assert_json_equal
+
+COUNT = 100_000  # Items of ~10 nodes each
+
+
+def document():
+    return {
+        "items": [
+            {"id": i, "name": f"item {i}", "tags": ["a", "b"], "attrs": {"x": i}}
+            for i in range(COUNT)
+        ]
+    }
+
+
+def compare(name, check):
+    start = time.perf_counter()
+    try:
+        check()
+    except AssertionError as e:
+        message = str(e)
+    print(f"{name}: {time.perf_counter() - start:.2f} s, message {len(message)} chars")
+
+
+if __name__ == "__main__":
+    expected = document()
+    actual = copy.deepcopy(expected)
+    actual["items"][COUNT // 2]["attrs"]["x"] = -1
+    compare("assertpy", lambda: assert_that(actual).is_equal_to(expected))
+    compare("assert_json_equal", lambda: assert_json_equal(actual, expected))
+
+    actual["items"].reverse()
+    compare(
+        "assert_json_equal, unordered",
+        lambda: assert_json_equal(actual, expected, unordered_paths=["items"]),
+    )
@@ -0,0 +1,104 @@
+"""Peak RSS and sanitizing time of a request with header sanitizers: legacy deepcopy(response) vs copy-on-write.
+
+Every mode is measured in a separate process against a local server which returns a 100 MB body.
+Note: CPython shares immutable `bytes` on deepcopy, so legacy mode mostly pays CPU for copying
+the response object graph rather than for a second copy of the body.
+Run: python -m benchmarks.bench_sanitize_memory [--size-mb 100]
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import threading
+import timeit
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from helpers.http_helper import HTTPHelper
+
+SENSITIVE_HEADERS = ["Authorization", "Cookie"]
+MODES = ["legacy", "copy_on_write"]
+
+
+def start_server(size: int) -> ThreadingHTTPServer:
+    body = b"x" * size
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_sanitize(http: HTTPHelper, response):
+    response_copy = deepcopy(response)
+    response_copy.request.headers.update(
+        http._sanitize_data_by_keys(dict(response.request.headers), SENSITIVE_HEADERS)
+    )
+
+
+def copy_on_write_sanitize(http: HTTPHelper, response):
+    http._sanitize_data_by_keys(
+        dict(response.request.headers), SENSITIVE_HEADERS, copy_on_write=True
+    )
+
+
+def run(mode: str, size: int, number: int = 1000):
+    server = start_server(size)
+    headers = {"Authorization": "Bearer secret", "Cookie": "session=secret"}
+    with HTTPHelper(
+        host="127.0.0.1",
+        protocol=HTTPHelper.HTTP,
+        port=server.server_port,
+        headers=headers,
+        header_sanitizers=SENSITIVE_HEADERS,
+    ) as http:
+        baseline = peak_rss_mb()
+        response = http.session.get(f"{http.base_url}/file", headers=headers)
+        sanitize = legacy_sanitize if mode == "legacy" else copy_on_write_sanitize
+        sanitize(http, response)
+        assert len(http._parse(response)) == size
+        elapsed = timeit.timeit(lambda: sanitize(http, response), number=number)
+    server.shutdown()
+    print(
+        f"{mode:<14} peak RSS: {peak_rss_mb():8.1f} MB (before request: {baseline:.1f} MB), "
+        f"sanitizing: {elapsed / number * 1e6:.1f} us per request"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--mode", choices=MODES)
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+    if args.mode:
+        run(args.mode, size)
+    else:
+        for mode in MODES:
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--mode",
+                    mode,
+                    "--size-mb",
+                    str(args.size_mb),
+                ],
+                check=True,
+            )
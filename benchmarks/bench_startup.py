@@ -0,0 +1,141 @@
+"""Startup benchmark: import time of helpers modules (`python -X importtime`) and pytest collection time.
+
+Run:
+    python -m benchmarks.bench_startup --output startup.json
+Compared with the previous run:
+    python -m benchmarks.bench_startup --output new.json --baseline startup.json
+Exit code is 1 if there are regressions against the baseline: a module got slower by more than
+`--tolerance` (relative) or started to import a heavy dependency.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+MODULES = (
+    "helpers",
+    "helpers.dot_proxy",
+    "helpers.json_diff",
+    "helpers.request_matcher",
+    "helpers.mocker",
+    "helpers.mapping_analyzer",
+    "helpers.response_template",
+    "helpers.postman_importer",
+    "helpers.api.wiremock_api",
+    "helpers.stub_server",
+)
+# Dependencies which are worth loading only if they're used
+HEAVY_MODULES = ("pydantic", "requests", "urllib3", "asyncio")
+COLLECTED_PATHS = ("tests", "tests/test_dot_proxy.py")
+MIN_DIFFERENCE = 0.005  # Seconds, smaller changes are noise of process start
+
+
+def import_time(module: str) -> Tuple[float, List[str]]:
+    """Cumulative import time of the module (seconds) and heavy modules it loads, in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines: "import time: <self us> | <cumulative us> | <indented name>"
+    lines = [
+        line.split("|")
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "cumulative" not in line
+    ]
+    names = {name.strip() for _, _, name in lines}
+    cumulative = next(
+        int(us) for _, us, name in reversed(lines) if name.strip() == module
+    )
+    return cumulative / 1e6, [name for name in HEAVY_MODULES if name in names]
+
+
+def collection_time(path: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pytest",
+            "--collect-only",
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            path,
+        ],
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def run(repeat: int) -> dict:
+    """Median of `repeat` runs, every run in a new process, so nothing is imported yet."""
+    imports = {}
+    for module in MODULES:
+        times, heavy = [], []
+        for _ in range(repeat):
+            seconds, heavy = import_time(module)
+            times.append(seconds)
+        imports[module] = {"seconds": statistics.median(times), "heavy": heavy}
+    collection = {
+        path: statistics.median(collection_time(path) for _ in range(repeat))
+        for path in COLLECTED_PATHS
+    }
+    return {"imports": imports, "collection": collection}
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2) -> List[str]:
+    """Regressions of `current` run against `baseline` (run() result), empty list if there are none."""
+    regressions = []
+
+    def slower(name: str, before: float, after: float):
+        if after > before * (1 + tolerance) and after - before > MIN_DIFFERENCE:
+            regressions.append(f"{name}: {before * 1000:.1f} -> {after * 1000:.1f} ms")
+
+    for module, result in current["imports"].items():
+        baseline_result = baseline["imports"].get(module)
+        if not baseline_result:
+            continue
+        slower(f"import {module}", baseline_result["seconds"], result["seconds"])
+        added = set(result["heavy"]) - set(baseline_result["heavy"])
+        if added:
+            regressions.append(f"import {module}: loads {sorted(added)}")
+    for path, seconds in current["collection"].items():
+        if path in baseline["collection"]:
+            slower(f"collection of {path}", baseline["collection"][path], seconds)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Path to JSON report")
+    parser.add_argument("--baseline", help="Path to JSON report of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = run(args.repeat)
+    for module, result in report["imports"].items():
+        heavy = f" (loads {', '.join(result['heavy'])})" if result["heavy"] else ""
+        print(f"import {module:<30}{result['seconds'] * 1000:8.1f} ms{heavy}")
+    for path, seconds in report["collection"].items():
+        print(f"collect {path:<29}{seconds * 1000:8.1f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Load run against stubs of the test cases: throughput and latency percentiles as JSON.
+
+Run against embedded stub server:
+    python -m benchmarks.load_stubs --duration 10 --concurrency 20 --output load.json
+Against WireMock from docker-compose.yml, with a target rate, compared with the previous run:
+    python -m benchmarks.load_stubs --port 8080 --rate 500 --output new.json --baseline load.json
+Exit code is 1 if there are regressions against the baseline, 2 if stubs of the cases can't be created.
+"""
+import argparse
+import json
+import logging
+import sys
+from contextlib import ExitStack
+
+from helpers.http_helper import HTTPHelper
+from helpers.load_runner import LoadRequest, LoadRunner, compare_reports
+from helpers.mocker import Mocker
+from helpers.stub_server import StubServer
+from tests.test_stubbing import (
+    RequestMatchingCases,
+    ResponseTemplatingCases,
+    StubbingCases,
+)
+
+
+def cases(*case_classes):
+    """(mapping, check_request, expected_response) of every case of pytest-cases classes."""
+    for case_class in case_classes:
+        instance = case_class()
+        for name in dir(case_class):
+            if name.startswith("case_"):
+                yield getattr(instance, name)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument(
+        "--port", type=int, help="WireMock port, embedded stub server if not set"
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, help="Target rate, req/s")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds")
+    parser.add_argument("--output", help="Path to JSON report")
+    parser.add_argument("--baseline", help="Path to JSON report of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    with ExitStack() as stack:
+        if args.port:
+            host, port = args.host, args.port
+            case_classes = (
+                StubbingCases,
+                RequestMatchingCases,
+                ResponseTemplatingCases,
+            )
+        else:
+            server = stack.enter_context(StubServer())
+            host, port = server.host, server.port
+            # Embedded stub server doesn't support response templating
+            case_classes = (StubbingCases, RequestMatchingCases)
+
+        mix = list(cases(*case_classes))
+        mocker = Mocker(host=host, port=port)
+        stack.callback(mocker.close)
+        result = mocker.create_mappings(mapping for mapping, _, _ in mix)
+        if not result.ok:
+            # Load of missing stubs would measure 404 responses
+            for _, names, error in result.failures:
+                print(f"IMPORT FAILED {names}: {error}", file=sys.stderr)
+            sys.exit(2)
+
+        http = stack.enter_context(
+            HTTPHelper(
+                host=host,
+                protocol=HTTPHelper.HTTP,
+                port=port,
+                pool_maxsize=args.concurrency,
+            )
+        )
+        runner = LoadRunner(
+            http,
+            [
+                LoadRequest(check_request, expected=expected_response)
+                for _, check_request, expected_response in mix
+            ],
+            concurrency=args.concurrency,
+            rate=args.rate,
+        )
+        report = runner.run(duration=args.duration)
+
+    print(json.dumps(report.as_dict(), indent=2))
+    if args.output:
+        report.export_json(args.output)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(
+                json.load(f), report.as_dict(), tolerance=args.tolerance
+            )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Helpers for tests with WireMock stubs.
+
+Public names are imported on first access (PEP 562), so `import helpers` doesn't load
+pydantic, requests or asyncio, and `from helpers import Mocker` loads only what Mocker needs.
+"""
+
+import importlib
+
+# Public name -> module which defines it. Names of submodules (ex: json_diff) aren't exported,
+# because an imported submodule replaces the attribute of the package
+_EXPORTS = {
+    "Mocker": "helpers.mocker",
+    "Mapping": "helpers.mocker",
+    "Request": "helpers.mocker",
+    "Response": "helpers.mocker",
+    "MappingFactory": "helpers.mocker",
+    "HTTPHelper": "helpers.http_helper",
+    "AsyncHTTPHelper": "helpers.async_http_helper",
+    "ShardedHTTPHelper": "helpers.sharded_http_helper",
+    "WiremockApi": "helpers.api.wiremock_api",
+    "AsyncWiremockApi": "helpers.api.async_wiremock_api",
+    "ShardedWiremockApi": "helpers.api.sharded_wiremock_api",
+    "StubServer": "helpers.stub_server",
+    "DotProxy": "helpers.dot_proxy",
+    "IncomingRequest": "helpers.request_matcher",
+    "MappingAnalyzer": "helpers.mapping_analyzer",
+    "LatencyAggregator": "helpers.http_timing",
+    "LoadRunner": "helpers.load_runner",
+    "assert_json_equal": "helpers.json_diff",
+    "render_mapping": "helpers.response_template",
+    "load_postman_cases": "helpers.postman_importer",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value  # Next accesses don't call __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
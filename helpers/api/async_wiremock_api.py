@@ -0,0 +1,60 @@
+import logging
+from typing import Iterable, List
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.async_http_helper import AsyncHTTPHelper
+
+log = logging.getLogger(__name__)
+
+
+class AsyncWiremockApi:
+    DEFAULT_PORT = WiremockApi.DEFAULT_PORT
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: str = DEFAULT_PORT,
+        concurrency: int = AsyncHTTPHelper.DEFAULT_CONCURRENCY,
+    ):
+        self._http = AsyncHTTPHelper(
+            host=host,
+            protocol=AsyncHTTPHelper.HTTP,
+            port=port or self.DEFAULT_PORT,
+            concurrency=concurrency,
+        )
+
+    def close(self):
+        self._http.close()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def get_mappings(self):
+        return await self._http.get(url="/__admin/mappings")
+
+    async def get_mapping(self, id: str):
+        return await self._http.get(url=f"/__admin/mappings/{id}")
+
+    async def put_mapping(self, id: str, content: dict):
+        return (await self._http.put(url=f"/__admin/mappings/{id}", json=content))["id"]
+
+    async def post_mapping(self, content: dict):
+        return (await self._http.post(url="/__admin/mappings", json=content))["id"]
+
+    async def post_mappings(self, contents: Iterable[dict]) -> List[str]:
+        """Create mappings concurrently, IDs are returned in the same order as `contents`."""
+        return await self._http.gather(
+            self.post_mapping(content) for content in contents
+        )
+
+    async def delete_mapping(self, id: str):
+        return await self._http.delete(url=f"/__admin/mappings/{id}")
+
+    async def delete_all_mappings(self):
+        return await self._http.delete(url="/__admin/mappings")
@@ -0,0 +1,195 @@
+import json
+import logging
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from requests import HTTPError
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.hash_ring import HashRing, shard_key
+from helpers.request_matcher import ANY_METHOD
+from helpers.sharded_http_helper import ShardedHTTPHelper, parse_endpoint
+
+log = logging.getLogger(__name__)
+
+
+class ShardedWiremockApi:
+    """WiremockApi over several WireMock instances: every mapping is stored on one shard.
+
+    The shard is chosen by consistent hashing of the mapping method and url path (see ShardedHTTPHelper
+    to send check requests to the same shard). Mappings which can't be routed by a concrete path -
+    url regex or ANY method - are replicated to all shards. Admin operations over all shards
+    are fanned out in parallel and their results are merged.
+
+    >>> api = ShardedWiremockApi(["localhost:8080", "localhost:8081", "localhost:8082"])
+    >>> api.post_mapping(mapping.model_dump())
+    >>> http = api.http_helper(protocol=HTTPHelper.HTTP)
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[str],
+        replicas: int = HashRing.DEFAULT_REPLICAS,
+        **kwargs,
+    ):
+        """
+        :param endpoints: "host:port" of WireMock instances
+        :param kwargs: WiremockApi arguments for every shard, ex: cache_ttl
+        """
+        self.endpoints = list(endpoints)
+        self.replicas = replicas
+        self.ring = HashRing(self.endpoints, replicas=replicas)
+        self.shards: Dict[str, WiremockApi] = {}
+        for endpoint in self.endpoints:
+            host, port = parse_endpoint(endpoint)
+            self.shards[endpoint] = WiremockApi(host=host, port=port, **kwargs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.endpoints), thread_name_prefix="wiremock-shard"
+        )
+
+    def http_helper(self, **kwargs) -> ShardedHTTPHelper:
+        """HTTP helper which routes requests to the shards with their stubs."""
+        return ShardedHTTPHelper(self.endpoints, replicas=self.replicas, **kwargs)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for api in self.shards.values():
+            api.close()
+
+    def shards_for(self, content: dict) -> List[str]:
+        """Endpoints which should store the mapping."""
+        request = content.get("request") or {}
+        method = request.get("method") or ANY_METHOD
+        url = request.get("urlPath") or request.get("url")
+        if method == ANY_METHOD or url is None:
+            return self.endpoints
+        return [self.ring.node(shard_key(method, url))]
+
+    def _fan_out(
+        self, call: Callable[[WiremockApi], object], endpoints: Iterable[str] = None
+    ) -> Dict[str, object]:
+        """Call `call(api)` for shards in parallel: {endpoint: result}."""
+        endpoints = list(self.endpoints if endpoints is None else endpoints)
+        if len(endpoints) == 1:
+            return {endpoints[0]: call(self.shards[endpoints[0]])}
+        futures = {
+            endpoint: self._executor.submit(call, self.shards[endpoint])
+            for endpoint in endpoints
+        }
+        return {endpoint: future.result() for endpoint, future in futures.items()}
+
+    def get_mappings(self, cached: bool = True):
+        mappings = {}
+        for response in self._fan_out(lambda api: api.get_mappings(cached)).values():
+            for mapping in response["mappings"]:
+                # Replicated mappings have the same ID on every shard
+                mappings.setdefault(mapping["id"], mapping)
+        return {"mappings": list(mappings.values()), "meta": {"total": len(mappings)}}
+
+    def get_mapping(self, id: str):
+        for mapping in self._fan_out(lambda api: self._get_if_exists(api, id)).values():
+            if mapping:
+                return mapping
+        raise HTTPError(f"404 Mapping {id} isn't found on any shard")
+
+    def post_mapping(self, content: dict):
+        # Replicas of the mapping should have the same ID
+        content = {**content, "id": content.get("id") or str(uuid.uuid4())}
+        self._fan_out(lambda api: api.post_mapping(content), self.shards_for(content))
+        return content["id"]
+
+    def put_mapping(self, id: str, content: dict):
+        """Update the mapping on the shards which hold it.
+
+        Changed request can move the mapping to other shards: WireMock doesn't create mappings by PUT,
+        so it's created on the new owners and deleted from the shards which no longer own it.
+        """
+        holders = {
+            endpoint
+            for endpoint, mapping in self._fan_out(
+                lambda api: self._get_if_exists(api, id)
+            ).items()
+            if mapping
+        }
+        if not holders:
+            raise HTTPError(f"404 Mapping {id} isn't found on any shard")
+        targets = self.shards_for(content)
+        target_shards = {self.shards[endpoint] for endpoint in targets}
+        holder_shards = {self.shards[endpoint] for endpoint in holders}
+        content = {**content, "id": id}
+
+        def update(api: WiremockApi):
+            if api not in target_shards:
+                return self._delete_if_exists(api, id)
+            if api in holder_shards:
+                return api.put_mapping(id, content)
+            return api.post_mapping(content)
+
+        self._fan_out(update, holders | set(targets))
+        return id
+
+    def import_mappings(self, mappings: list, **kwargs):
+        """Import mappings on every shard in one request per shard. Set `id` in every mapping in advance."""
+        by_shard: Dict[WiremockApi, list] = defaultdict(list)
+        for mapping in mappings:
+            # Serialized mappings (see MappingFactory) are decoded only for routing
+            content = json.loads(mapping) if isinstance(mapping, bytes) else mapping
+            for endpoint in self.shards_for(content):
+                by_shard[self.shards[endpoint]].append(mapping)
+        self._fan_out(
+            lambda api: api.import_mappings(by_shard[api], **kwargs),
+            [e for e in self.endpoints if self.shards[e] in by_shard],
+        )
+
+    def delete_mapping(self, id: str):
+        deleted = self._fan_out(lambda api: self._delete_if_exists(api, id))
+        if not any(deleted.values()):
+            raise HTTPError(f"404 Mapping {id} isn't found on any shard")
+
+    def remove_mappings_by_metadata(self, pattern: dict):
+        self._fan_out(lambda api: api.remove_mappings_by_metadata(pattern))
+
+    def delete_all_mappings(self):
+        self._fan_out(lambda api: api.delete_all_mappings())
+
+    def count_requests(self, request_pattern: dict) -> int:
+        return sum(
+            self._fan_out(lambda api: api.count_requests(request_pattern)).values()
+        )
+
+    def find_requests(self, request_pattern: dict) -> List[dict]:
+        """Matching journal requests of all shards, the oldest first."""
+        requests = []
+        for shard_requests in self._fan_out(
+            lambda api: list(api.find_requests(request_pattern))
+        ).values():
+            requests.extend(shard_requests)
+        return sorted(requests, key=lambda request: request.get("loggedDate", 0))
+
+    def delete_all_requests(self):
+        self._fan_out(lambda api: api.delete_all_requests())
+
+    @staticmethod
+    def _get_if_exists(api: WiremockApi, id: str) -> Optional[dict]:
+        try:
+            return api.get_mapping(id)
+        except HTTPError as e:
+            if not _is_not_found(e):
+                raise
+            return None
+
+    @staticmethod
+    def _delete_if_exists(api: WiremockApi, id: str) -> bool:
+        try:
+            api.delete_mapping(id)
+        except HTTPError as e:
+            if not _is_not_found(e):
+                raise
+            return False
+        return True
+
+
+def _is_not_found(error: HTTPError) -> bool:
+    return error.response is not None and error.response.status_code == 404
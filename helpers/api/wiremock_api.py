@@ -1,36 +1,313 @@
+import json
 import logging
-import os
-import sys
-
-sys.path.append(f"{os.path.dirname(os.path.abspath(__file__))}/../..")
+import threading
+import time
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 from helpers.http_helper import HTTPHelper
+from helpers.request_journal import format_logged_date
 
 log = logging.getLogger(__name__)
 
 
+class CacheStats:
+    """`hits` - admin read was served from the cache, `misses` - it was sent to the server."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+class MappingsCache:
+    """Read-through cache of mappings with index by ID, entries expire after `ttl` seconds.
+
+    Cached data is shared between callers, it shouldn't be modified.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._mappings: Optional[Tuple[float, dict]] = None  # (expires at, response)
+        self._by_id: Dict[str, Tuple[float, dict]] = {}
+        self._generation = 0  # Incremented on every invalidation
+
+    def get_all(self, load) -> dict:
+        with self._lock:
+            if self._mappings and self._mappings[0] > time.monotonic():
+                self.stats.hits += 1
+                return self._mappings[1]
+            self.stats.misses += 1
+            generation = self._generation
+        response = load()
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            # Response which was loaded before invalidation can be stale
+            if generation == self._generation:
+                self._mappings = (expires_at, response)
+                # Full list refreshes the index: mappings absent in it are deleted
+                self._by_id = {
+                    mapping["id"]: (expires_at, mapping)
+                    for mapping in response["mappings"]
+                }
+        return response
+
+    def get(self, id: str, load) -> dict:
+        with self._lock:
+            entry = self._by_id.get(id)
+            if entry and entry[0] > time.monotonic():
+                self.stats.hits += 1
+                return entry[1]
+            self.stats.misses += 1
+            generation = self._generation
+        mapping = load()
+        with self._lock:
+            if generation == self._generation:
+                self._by_id[id] = (time.monotonic() + self.ttl, mapping)
+        return mapping
+
+    def invalidate(self, *ids: str):
+        """Drop the list of mappings and mappings with `ids`."""
+        with self._lock:
+            self._generation += 1
+            self.stats.invalidations += 1
+            self._mappings = None
+            for id in ids:
+                self._by_id.pop(id, None)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._generation += 1
+            self.stats.invalidations += 1
+            self._mappings = None
+            self._by_id.clear()
+
+
 class WiremockApi:
     DEFAULT_PORT = 8080
 
-    def __init__(self, host: str = "localhost", port: str = DEFAULT_PORT):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: str = DEFAULT_PORT,
+        cache_ttl: float = None,
+    ):
+        """
+        :param cache_ttl: if set, get_mappings() and get_mapping() are cached for this number of seconds.
+            Changes made by this client invalidate the cache, changes of other clients are seen after TTL.
+        """
         self._http = HTTPHelper(
             host=host, protocol=HTTPHelper.HTTP, port=port or self.DEFAULT_PORT
         )
+        self._cache = MappingsCache(cache_ttl) if cache_ttl is not None else None
+
+    @property
+    def http(self) -> HTTPHelper:
+        return self._http
+
+    @property
+    def cache_stats(self) -> Optional[CacheStats]:
+        return self._cache.stats if self._cache else None
+
+    def close(self):
+        self._http.close()
 
-    def get_mappings(self):
+    def _invalidate(self, *ids: str):
+        if self._cache:
+            self._cache.invalidate(*ids)
+
+    def _invalidate_all(self):
+        if self._cache:
+            self._cache.invalidate_all()
+
+    def get_mappings(self, cached: bool = True):
+        """All mappings, `cached=False` reads them from the server even if the cache is enabled."""
+        if self._cache and cached:
+            return self._cache.get_all(lambda: self._http.get(url="/__admin/mappings"))
         return self._http.get(url="/__admin/mappings")
 
     def get_mapping(self, id: str):
+        if self._cache:
+            return self._cache.get(
+                id, lambda: self._http.get(url=f"/__admin/mappings/{id}")
+            )
         return self._http.get(url=f"/__admin/mappings/{id}")
 
     def put_mapping(self, id: str, content: dict):
-        return self._http.put(url=f"/__admin/mappings/{id}", json=content)["id"]
+        try:
+            return self._http.put(url=f"/__admin/mappings/{id}", json=content)["id"]
+        finally:
+            self._invalidate(id)
 
     def post_mapping(self, content: dict):
-        return self._http.post(url="/__admin/mappings", json=content)["id"]
+        try:
+            return self._http.post(url="/__admin/mappings", json=content)["id"]
+        finally:
+            self._invalidate(content.get("id"))
+
+    def import_mappings(
+        self,
+        mappings: list,
+        duplicate_policy: str = "OVERWRITE",
+        delete_all_not_in_import: bool = False,
+    ):
+        """Create mappings in one request. WireMock doesn't return IDs, so set `id` in every mapping in advance.
+
+        Mappings are dicts or already serialized JSON (bytes), the latter are sent without re-encoding.
+        """
+        import_options = {
+            "duplicatePolicy": duplicate_policy,
+            "deleteAllNotInImport": delete_all_not_in_import,
+        }
+        if not any(isinstance(mapping, bytes) for mapping in mappings):
+            request = dict(json={"mappings": mappings, "importOptions": import_options})
+        else:
+            data = b",".join(
+                mapping if isinstance(mapping, bytes) else json.dumps(mapping).encode()
+                for mapping in mappings
+            )
+            request = dict(
+                data=b'{"mappings":[%s],"importOptions":%s}'
+                % (data, json.dumps(import_options).encode()),
+                headers={"Content-Type": "application/json"},
+            )
+        try:
+            return self._http.post(url="/__admin/mappings/import", **request)
+        finally:
+            self._invalidate_all()
 
     def delete_mapping(self, id: str):
-        return self._http.delete(url=f"/__admin/mappings/{id}")
+        try:
+            return self._http.delete(url=f"/__admin/mappings/{id}")
+        finally:
+            self._invalidate(id)
+
+    def remove_mappings_by_metadata(self, pattern: dict):
+        """Delete mappings which metadata matches the pattern, ex: {"matchesJsonPath": "$.namespace"}."""
+        try:
+            return self._http.post(
+                url="/__admin/mappings/remove-by-metadata", json=pattern
+            )
+        finally:
+            self._invalidate_all()
 
     def delete_all_mappings(self):
-        return self._http.delete(url="/__admin/mappings")
+        try:
+            return self._http.delete(url="/__admin/mappings")
+        finally:
+            self._invalidate_all()
+
+    def get_files(self) -> List[str]:
+        """Names of files in the files area (`__files`), which mappings refer to by `bodyFileName`."""
+        return self._http.get(url="/__admin/files")
+
+    def get_file(self, name: str) -> bytes:
+        # Streamed to get raw bytes, JSON files aren't parsed
+        with self._http.get(url=f"/__admin/files/{name}", stream=True) as response:
+            return b"".join(response.iter_content())
+
+    def put_file(self, name: str, data: Union[bytes, BinaryIO]):
+        """Upload file, file object is streamed without reading it into memory."""
+        return self._http.put(
+            url=f"/__admin/files/{name}",
+            data=data,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+
+    def delete_file(self, name: str):
+        return self._http.delete(url=f"/__admin/files/{name}")
+
+    def get_requests(self, limit: int = None, since: str = None):
+        """One page of the request journal: the newest `limit` entries logged after `since` (ISO 8601)."""
+        params = {"limit": limit, "since": since}
+        return self._http.get(
+            url="/__admin/requests",
+            params={k: v for k, v in params.items() if v is not None},
+        )
+
+    def iter_requests(self, limit: int = None, since: str = None) -> Iterator[dict]:
+        """Journal entries (the newest first) decoded one by one from the streamed response.
+
+        Memory doesn't depend on the journal size, entries which were already processed aren't kept.
+        """
+        params = {"limit": limit, "since": since}
+        with self._http.get(
+            url="/__admin/requests",
+            params={k: v for k, v in params.items() if v is not None},
+            stream=True,
+        ) as response:
+            yield from response.iter_json_items(key="requests")
+
+    def get_request(self, id: str):
+        return self._http.get(url=f"/__admin/requests/{id}")
+
+    def count_requests(self, request_pattern: dict) -> int:
+        """Count of journal requests which match the pattern (`request` part of mapping), counted by the server."""
+        return self._http.post(url="/__admin/requests/count", json=request_pattern)[
+            "count"
+        ]
+
+    def find_requests(self, request_pattern: dict) -> Iterator[dict]:
+        """Journal requests which match the pattern, filtered by the server and streamed (the oldest first)."""
+        with self._http.post(
+            url="/__admin/requests/find", json=request_pattern, stream=True
+        ) as response:
+            yield from response.iter_json_items(key="requests")
+
+    def delete_all_requests(self):
+        return self._http.delete(url="/__admin/requests")
+
+    def journal_cursor(self, since: int = None) -> "JournalCursor":
+        return JournalCursor(self, since=since)
+
+
+class JournalCursor:
+    """Incremental polling of the request journal: every poll() returns only entries logged since the previous one.
+
+    >>> cursor = api.journal_cursor()
+    >>> ...  # the system under test sends requests to stubs
+    >>> new_entries = list(cursor.poll())
+    """
+
+    def __init__(self, api: WiremockApi, since: int = None):
+        """
+        :param since: `loggedDate` (milliseconds since epoch) to start after, all the journal if not set
+        """
+        self._api = api
+        self.logged_date = since
+        # Journal timestamps have millisecond resolution, so entries of the last millisecond are requested again
+        self._last_ids: Set[str] = set()
+
+    def poll(self) -> Iterator[dict]:
+        """New journal entries (the newest first) streamed from the server, the backlog isn't loaded into memory.
+
+        The cursor moves when all entries are consumed, the entries of a poll which was stopped early
+        are returned by the next poll again.
+        """
+        since = None
+        if self.logged_date is not None:
+            since = format_logged_date(self.logged_date - 1)
+        logged_date = None
+        last_ids = set()
+        for entry in self._api.iter_requests(since=since):
+            if entry["id"] in self._last_ids:
+                continue
+            entry_date = entry["request"]["loggedDate"]
+            if logged_date is None:
+                logged_date = entry_date
+            if entry_date == logged_date:
+                last_ids.add(entry["id"])
+            yield entry
+        if logged_date is not None:
+            if logged_date == self.logged_date:
+                last_ids |= self._last_ids
+            self.logged_date = logged_date
+            self._last_ids = last_ids
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Iterable, List
+
+from helpers.http_helper import HTTPHelper
+
+log = logging.getLogger(__name__)
+
+
+async def gather(aws: Iterable[Awaitable], limit: int = 100) -> List:
+    """asyncio.gather with bounded concurrency: no more than `limit` awaitables are running at once.
+
+    Results are returned in the same order as `aws`.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws))
+
+
+class AsyncHTTPHelper:
+    """Asyncio counterpart of HTTPHelper with the same get/post/put/delete/requester surface.
+
+    Requests are executed by the wrapped HTTPHelper in a dedicated thread pool, so parsing,
+    sanitizing and connection pooling behave exactly like in the sync helper.
+    The connection pool size is aligned with `concurrency` to let every worker keep its connection alive.
+
+    >>> async def check(http):
+    ...     return await gather(http.get(f"/stub/{i}") for i in range(5000))
+    """
+
+    GET = HTTPHelper.GET
+    POST = HTTPHelper.POST
+    PUT = HTTPHelper.PUT
+    DELETE = HTTPHelper.DELETE
+
+    HTTP = HTTPHelper.HTTP
+    HTTPS = HTTPHelper.HTTPS
+
+    DEFAULT_CONCURRENCY = 50
+
+    def __init__(self, host, concurrency: int = DEFAULT_CONCURRENCY, **kwargs):
+        kwargs.setdefault("pool_maxsize", concurrency)
+        self.concurrency = concurrency
+        self._http = HTTPHelper(host, **kwargs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="async-http"
+        )
+
+    @property
+    def sync(self) -> HTTPHelper:
+        return self._http
+
+    @property
+    def pool_stats(self):
+        return self._http.pool_stats
+
+    async def requester(self, method: str, rel_url: str, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(self._http.requester, method, rel_url, **kwargs)
+        )
+
+    async def get(self, url: str, **kwargs):
+        return await self.requester(self.GET, url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.requester(self.POST, url, **kwargs)
+
+    async def put(self, url: str, **kwargs):
+        return await self.requester(self.PUT, url, **kwargs)
+
+    async def delete(self, url: str, **kwargs):
+        return await self.requester(self.DELETE, url, **kwargs)
+
+    async def gather(self, aws: Iterable[Awaitable], limit: int = None) -> List:
+        return await gather(aws, limit=limit or self.concurrency)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._http.close()
+
+    async def aclose(self):
+        """close() which waits for running requests in another thread instead of blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
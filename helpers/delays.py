@@ -0,0 +1,67 @@
+import math
+import random
+from statistics import NormalDist
+
+UNIFORM = "uniform"
+LOGNORMAL = "lognormal"
+DISTRIBUTIONS = (UNIFORM, LOGNORMAL)
+
+# Faults which WireMock can return instead of a response
+EMPTY_RESPONSE = "EMPTY_RESPONSE"
+MALFORMED_RESPONSE_CHUNK = "MALFORMED_RESPONSE_CHUNK"
+RANDOM_DATA_THEN_CLOSE = "RANDOM_DATA_THEN_CLOSE"
+CONNECTION_RESET_BY_PEER = "CONNECTION_RESET_BY_PEER"
+FAULTS = (
+    EMPTY_RESPONSE,
+    MALFORMED_RESPONSE_CHUNK,
+    RANDOM_DATA_THEN_CLOSE,
+    CONNECTION_RESET_BY_PEER,
+)
+
+
+def validate_distribution(distribution: dict):
+    required = {UNIFORM: ("lower", "upper"), LOGNORMAL: ("median", "sigma")}
+    kind = distribution.get("type")
+    if kind not in required:
+        raise ValueError(f"Delay distribution type should be one of {DISTRIBUTIONS}")
+    missing = [key for key in required[kind] if key not in distribution]
+    if missing:
+        raise ValueError(f"Delay distribution '{kind}' has no {missing}")
+
+
+def sample_delay(response: dict, rng: random.Random = random) -> float:
+    """Delay (seconds) before the response is sent: fixedDelayMilliseconds + sample of delayDistribution."""
+    delay = response.get("fixedDelayMilliseconds") or 0
+    distribution = response.get("delayDistribution")
+    if distribution:
+        if distribution["type"] == UNIFORM:
+            delay += rng.uniform(distribution["lower"], distribution["upper"])
+        else:
+            value = distribution["median"] * math.exp(
+                distribution["sigma"] * rng.gauss(0, 1)
+            )
+            delay += min(value, distribution.get("maxValue") or value)
+    return delay / 1000
+
+
+def delay_percentile(response: dict, percent: float) -> float:
+    """Configured delay (seconds) which `percent` of responses shouldn't exceed."""
+    delay = response.get("fixedDelayMilliseconds") or 0
+    distribution = response.get("delayDistribution")
+    if distribution:
+        if distribution["type"] == UNIFORM:
+            lower, upper = distribution["lower"], distribution["upper"]
+            delay += lower + (upper - lower) * percent / 100
+        else:
+            z = NormalDist().inv_cdf(min(max(percent / 100, 1e-9), 1 - 1e-9))
+            value = distribution["median"] * math.exp(distribution["sigma"] * z)
+            delay += min(value, distribution.get("maxValue") or value)
+    return delay / 1000
+
+
+def dribble_chunks(body: bytes, dribble: dict):
+    """(chunk, pause before it in seconds) for chunkedDribbleDelay: body is split evenly over totalDuration."""
+    count = max(1, min(dribble["numberOfChunks"], len(body) or 1))
+    pause = dribble["totalDuration"] / 1000 / count
+    size = math.ceil(len(body) / count) if body else 0
+    return [(body[i * size : (i + 1) * size], pause) for i in range(count)]
@@ -1,8 +1,258 @@
-from functools import reduce
-from typing import Any, Tuple, Union
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple, Union
 
 SequenceTypes = (list, tuple, set)
 
+PATH_CACHE_SIZE = 4096
+
+
+def _get_item(
+    data: Union[list, tuple, set, dict], key: str, strict: bool
+) -> Union[dict, list, tuple, set, Any]:
+    if isinstance(data, dict):
+        return data[key]
+    elif key == "[]":
+        if not isinstance(data, SequenceTypes):
+            raise KeyError("Can't get list")
+        return data
+    elif isinstance(data, SequenceTypes):
+        result_data = []
+        for d in data:
+            try:
+                # Fast path for the most common case: list of dicts
+                result = d[key] if type(d) is dict else _get_item(d, key, strict)
+            except KeyError:
+                if strict:
+                    raise
+                continue
+
+            if isinstance(result, list):
+                result_data.extend(result)
+            else:
+                result_data.append(result)
+        return result_data
+    raise KeyError(f"Can't get {key=} from value with type={type(data)}")
+
+
+class _Miss:
+    __slots__ = ("error",)
+
+    def __init__(self, error: KeyError):
+        self.error = error
+
+
+def _get_items(data, keys: Iterable[str], strict: bool) -> dict:
+    """Same as _get_item for several keys at once: list elements are visited once for all keys.
+
+    Returns {key: value or _Miss(error)}.
+    """
+    keys = list(keys)
+    if len(keys) == 1 or not isinstance(data, SequenceTypes) or isinstance(data, dict):
+        results = {}
+        for key in keys:
+            try:
+                results[key] = _get_item(data, key, strict)
+            except KeyError as e:
+                results[key] = _Miss(e)
+        return results
+
+    results = {}
+    fan_out_keys = []
+    for key in keys:
+        if key == "[]":
+            results[key] = data
+        else:
+            fan_out_keys.append(key)
+            results[key] = []
+
+    misses = {}
+    for d in data:
+        if type(d) is dict:
+            items = {
+                key: d[key] for key in fan_out_keys if key in d and key not in misses
+            }
+            if strict:
+                for key in fan_out_keys:
+                    if key not in d and key not in misses:
+                        misses[key] = _Miss(KeyError(key))
+        else:
+            items = _get_items(
+                d, [key for key in fan_out_keys if key not in misses], strict
+            )
+        for key, result in items.items():
+            if isinstance(result, _Miss):
+                if strict:
+                    misses[key] = result
+                continue
+            if isinstance(result, list):
+                results[key].extend(result)
+            else:
+                results[key].append(result)
+
+    results.update(misses)
+    return results
+
+
+class _PathTrie:
+    """Prefix tree of compiled paths: common prefixes are resolved once."""
+
+    __slots__ = ("children", "paths")
+
+    def __init__(self):
+        self.children: Dict[str, "_PathTrie"] = {}
+        self.paths = []  # Compiled paths which end at this node
+
+    def add(self, path: "CompiledPath"):
+        node = self
+        for key in path.keys:
+            node = node.children.setdefault(key, _PathTrie())
+        node.paths.append(path)
+
+    def all_paths(self):
+        yield from self.paths
+        for child in self.children.values():
+            yield from child.all_paths()
+
+    def resolve(self, data, strict: bool, results: dict):
+        items = _get_items(data, self.children, strict)
+        for key, child in self.children.items():
+            value = items[key]
+            if isinstance(value, _Miss):
+                for path in child.all_paths():
+                    keys = list(path.keys)
+                    results[path.path] = _Miss(
+                        KeyError(
+                            f"Can't get value by {keys=}: error in key {value.error}"
+                        )
+                    )
+                continue
+            for path in child.paths:
+                results[path.path] = value
+            if child.children:
+                child.resolve(value, strict, results)
+
+
+class CompiledPath:
+    """Path split by delimiter once and reusable for any number of documents.
+
+    >>> path = compile_path("d.[].e")
+    >>> assert path.get({"d": [{"e": 1}, {"e": 2}]}) == [1, 2]
+    """
+
+    __slots__ = ("path", "keys", "parent_keys", "last_key")
+
+    def __init__(self, path: str, delimiter: str = "."):
+        self.path = path
+        self.keys = tuple(path.split(delimiter))
+        *parent_keys, self.last_key = self.keys
+        self.parent_keys = tuple(parent_keys)
+
+    def get(self, data, strict: bool = False):
+        return self._resolve(data, self.keys, strict)
+
+    def set(self, data, value, strict: bool = False) -> None:
+        self.set_in_parent(self._resolve(data, self.parent_keys, strict), value)
+
+    def set_in_parent(self, last_structure_value, value) -> None:
+        last_key = self.last_key
+
+        if isinstance(last_structure_value, dict):
+            last_structure_value[last_key] = value
+            return
+        elif isinstance(last_structure_value, SequenceTypes):
+            if last_key == "[]":
+                for index, _ in enumerate(last_structure_value):
+                    last_structure_value[index] = value
+                return
+            for last_value in last_structure_value:
+                if not isinstance(last_value, dict):
+                    raise KeyError(
+                        f"Can't change last values for key={self.path}. [last values are not equal dict]"
+                    )
+                last_value[last_key] = value
+            return
+
+        raise KeyError(f"Can't change last value for key={self.path}")
+
+    @staticmethod
+    def _resolve(data, keys: Tuple[str, ...], strict: bool):
+        try:
+            for key in keys:
+                if type(data) is dict:
+                    data = data[key]
+                else:
+                    data = _get_item(data, key, strict)
+            return data
+        except KeyError as e:
+            keys = list(keys)
+            raise KeyError(f"Can't get value by {keys=}: error in key {e}")
+
+    def __repr__(self):
+        return f"CompiledPath({self.path!r})"
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def compile_path(path: str, delimiter: str = ".") -> CompiledPath:
+    """Compile path into accessor, results are kept in LRU cache by (path, delimiter)."""
+    return CompiledPath(path, delimiter)
+
+
+def _merge_nodes(target: dict, source: dict) -> dict:
+    for key, child in source.items():
+        _merge_nodes(target.setdefault(key, {}), child)
+    return target
+
+
+def _elements_node(node: dict) -> dict:
+    """Keys which are applied to elements of a list: fan-out keys and keys after '[]'."""
+    result = {}
+    for key, child in node.items():
+        if key == "[]":
+            _merge_nodes(result, _elements_node(child))
+        else:
+            _merge_nodes(result, {key: child})
+    return result
+
+
+def _copy_along(value, node: dict, fanned: bool = False, element: bool = False):
+    """Copy containers of value on the paths from node.
+
+    `fanned` - value is a result of list fan-out, so the next '[]' points to the result list itself,
+    `element` - value is an element of a list which keys are applied to.
+    """
+    if fanned:
+        node = _elements_node(node)
+    if not node:
+        return value
+    if isinstance(value, dict):
+        value = value.copy()
+        for key, child in node.items():
+            if child and key in value:
+                value[key] = _copy_along(value[key], child, fanned=element)
+        return value
+    if isinstance(value, (list, tuple)):
+        element_node = _elements_node(node)
+        items = [_copy_along(item, element_node, element=True) for item in value]
+        return tuple(items) if isinstance(value, tuple) else items
+    return value
+
+
+def copy_along_paths(data, paths: Iterable[str], delimiter: str = "."):
+    """Copy-on-write copy of data: only containers on the paths are copied, other values are shared.
+
+    Result can be changed by the paths with DotProxy without any effect on the source data.
+    """
+    trie = {}
+    for path in paths:
+        node = trie
+        for key in compile_path(path, delimiter).keys:
+            node = node.setdefault(key, {})
+    return _copy_along(data, trie)
+
+
+_MISSING_PARENT = object()
+
 
 class DotProxy:
     """Implementation of proxy with access (read/write) to elements on path by delimiter.
@@ -26,38 +276,89 @@ class DotProxy:
         self._strict = strict
 
     def __setitem__(self, key, value) -> None:
-        key_list = key.split(self._delimiter)
-        *keys, last_key = key_list
+        compile_path(key, self._delimiter).set(self._data, value, self._strict)
 
-        last_structure_value = self.__get_value(keys)
+    def __getitem__(self, k):
+        return compile_path(k, self._delimiter).get(self._data, self._strict)
 
-        if isinstance(last_structure_value, dict):
-            last_structure_value[last_key] = value
-            return
-        elif isinstance(last_structure_value, SequenceTypes):
-            if last_key == "[]":
-                for index, _ in enumerate(last_structure_value):
-                    last_structure_value[index] = value
-                return
-            for last_value in last_structure_value:
-                if not isinstance(last_value, dict):
-                    raise KeyError(
-                        f"Can't change last values for key={key}. [last values are not equal dict]"
-                    )
-                last_value[last_key] = value
+    def get_many(self, paths: Iterable[str], default: Any = _Miss) -> dict:
+        """Get values by several paths in one traversal of the data.
+
+        Paths are merged into a prefix tree, so a common prefix and every list element are visited once.
+        Missing paths raise KeyError (like __getitem__) or are set to `default` if it's passed.
+
+        >>> DotProxy({"a": {"b": 1, "c": [{"d": 2}]}}).get_many(["a.b", "a.c.[].d"])
+        {'a.b': 1, 'a.c.[].d': [2]}
+        """
+        compiled = [compile_path(path, self._delimiter) for path in paths]
+        trie = _PathTrie()
+        for path in compiled:
+            trie.add(path)
+        resolved = {}
+        trie.resolve(self._data, self._strict, resolved)
+
+        results = {}
+        for path in compiled:
+            value = resolved[path.path]
+            if isinstance(value, _Miss):
+                if default is _Miss:
+                    raise value.error
+                value = default
+            results[path.path] = value
+        return results
+
+    def set_many(self, values: Dict[str, Any]) -> None:
+        """Set values by several paths: parent containers of all paths are found in one traversal.
+
+        Result is the same as sequential `proxy[path] = value` in the order of `values`.
+        """
+        compiled = {
+            compile_path(path, self._delimiter): value for path, value in values.items()
+        }
+        if self._has_nested_paths(compiled):
+            # Earlier assignment can replace containers on the path of the later one
+            for path, value in compiled.items():
+                path.set(self._data, value, self._strict)
             return
 
-        raise KeyError(f"Can't change last value for key={key}")
+        parents = self.get_many(
+            (
+                self._delimiter.join(path.parent_keys)
+                for path in compiled
+                if path.parent_keys
+            ),
+            default=_MISSING_PARENT,
+        )
+        for path, value in compiled.items():
+            if not path.parent_keys:
+                path.set(self._data, value, self._strict)
+                continue
+            parent = parents[self._delimiter.join(path.parent_keys)]
+            if parent is _MISSING_PARENT:
+                # Repeat lookup to raise the same error as __setitem__
+                path.set(self._data, value, self._strict)
+                continue
+            path.set_in_parent(parent, value)
 
-    def __getitem__(self, k):
-        return self.__get_value(k.split(self._delimiter))
+    @staticmethod
+    def _has_nested_paths(paths: Iterable[CompiledPath]) -> bool:
+        """Check if any path assigns a value on the way to the parent of another path.
 
-    def __get_value(self, keys: Tuple["str"]):
-        """Recursive get value."""
-        try:
-            return reduce(self._get_item, keys, self._data)
-        except KeyError as e:
-            raise KeyError(f"Can't get value by {keys=}: error in key {e}")
+        '[]' is ignored for comparison, since on a list it points to the list itself.
+        """
+
+        def strip(keys):
+            return tuple(key for key in keys if key != "[]")
+
+        full_keys = Counter(strip(path.keys) for path in paths)
+        for path in paths:
+            own_keys = strip(path.keys)
+            parent_keys = strip(path.parent_keys)
+            for i in range(len(parent_keys) + 1):
+                prefix = parent_keys[:i]
+                if full_keys[prefix] - (prefix == own_keys) > 0:
+                    return True
+        return False
 
     def __str__(self):
         return f"DotProxy: delimiter={self._delimiter} data={self._data}"
@@ -69,25 +370,4 @@ class DotProxy:
     def _get_item(
         self, data: Union[list, tuple, set, dict], key: str
     ) -> Union[dict, list, tuple, set, Any]:
-        if isinstance(data, dict):
-            return data[key]
-        elif key == "[]":
-            if not isinstance(data, SequenceTypes):
-                raise KeyError("Can't get list")
-            return data
-        elif isinstance(data, SequenceTypes):
-            result_data = []
-            for index, d in enumerate(data):
-                try:
-                    result = self._get_item(d, key)
-                except KeyError:
-                    if self._strict:
-                        raise
-                    continue
-
-                if isinstance(result, list):
-                    result_data.extend(result)
-                else:
-                    result_data.append(result)
-            return result_data
-        raise KeyError(f"Can't get {key=} from value with type={type(data)}")
+        return _get_item(data, key, self._strict)
@@ -0,0 +1,37 @@
+import hashlib
+from bisect import bisect
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit
+
+
+def shard_key(method: str, url: str) -> str:
+    """Key of consistent hashing for a request or a mapping: method and url path, ex: 'GET /users'."""
+    return f"{method.upper()} {urlsplit(url).path}"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hashing: when a node is added or removed only keys of that node move.
+
+    Every node has `replicas` virtual points on the ring for even distribution of keys.
+    """
+
+    DEFAULT_REPLICAS = 100
+
+    def __init__(self, nodes: Iterable[str], replicas: int = DEFAULT_REPLICAS):
+        self.nodes: List[str] = list(nodes)
+        if not self.nodes:
+            raise ValueError("Hash ring has no nodes")
+        points: Dict[int, str] = {}
+        for node in self.nodes:
+            for i in range(replicas):
+                points[_hash(f"{node}#{i}")] = node
+        self._hashes = sorted(points)
+        self._nodes = [points[h] for h in self._hashes]
+
+    def node(self, key: str) -> str:
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
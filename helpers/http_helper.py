@@ -1,18 +1,166 @@
 import logging
+import random
+import threading
 from copy import deepcopy
-from typing import Iterable, Union
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Iterable, List, Union
+from urllib.parse import urlsplit
 
 import requests
 import urllib3
 from requests import ConnectionError, HTTPError, Timeout, TooManyRedirects
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
-from helpers.dot_proxy import DotProxy
+from helpers.dot_proxy import DotProxy, copy_along_paths
+from helpers.http_log_event import HTTPLogEvent, truncate
+from helpers.http_timing import (
+    BODY_READ,
+    CONNECT,
+    PARSE,
+    SANITIZE,
+    SEND,
+    TOTAL,
+    TTFB,
+    LatencyHistogram,
+    RequestTiming,
+    TimingHook,
+    collect_timing,
+    current_timing,
+    measure,
+)
+from helpers.streamed_response import StreamedResponse
 
 log = logging.getLogger(__name__)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+class PoolStats:
+    """Thread-safe counters of connection reuse in the pool.
+
+    `hits` - request was sent over an already opened (keep-alive) connection,
+    `misses` - a new TCP connection had to be opened.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.checkouts - self.misses
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def as_dict(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class _TimedConnectionMixin:
+    """Records connect/send/ttfb phases into the current request timing of the thread.
+
+    Every opened TCP connection is a pool miss, including reconnects of dropped keep-alive connections.
+    """
+
+    stats: PoolStats = None
+
+    def connect(self):
+        if self.stats:
+            self.stats.record_miss()
+        with measure(CONNECT):
+            return super().connect()
+
+    def request(self, *args, **kwargs):
+        timing = current_timing()
+        if timing is None:
+            return super().request(*args, **kwargs)
+        # Connection can be opened lazily during sending, it's counted as connect phase
+        connect_before = timing.phases[CONNECT]
+        with measure(SEND, timing):
+            super().request(*args, **kwargs)
+        timing.phases[SEND] -= timing.phases[CONNECT] - connect_before
+
+    def getresponse(self):
+        with measure(TTFB):
+            return super().getresponse()
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CountingPoolMixin:
+    stats: PoolStats = None
+
+    def _get_conn(self, timeout=None):
+        if self.stats:
+            self.stats.record_checkout()
+        return super()._get_conn(timeout=timeout)
+
+    def _new_conn(self):
+        # Connection is opened lazily, its connect() counts the miss
+        conn = super()._new_conn()
+        conn.stats = self.stats
+        return conn
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _CountingPoolManager(PoolManager):
+    def __init__(self, *args, stats: PoolStats, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.stats = self.stats
+        return pool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter which keeps keep-alive connections per host and counts their reuse."""
+
+    def __init__(self, stats: PoolStats = None, **kwargs):
+        self.stats = stats or PoolStats()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            stats=self.stats,
+            **pool_kwargs,
+        )
+
+
 class HTTPHelper:
     GET = "GET"
     POST = "POST"
@@ -27,6 +175,11 @@ class HTTPHelper:
 
     HEADERS = {"Accept": "application/json;charset=UTF-8"}
 
+    DEFAULT_POOL_CONNECTIONS = 10  # Number of hosts with cached connection pools
+    DEFAULT_POOL_MAXSIZE = 10  # Number of keep-alive connections per host
+
+    DEFAULT_LOG_BODY_LIMIT = 10_000  # Max length of logged request/response bodies
+
     def __init__(
         self,
         host,
@@ -39,11 +192,20 @@ class HTTPHelper:
         s_cert=False,
         c_cert=None,
         c_key=None,
+        timeout=None,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        log_body_limit=DEFAULT_LOG_BODY_LIMIT,
+        log_sample_rate=1.0,
+        common_headers=None,
     ):
         self.base_url = f"{protocol}://{host}:{port}"
         if not port:
             self.base_url = f"{protocol}://{host}"
         self.headers = headers or self.HEADERS
+        # Added to every request, even if request headers are passed explicitly
+        self.common_headers = common_headers or {}
         self.header_sanitizers = header_sanitizers  # Ex: ['Authorization']
         if username and password:
             self.auth = HTTPBasicAuth(username, password)
@@ -54,6 +216,54 @@ class HTTPHelper:
             self.cert = (c_cert, c_key)
         else:
             self.cert = None
+        self.timeout = timeout  # Ex: 5 or (connect_timeout, read_timeout)
+        self.pool_stats = PoolStats()
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.log_body_limit = log_body_limit  # None - log bodies without truncation
+        self.log_sample_rate = log_sample_rate  # Share of requests which are logged
+        # Called with RequestTiming after every request, ex: helpers.http_timing.LatencyAggregator.
+        # Add hooks before requests are sent from other threads, or with add_timing_hook()
+        self.timing_hooks: List[TimingHook] = []
+        self._timing_hooks_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Shared session with pooled keep-alive connections (created on first use)."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        # Cookies are not persisted between calls, as with module-level requests.request()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = PooledHTTPAdapter(
+            stats=self.pool_stats,
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block,
+        )
+        session.mount(f"{self.HTTP}://", adapter)
+        session.mount(f"{self.HTTPS}://", adapter)
+        return session
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def requester(
         self,
@@ -65,23 +275,66 @@ class HTTPHelper:
         json: dict = None,
         files: dict = None,
         expected_error=None,
+        timeout=None,
+        stream: bool = False,
     ):
+        """Send request and return parsed response data.
+
+        With `stream=True` body isn't read into memory, StreamedResponse is returned instead.
+        """
         url = f"{self.base_url}{rel_url}"
-        log.debug(
-            "-------------------- HTTP_REQUEST_BEGIN_SESSION --------------------"
-        )
-        log.debug(f"URL: {url}")
-        log.debug(f"METHOD: {method}")
-        if params:
-            log.debug(f"PARAMS: {params}")
-        if data:
-            log.debug(f"DATA: {data}")
-        if json:
-            log.debug(f"JSON: {json}")
-        response = requests.request(
+        event = self._create_log_event(method, url, params=params, data=data, json=json)
+        timing = None
+        # Snapshot: the list is replaced, not mutated, by add/remove_timing_hook() of other threads
+        hooks = self.timing_hooks
+        if hooks:
+            timing = RequestTiming(method, urlsplit(rel_url).path)
+        try:
+            with collect_timing(timing):
+                try:
+                    return self._send(
+                        method,
+                        url,
+                        event=event,
+                        headers=headers,
+                        data=data,
+                        params=params,
+                        json=json,
+                        files=files,
+                        expected_error=expected_error,
+                        timeout=timeout,
+                        stream=stream,
+                    )
+                finally:
+                    if event:
+                        log.debug("%s", event, extra={"http_event": event})
+        finally:
+            if timing:
+                for hook in hooks:
+                    hook(timing)
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        event: HTTPLogEvent = None,
+        headers: dict = None,
+        data: dict = None,
+        params: dict = None,
+        json: dict = None,
+        files: dict = None,
+        expected_error=None,
+        timeout=None,
+        stream: bool = False,
+    ):
+        request_headers = headers or self.headers
+        if self.common_headers:
+            request_headers = {**request_headers, **self.common_headers}
+        # Body is read explicitly to measure it separately from waiting for the response
+        response = self.session.request(
             method,
             url,
-            headers=headers or self.headers,
+            headers=request_headers,
             data=data,
             json=json,
             params=params,
@@ -89,27 +342,100 @@ class HTTPHelper:
             verify=self.verify,
             auth=self.auth,
             files=files,
+            timeout=timeout or self.timeout,
+            stream=True,
         )
-        if self.header_sanitizers:
-            sanitized_headers = self._sanitize_data_by_keys(
-                dict(response.request.headers), sensitive_keys=self.header_sanitizers
-            )
-            response_copy = deepcopy(response)
-            response_copy.request.headers.update(sanitized_headers)
-            headers = sanitized_headers
-
-        log.debug(f"HEADERS: {headers}")
-        log.debug(f"RESPONSE CODE: {response.status_code}")
+        if not stream:
+            with measure(BODY_READ):
+                response.content
+        timing = current_timing()
+        if timing:
+            timing.status_code = response.status_code
+        if event:
+            event.headers = headers
+            if self.header_sanitizers:
+                event.headers = response.request.headers
+            event.status_code = response.status_code
         try:
             response.raise_for_status()
         except (Timeout, ConnectionError, TooManyRedirects, HTTPError) as e:
-            log.error(response.text)
+            log.error(self._error_body(response, stream))
+            # Streamed response holds its connection until it's closed
+            response.close()
             if expected_error and expected_error in str(e):
                 log.warning(f"Expected error: {e}")
                 return
             else:
                 raise e
-        return self._parse(response)
+        if stream:
+            return StreamedResponse(response)
+        return self._parse(response, event=event)
+
+    def _error_body(self, response: requests.Response, stream: bool) -> str:
+        """Body of error response for the log, streamed body is read only up to the log limit."""
+        if stream and self.log_body_limit:
+            body = response.raw.read(self.log_body_limit + 1, decode_content=True)
+            return truncate(body, self.log_body_limit)
+        return truncate(response.content, self.log_body_limit)
+
+    def _create_log_event(self, method: str, url: str, **fields) -> HTTPLogEvent:
+        """Log event of the request or None if it won't be logged (by level or sampling)."""
+        if not log.isEnabledFor(logging.DEBUG):
+            return None
+        if self.log_sample_rate < 1 and random.random() >= self.log_sample_rate:
+            return None
+        return HTTPLogEvent(
+            method,
+            url,
+            body_limit=self.log_body_limit,
+            headers_sanitizer=self._sanitize_headers
+            if self.header_sanitizers
+            else None,
+            **fields,
+        )
+
+    def _sanitize_headers(self, headers) -> dict:
+        # Only sanitized copy of request headers is logged, response itself is never copied
+        with measure(SANITIZE):
+            return self._sanitize_data_by_keys(
+                dict(headers), sensitive_keys=self.header_sanitizers, copy_on_write=True
+            )
+
+    def measure_delays(
+        self, method: str, rel_url: str, count: int = 100, **kwargs
+    ) -> Dict[str, LatencyHistogram]:
+        """Send the request `count` times and return observed latencies: {phase: LatencyHistogram}.
+
+        Phases are ttfb (delay of stub), body_read (chunked dribble delay) and total,
+        compare them with configured delays, ex: Response.delay_percentile(99).
+        """
+        histograms = {phase: LatencyHistogram() for phase in (TTFB, BODY_READ, TOTAL)}
+        thread_id = threading.get_ident()
+
+        def hook(timing: RequestTiming):
+            # Hooks are shared, requests of other threads aren't measured
+            if threading.get_ident() == thread_id:
+                for phase, histogram in histograms.items():
+                    histogram.add(timing.phases[phase])
+
+        self.add_timing_hook(hook)
+        try:
+            for _ in range(count):
+                self.requester(method, rel_url, **kwargs)
+        finally:
+            self.remove_timing_hook(hook)
+        return histograms
+
+    def add_timing_hook(self, hook: TimingHook):
+        """Add the hook while requests are sent from other threads: the list of hooks is copied on write."""
+        with self._timing_hooks_lock:
+            self.timing_hooks = [*self.timing_hooks, hook]
+
+    def remove_timing_hook(self, hook: TimingHook):
+        with self._timing_hooks_lock:
+            hooks = list(self.timing_hooks)
+            hooks.remove(hook)
+            self.timing_hooks = hooks
 
     def get(self, url: str, **kwargs):
         return self.requester(self.GET, url, **kwargs)
@@ -123,7 +449,7 @@ class HTTPHelper:
     def delete(self, url: str, **kwargs):
         return self.requester(self.DELETE, url, **kwargs)
 
-    def _parse(self, response):
+    def _parse(self, response, event: HTTPLogEvent = None):
         content = response.content
         if response.headers.get("Content-Type") in [
             "application/json",
@@ -131,12 +457,13 @@ class HTTPHelper:
             "text/plain; charset=utf-8",
         ] or "application/json" in str(response.request.headers):
             try:
-                content = response.json()
-                log.debug(f"RESPONSE DATA: {content}")
+                with measure(PARSE):
+                    content = response.json()
+                if event:
+                    event.response_data = content
             except requests.JSONDecodeError:
                 # We don't log non-json response since it could be not readable and large (if it's a file content for example)
                 pass
-        log.debug("-------------------- HTTP_REQUEST_END_SESSION --------------------")
         return content
 
     # Modified autotest_client.helper.sanitizers.sanitize_data_by_keys() due to cfg var existence
@@ -145,19 +472,23 @@ class HTTPHelper:
         value_to_sanitize: Union[dict, Iterable],
         sensitive_keys: Iterable,
         raise_on_miss: bool = False,
+        copy_on_write: bool = False,
     ) -> Union[dict, Iterable]:
-        value = deepcopy(value_to_sanitize)
+        """Replace values by sensitive keys with '****' in a copy of data.
+
+        With `copy_on_write` only containers on the sensitive paths are copied instead of the whole data,
+        the rest of the result is shared with `value_to_sanitize`.
+        """
+        sensitive_keys = list(sensitive_keys)
+        if copy_on_write:
+            value = copy_along_paths(value_to_sanitize, sensitive_keys)
+        else:
+            value = deepcopy(value_to_sanitize)
         data_proxy = DotProxy(value, strict=raise_on_miss)
 
-        for sensitive_key in sensitive_keys:
-            try:
-                value = data_proxy[sensitive_key]
-            except KeyError:
-                if raise_on_miss:
-                    raise
-                continue
-            if not value:
-                continue
-            data_proxy[sensitive_key] = "****"
+        # All keys are resolved in one traversal of the data, missing keys are skipped
+        get_kwargs = {} if raise_on_miss else {"default": None}
+        values = data_proxy.get_many(sensitive_keys, **get_kwargs)
+        data_proxy.set_many({key: "****" for key, value in values.items() if value})
 
         return data_proxy.data
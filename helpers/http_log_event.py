@@ -0,0 +1,130 @@
+from typing import Any, Callable, Iterator, Optional
+
+_UNSET = object()
+
+
+def truncate(value: Any, limit: Optional[int]) -> str:
+    """String representation of value cut to `limit` characters.
+
+    Dicts, lists and tuples are serialized piece by piece until the limit is reached,
+    so a large body isn't converted to a string as a whole. Bytes (raw bodies) are decoded as UTF-8.
+    """
+    if isinstance(value, bytes):
+        # Only the logged part is decoded, undecodable bytes are replaced
+        truncated = bool(limit) and len(value) > limit
+        text = (value[:limit] if truncated else value).decode("utf-8", errors="replace")
+        return _truncated(text, limit) if truncated else text
+    if not limit or type(value) not in (dict, list, tuple):
+        text = value if isinstance(value, str) else str(value)
+        if limit and len(text) > limit:
+            return _truncated(text, limit)
+        return text
+    pieces = []
+    size = 0
+    for piece in _iter_repr(value, limit):
+        pieces.append(piece)
+        size += len(piece)
+        if size > limit:
+            return _truncated("".join(pieces), limit)
+    return "".join(pieces)
+
+
+def _truncated(text: str, limit: int) -> str:
+    return f"{text[:limit]}... [truncated at {limit} chars]"
+
+
+def _iter_repr(value: Any, limit: int) -> Iterator[str]:
+    """Pieces of str(value) of plain containers, strings longer than `limit` are cut before repr()."""
+    if type(value) is dict:
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                yield ", "
+            yield from _iter_repr(key, limit)
+            yield ": "
+            yield from _iter_repr(item, limit)
+        yield "}"
+    elif type(value) in (list, tuple):
+        yield "[" if type(value) is list else "("
+        for i, item in enumerate(value):
+            if i:
+                yield ", "
+            yield from _iter_repr(item, limit)
+        if type(value) is tuple and len(value) == 1:
+            yield ","
+        yield "]" if type(value) is list else ")"
+    elif isinstance(value, (str, bytes)) and len(value) > limit:
+        yield repr(value[: limit + 1])
+    else:
+        yield repr(value)
+
+
+class HTTPLogEvent:
+    """Single log record of HTTP request/response.
+
+    Message is formatted (and headers are sanitized) only when a handler emits the record,
+    so there is no formatting cost if the record is filtered out.
+    Raw fields are available to handlers as `record.http_event`.
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "params",
+        "data",
+        "json",
+        "headers",
+        "status_code",
+        "response_data",
+        "body_limit",
+        "headers_sanitizer",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        params=None,
+        data=None,
+        json=None,
+        body_limit: int = None,
+        headers_sanitizer: Callable[[dict], dict] = None,
+    ):
+        self.method = method
+        self.url = url
+        self.params = params
+        self.data = data
+        self.json = json
+        self.headers = _UNSET  # Set once the request is sent, None is logged as is
+        self.status_code = None
+        self.response_data = None
+        self.body_limit = body_limit
+        self.headers_sanitizer = headers_sanitizer
+
+    def __str__(self):
+        lines = [
+            "-------------------- HTTP_REQUEST_BEGIN_SESSION --------------------",
+            f"URL: {self.url}",
+            f"METHOD: {self.method}",
+        ]
+        if self.params:
+            lines.append(f"PARAMS: {self.params}")
+        if self.data:
+            lines.append(f"DATA: {truncate(self.data, self.body_limit)}")
+        if self.json:
+            lines.append(f"JSON: {truncate(self.json, self.body_limit)}")
+        if self.headers is not _UNSET:
+            headers = self.headers
+            if self.headers_sanitizer and headers is not None:
+                headers = self.headers_sanitizer(headers)
+            lines.append(f"HEADERS: {headers}")
+        if self.status_code is not None:
+            lines.append(f"RESPONSE CODE: {self.status_code}")
+        if self.response_data is not None:
+            lines.append(
+                f"RESPONSE DATA: {truncate(self.response_data, self.body_limit)}"
+            )
+        lines.append(
+            "-------------------- HTTP_REQUEST_END_SESSION --------------------"
+        )
+        return "\n".join(lines)
@@ -0,0 +1,165 @@
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Phases of HTTPHelper.requester call
+CONNECT = "connect"
+SEND = "send"
+TTFB = "ttfb"  # Time to first byte: from the end of sending till response headers are received
+BODY_READ = "body_read"
+PARSE = "parse"
+SANITIZE = "sanitize"
+TOTAL = "total"
+
+_current = threading.local()
+
+
+class RequestTiming:
+    """Durations (in seconds) of phases of one request."""
+
+    __slots__ = ("method", "endpoint", "status_code", "phases")
+
+    def __init__(self, method: str, endpoint: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.status_code = None
+        self.phases: Dict[str, float] = defaultdict(float)
+
+    @property
+    def key(self) -> str:
+        return f"{self.method} {self.endpoint}"
+
+    def __repr__(self):
+        phases = ", ".join(f"{k}={v * 1000:.2f}ms" for k, v in self.phases.items())
+        return f"RequestTiming({self.key}, {phases})"
+
+
+TimingHook = Callable[[RequestTiming], None]
+
+
+@contextmanager
+def collect_timing(timing: Optional[RequestTiming]):
+    """Make timing current for the thread, so connection level phases are recorded into it."""
+    if timing is None:
+        yield
+        return
+    previous = getattr(_current, "timing", None)
+    _current.timing = timing
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.phases[TOTAL] += time.perf_counter() - start
+        _current.timing = previous
+
+
+@contextmanager
+def measure(phase: str, timing: Optional[RequestTiming] = None):
+    """Add duration of the block to the phase of given (or current for the thread) timing."""
+    timing = timing or getattr(_current, "timing", None)
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[phase] += time.perf_counter() - start
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return getattr(_current, "timing", None)
+
+
+class LatencyHistogram:
+    """Histogram with exponential buckets: memory is bounded, percentiles have ~5% relative error."""
+
+    BASE = 2 ** (1 / 16)
+    MIN_VALUE = 1e-6
+    ZERO_BUCKET = -1
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = defaultdict(int)
+        self.count = 0
+        self.max = 0.0
+        self.sum = 0.0
+
+    def add(self, value: float):
+        if value <= 0:
+            index = self.ZERO_BUCKET
+        else:
+            index = max(0, math.ceil(math.log(value / self.MIN_VALUE, self.BASE)))
+        self.buckets[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.buckets.items():
+            self.buckets[index] += count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                if index == self.ZERO_BUCKET:
+                    return 0.0
+                return min(self.MIN_VALUE * self.BASE**index, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class LatencyAggregator:
+    """Timing hook which keeps latency histograms per endpoint and phase.
+
+    >>> aggregator = LatencyAggregator()
+    >>> http.add_timing_hook(aggregator)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = defaultdict(
+            lambda: defaultdict(LatencyHistogram)
+        )
+
+    def __call__(self, timing: RequestTiming):
+        with self._lock:
+            histograms = self.histograms[timing.key]
+            for phase, duration in timing.phases.items():
+                histograms[phase].add(duration)
+
+    def summary(self) -> dict:
+        """{endpoint: {phase: {count, mean, p50, p95, p99, max}}}, durations are in seconds."""
+        with self._lock:
+            return {
+                endpoint: {phase: h.summary() for phase, h in phases.items()}
+                for endpoint, phases in self.histograms.items()
+            }
+
+    def export_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        log.info(f"HTTP latency histograms were saved to {path}")
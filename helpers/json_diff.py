@@ -0,0 +1,317 @@
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+ANY_INDEX = (
+    "[]"  # Key of rule paths which matches any list element, as in DotProxy paths
+)
+ROOT = "(root)"
+DEFAULT_MAX_DIFFERENCES = 50
+VALUE_REPR_LIMIT = 200
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<missing>"
+
+
+MISSING = _Missing()
+
+
+class Difference(NamedTuple):
+    """Differing value: `actual` is MISSING if the path is absent in actual document, `expected` - if it's unexpected.
+
+        Path is dotted like DotProxy paths, list elements are `[index]`, ex: "items.[2].name".
+    It can be resolved with resolve_path() and used in `ignore_paths`.
+    """
+
+    path: str
+    expected: Any
+    actual: Any
+
+    def __str__(self):
+        return f"{self.path or ROOT}: expected {_short_repr(self.expected)}, actual {_short_repr(self.actual)}"
+
+
+class _Rules:
+    """Prefix tree of ignored and order-insensitive paths."""
+
+    __slots__ = ("children", "ignore", "unordered")
+
+    def __init__(self):
+        self.children: Dict[str, "_Rules"] = {}
+        self.ignore = False
+        self.unordered = False
+
+    @classmethod
+    def compile(
+        cls, ignore_paths: Iterable[str], unordered_paths: Iterable[str]
+    ) -> Optional["_Rules"]:
+        root = None
+        for paths, flag in ((ignore_paths, "ignore"), (unordered_paths, "unordered")):
+            for path in paths:
+                root = root or cls()
+                node = root
+                for key in path.split(".") if path else ():
+                    node = node.children.setdefault(key, cls())
+                setattr(node, flag, True)
+        if root is not None:
+            root._check_indexes("")
+        return root
+
+    def _check_indexes(self, path: str):
+        for key, child in self.children.items():
+            child_path = f"{path}.{key}" if path else key
+            if self.unordered and _index(key) is not None:
+                raise ValueError(
+                    f"Index key in {child_path!r}: elements of order-insensitive list have no positions"
+                )
+            child._check_indexes(child_path)
+
+    def merged(self, other: "_Rules") -> "_Rules":
+        result = _Rules()
+        result.ignore = self.ignore or other.ignore
+        result.unordered = self.unordered or other.unordered
+        result.children = dict(self.children)
+        for key, child in other.children.items():
+            own = result.children.get(key)
+            result.children[key] = child if own is None else own.merged(child)
+        return result
+
+    def element(self, index: int) -> Optional["_Rules"]:
+        """Rules of list element: "[]" rules merged with "[index]" ones."""
+        any_rules = self.children.get(ANY_INDEX)
+        index_rules = self.children.get(f"[{index}]")
+        if index_rules is None:
+            return any_rules
+        if any_rules is None:
+            return index_rules
+        return any_rules.merged(index_rules)
+
+
+def _index(key: str) -> Optional[int]:
+    """Index of "[N]" path key, None for other keys."""
+    if key[:1] == "[" and key[-1:] == "]" and key[1:-1].isdigit():
+        return int(key[1:-1])
+    return None
+
+
+def resolve_path(document, path: str):
+    """Value by path of Difference, ex: resolve_path(actual, "items.[2].name"). Raises KeyError if it's missing."""
+    value = document
+    for key in path.split(".") if path else ():
+        index = _index(key)
+        try:
+            if index is not None and type(value) in (list, tuple):
+                value = value[index]
+            elif type(value) is dict:
+                value = value[key]
+            else:
+                raise KeyError(key)
+        except IndexError:
+            raise KeyError(key)
+    return value
+
+
+_canonical_json = json.JSONEncoder(sort_keys=True).encode
+
+
+def _digest(value, rules: Optional[_Rules] = None) -> int:
+    """Merkle-style hash of subtree: hashes of children are combined, equal subtrees have equal digests.
+
+    Ignored paths are excluded and elements of order-insensitive lists are combined in sorted order.
+    Subtrees without rules are hashed by their canonical JSON, which is encoded in C.
+    """
+    if rules is not None:
+        if rules.ignore:
+            # Ignored list elements are equal to anything
+            return 0
+        if type(value) is dict:
+            # Order of keys doesn't matter
+            return hash(
+                frozenset(
+                    (key, _digest(child, rules.children.get(key)))
+                    for key, child in value.items()
+                    if key not in rules.children or not rules.children[key].ignore
+                )
+            )
+        if type(value) in (list, tuple):
+            hashes = [_digest(child, rules.element(k)) for k, child in enumerate(value)]
+            if rules.unordered:
+                hashes.sort()
+            return hash(tuple(hashes))
+    try:
+        return hash(_canonical_json(value))
+    except (TypeError, ValueError):
+        return hash(repr(value))
+
+
+def json_diff(
+    expected,
+    actual,
+    ignore_paths: Iterable[str] = (),
+    unordered_paths: Iterable[str] = (),
+    max_differences: int = None,
+) -> List[Difference]:
+    """Differences between JSON-like documents, only paths of differing values are reported.
+
+    Equal branches are skipped as a whole: branches without rules are compared by C-level equality,
+    elements of order-insensitive lists are paired by digests of subtrees (see _digest), not one by one.
+    Rule paths use "[]" for any list element, ex: "items.[].id", or "[N]" for one element of ordered list.
+
+    >>> json_diff({"a": [1, 2], "t": 1}, {"a": [2, 1], "t": 2}, ignore_paths=["t"], unordered_paths=["a"])
+    []
+    """
+    rules = _Rules.compile(ignore_paths, unordered_paths)
+    differences = []
+    _compare(expected, actual, "", rules, differences, max_differences or float("inf"))
+    return differences
+
+
+def _compare(
+    expected,
+    actual,
+    path: str,
+    rules: Optional[_Rules],
+    differences: List[Difference],
+    limit: float,
+):
+    if len(differences) >= limit:
+        return
+    if rules is None and expected == actual:
+        return
+    if rules is not None and rules.ignore:
+        return
+    prefix = f"{path}." if path else ""
+
+    if type(expected) is dict and type(actual) is dict:
+        children = rules.children if rules else {}
+        for key, value in expected.items():
+            child_rules = children.get(key)
+            if child_rules is not None and child_rules.ignore:
+                continue
+            if key not in actual:
+                if len(differences) >= limit:
+                    return
+                differences.append(Difference(f"{prefix}{key}", value, MISSING))
+                continue
+            _compare(
+                value, actual[key], f"{prefix}{key}", child_rules, differences, limit
+            )
+        for key, value in actual.items():
+            if key not in expected and not (key in children and children[key].ignore):
+                if len(differences) >= limit:
+                    return
+                differences.append(Difference(f"{prefix}{key}", MISSING, value))
+        return
+
+    if type(expected) in (list, tuple) and type(actual) in (list, tuple):
+        if rules is not None and rules.unordered:
+            element_rules = rules.children.get(ANY_INDEX)
+            expected_left, actual_left = _unmatched(expected, actual, element_rules)
+        else:
+            expected_left = range(len(expected))
+            actual_left = range(len(actual))
+        # Remaining elements are compared pairwise, so a changed element is reported by its inner paths
+        for i, j in zip(expected_left, actual_left):
+            _compare(
+                expected[i],
+                actual[j],
+                f"{prefix}[{i}]",
+                rules.element(i) if rules else None,
+                differences,
+                limit,
+            )
+        for i in expected_left[len(actual_left) :]:
+            if len(differences) >= limit:
+                return
+            element_rules = rules.element(i) if rules else None
+            if element_rules is None or not element_rules.ignore:
+                differences.append(Difference(f"{prefix}[{i}]", expected[i], MISSING))
+        for j in actual_left[len(expected_left) :]:
+            if len(differences) >= limit:
+                return
+            element_rules = rules.element(j) if rules else None
+            if element_rules is None or not element_rules.ignore:
+                differences.append(Difference(f"{prefix}[{j}]", MISSING, actual[j]))
+        return
+
+    if rules is not None and expected == actual:
+        return
+    differences.append(Difference(path, expected, actual))
+
+
+def _unmatched(
+    expected: list, actual: list, element_rules: Optional[_Rules]
+) -> Tuple[List[int], List[int]]:
+    """Indexes of elements of order-insensitive lists which have no equal (by digest) pair in the other list."""
+    # Elements which are equal at the same positions are matched without digests
+    if element_rules is None:
+        same = {i for i, (e, a) in enumerate(zip(expected, actual)) if e == a}
+    else:
+        same = set()
+    pool = defaultdict(list)
+    for j in range(len(actual) - 1, -1, -1):
+        if j not in same:
+            pool[_digest(actual[j], element_rules)].append(j)
+    expected_left = []
+    matched = set(same)
+    for i, value in enumerate(expected):
+        if i in same:
+            continue
+        indexes = pool.get(_digest(value, element_rules)) or ()
+        # Equal digests are confirmed by comparison: different values can have equal hashes
+        match = next(
+            (j for j in reversed(indexes) if _equal(value, actual[j], element_rules)),
+            None,
+        )
+        if match is None:
+            expected_left.append(i)
+        else:
+            indexes.remove(match)
+            matched.add(match)
+    actual_left = [j for j in range(len(actual)) if j not in matched]
+    return expected_left, actual_left
+
+
+def _equal(expected, actual, rules: Optional[_Rules]) -> bool:
+    if rules is None:
+        return expected == actual
+    differences = []
+    _compare(expected, actual, "", rules, differences, 1)
+    return not differences
+
+
+def assert_json_equal(
+    actual,
+    expected,
+    ignore_paths: Iterable[str] = (),
+    unordered_paths: Iterable[str] = (),
+    max_differences: int = DEFAULT_MAX_DIFFERENCES,
+):
+    """Raise AssertionError with differing paths (at most `max_differences`) instead of whole documents."""
+    # One more difference is searched to tell whether the output is truncated
+    differences = json_diff(
+        expected,
+        actual,
+        ignore_paths=ignore_paths,
+        unordered_paths=unordered_paths,
+        max_differences=max_differences + 1 if max_differences else None,
+    )
+    if not differences:
+        return
+    if max_differences and len(differences) > max_differences:
+        differences = differences[:max_differences]
+        header = f"Documents differ (the first {max_differences} differences)"
+    else:
+        header = f"Documents differ ({len(differences)} differences)"
+    raise AssertionError("\n".join([f"{header}:", *map(str, differences)]))
+
+
+def _short_repr(value) -> str:
+    text = repr(value)
+    if len(text) > VALUE_REPR_LIMIT:
+        return f"{text[:VALUE_REPR_LIMIT]}... ({len(text)} chars)"
+    return text
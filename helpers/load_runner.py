@@ -0,0 +1,234 @@
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from helpers.http_helper import HTTPHelper
+from helpers.http_timing import TOTAL, LatencyHistogram
+
+log = logging.getLogger(__name__)
+
+COMPARED_PERCENTILES = ("p50", "p95", "p99")
+UNEXPECTED_RESPONSE = (
+    "UnexpectedResponse"  # Error of response which differs from `expected`
+)
+
+_UNSET = object()
+
+
+class LoadRequest:
+    """Request of the load mix: HTTPHelper.requester() kwargs (`check_request` of test cases) and its weight.
+
+    Error statuses fail the request unless `expected_error` is in kwargs (as in test cases).
+    If `expected` (`expected_response` of test cases) is set, parsed responses which differ from it are errors too.
+    """
+
+    __slots__ = ("name", "kwargs", "weight", "expected")
+
+    def __init__(
+        self,
+        kwargs: dict,
+        weight: float = 1.0,
+        name: str = None,
+        expected: Any = _UNSET,
+    ):
+        self.kwargs = kwargs
+        self.weight = weight
+        self.name = name or f"{kwargs['method']} {kwargs['rel_url']}"
+        self.expected = expected
+
+    def check(self, response) -> bool:
+        return self.expected is _UNSET or response == self.expected
+
+
+class LoadReport:
+    """Throughput and latency percentiles of a load run, durations are in seconds."""
+
+    def __init__(
+        self,
+        duration: float,
+        histograms: Dict[str, LatencyHistogram],
+        errors: Counter,
+        concurrency: int,
+        rate: Optional[float],
+    ):
+        self.duration = duration
+        self.histograms = histograms
+        self.errors = errors
+        self.concurrency = concurrency
+        self.rate = rate
+
+    @property
+    def requests(self) -> int:
+        return self.histograms[TOTAL].count if TOTAL in self.histograms else 0
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    def as_dict(self) -> dict:
+        errors = sum(self.errors.values())
+        return {
+            "concurrency": self.concurrency,
+            "rate": self.rate,
+            "duration": self.duration,
+            "requests": self.requests,
+            "throughput": self.throughput,
+            "errors": dict(self.errors),
+            "error_rate": errors / self.requests if self.requests else 0.0,
+            "latency": {name: h.summary() for name, h in self.histograms.items()},
+        }
+
+    def export_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        log.info(f"Load report was saved to {path}")
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float = 0.1) -> List[str]:
+    """Regressions of `current` run against `baseline` (LoadReport.as_dict()), empty list if there are none.
+
+    Throughput drop, error rate growth and p50/p95/p99 latency growth (for every request of the mix)
+    by more than `tolerance` (relative) are reported.
+    """
+    regressions = []
+    if current["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(
+            f"throughput: {baseline['throughput']:.1f} -> {current['throughput']:.1f} req/s"
+        )
+    if current["error_rate"] > baseline["error_rate"] + tolerance * max(
+        baseline["error_rate"], 0.01
+    ):
+        regressions.append(
+            f"error rate: {baseline['error_rate']:.2%} -> {current['error_rate']:.2%}"
+        )
+    for name, summary in current["latency"].items():
+        baseline_summary = baseline["latency"].get(name)
+        if not baseline_summary:
+            continue
+        for percentile in COMPARED_PERCENTILES:
+            before, after = baseline_summary[percentile], summary[percentile]
+            if after > before * (1 + tolerance):
+                regressions.append(
+                    f"{name} {percentile}: {before * 1000:.2f} -> {after * 1000:.2f} ms"
+                )
+    return regressions
+
+
+class LoadRunner:
+    """Load generator for stubs: drives a weighted mix of requests from `concurrency` threads.
+
+    Without `rate` every thread sends the next request as soon as the previous one is done (closed loop).
+    With `rate` (requests per second) requests are sent on a fixed schedule, and latency is measured
+    from the scheduled time, so stalls of the server aren't hidden by the load generator waiting for them.
+    HTTPHelper should have `pool_maxsize` not less than `concurrency` to keep connections alive.
+
+    >>> runner = LoadRunner(http, [case_check_request, (other_check_request, 3)], concurrency=20)
+    >>> runner.run(duration=10).export_json("load.json")
+    """
+
+    def __init__(
+        self,
+        http: HTTPHelper,
+        requests: Sequence[Union[LoadRequest, dict, Tuple[dict, float]]],
+        concurrency: int = 10,
+        rate: float = None,
+        seed: int = 0,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        :param clock: monotonic clock in seconds, `clock` and `sleep` are replaced by fake ones in tests
+        """
+        if not requests:
+            raise ValueError("Load mix has no requests")
+        self.http = http
+        self.requests = [self._load_request(request) for request in requests]
+        self.concurrency = concurrency
+        self.rate = rate
+        self.seed = seed
+        self.clock = clock
+        self.sleep = sleep
+        self._cum_weights = list(
+            itertools.accumulate(request.weight for request in self.requests)
+        )
+
+    @staticmethod
+    def _load_request(request) -> LoadRequest:
+        if isinstance(request, LoadRequest):
+            return request
+        if isinstance(request, tuple):
+            return LoadRequest(*request)
+        return LoadRequest(request)
+
+    def run(self, duration: float = None, count: int = None) -> LoadReport:
+        """Send requests during `duration` seconds or `count` requests in total (what comes first)."""
+        if duration is None and count is None:
+            raise ValueError("Set duration or count of requests")
+        sequence = itertools.count()
+        results = [None] * self.concurrency
+        clock = self.clock
+        start = clock()
+        deadline = start + duration if duration is not None else None
+
+        def worker(index: int):
+            rng = random.Random(self.seed + index)
+            histograms = defaultdict(LatencyHistogram)
+            errors = Counter()
+            results[index] = (histograms, errors)
+            while True:
+                # Shared counter: next() of itertools.count is atomic
+                number = next(sequence)
+                if count is not None and number >= count:
+                    return
+                if self.rate:
+                    scheduled = start + number / self.rate
+                    if deadline is not None and scheduled >= deadline:
+                        return
+                    delay = scheduled - clock()
+                    if delay > 0:
+                        self.sleep(delay)
+                else:
+                    scheduled = clock()
+                    if deadline is not None and scheduled >= deadline:
+                        return
+                request = rng.choices(self.requests, cum_weights=self._cum_weights)[0]
+                try:
+                    response = self.http.requester(**request.kwargs)
+                except Exception as e:
+                    errors[f"{request.name}: {type(e).__name__}"] += 1
+                else:
+                    if not request.check(response):
+                        errors[f"{request.name}: {UNEXPECTED_RESPONSE}"] += 1
+                latency = clock() - scheduled
+                histograms[request.name].add(latency)
+                histograms[TOTAL].add(latency)
+
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"load-{i}")
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = clock() - start
+
+        histograms = defaultdict(LatencyHistogram)
+        errors = Counter()
+        for worker_histograms, worker_errors in results:
+            for name, histogram in worker_histograms.items():
+                histograms[name].merge(histogram)
+            errors.update(worker_errors)
+        report = LoadReport(
+            elapsed, dict(histograms), errors, self.concurrency, self.rate
+        )
+        log.info(
+            f"Load run: {report.requests} requests in {elapsed:.2f} s, "
+            f"{report.throughput:.1f} req/s, {sum(errors.values())} errors"
+        )
+        return report
@@ -0,0 +1,420 @@
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+from helpers.mocker import Mapping
+from helpers.request_matcher import (
+    ANY_METHOD,
+    DEFAULT_PRIORITY,
+    IncomingRequest,
+    match_request,
+)
+
+log = logging.getLogger(__name__)
+
+NGRAM = 3  # Length of literals by which regexes without literal prefix are indexed
+_INLINE_FLAGS = re.compile(r"\(\?([a-zA-Z-]+)[:)]")
+_OPTIONAL_QUANTIFIERS = "*?{"  # The atom before them can be absent in a match
+
+# Regex samples rely on the private parser of CPython, which may change in any release:
+# without it mappings with regexes have no probe and are treated as overlapping with all others
+try:
+    from re import _parser as sre_parse
+
+    _CATEGORY_SAMPLES = {
+        sre_parse.CATEGORY_DIGIT: "0",
+        sre_parse.CATEGORY_NOT_DIGIT: "a",
+        sre_parse.CATEGORY_SPACE: " ",
+        sre_parse.CATEGORY_NOT_SPACE: "a",
+        sre_parse.CATEGORY_WORD: "a",
+        sre_parse.CATEGORY_NOT_WORD: "-",
+    }
+except (ImportError, AttributeError):
+    sre_parse = None
+    _CATEGORY_SAMPLES = {}
+
+
+class _NoSample(Exception):
+    """Regex sample is unavailable."""
+
+
+def _sample(parsed) -> str:
+    """The shortest string (as far as possible) which matches parsed regex."""
+    result = []
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            result.append(chr(av))
+        elif op is sre_parse.NOT_LITERAL:
+            result.append("a" if av != ord("a") else "b")
+        elif op is sre_parse.ANY:
+            result.append("a")
+        elif op is sre_parse.IN:
+            result.append(_sample_in(av))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            min_count, _, item = av
+            result.append(_sample(item) * min_count)
+        elif op is sre_parse.SUBPATTERN:
+            result.append(_sample(av[-1]))
+        elif op is sre_parse.BRANCH:
+            result.append(_sample(av[1][0]))
+        elif op is sre_parse.CATEGORY:
+            result.append(_CATEGORY_SAMPLES.get(av, "a"))
+    return "".join(result)
+
+
+def _sample_in(items) -> str:
+    if items and items[0][0] is sre_parse.NEGATE:
+        excluded = {av for op, av in items[1:] if op is sre_parse.LITERAL}
+        return next(c for c in "a0-_" if ord(c) not in excluded)
+    op, av = items[0]
+    if op is sre_parse.LITERAL:
+        return chr(av)
+    if op is sre_parse.RANGE:
+        return chr(av[0])
+    if op is sre_parse.CATEGORY:
+        return _CATEGORY_SAMPLES.get(av, "a")
+    return "a"
+
+
+def regex_sample(pattern: str) -> Optional[str]:
+    """String which matches the regex or None if the regex parser is unavailable."""
+    if sre_parse is None:
+        return None
+    try:
+        return _sample(sre_parse.parse(pattern))
+    except Exception as e:
+        log.debug(f"No sample for regex {pattern!r}: {e!r}")
+        return None
+
+
+def _required_sample(pattern: str) -> str:
+    sample = regex_sample(pattern)
+    if sample is None:
+        raise _NoSample(pattern)
+    return sample
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Position after character class which starts at `i`."""
+    i += 1
+    if pattern[i : i + 1] == "^":
+        i += 1
+    if pattern[i : i + 1] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_quantifier(pattern: str, i: int) -> int:
+    if pattern[i] == "{":
+        end = pattern.find("}", i)
+        i = end + 1 if end != -1 else len(pattern)
+    else:
+        i += 1
+    # Lazy and possessive quantifiers
+    if pattern[i : i + 1] in ("?", "+"):
+        i += 1
+    return i
+
+
+def regex_literals(pattern: str) -> Tuple[str, List[str]]:
+    """Literal prefix of regex and literal strings which every match contains.
+
+    The scan is conservative: groups, classes and escapes other than escaped punctuation break literals,
+    and a literal followed by `*`, `?` or `{}` quantifier is dropped, ex: ".*/items/a?b" -> ("", ["/items/", "b"]).
+    Regex with top-level alternatives or case-insensitive flag has no literals.
+    """
+    if any("i" in flags for flags in _INLINE_FLAGS.findall(pattern)):
+        return "", []
+    literals = []
+    literal = []
+    prefix = None
+    depth = 0
+    i = 1 if pattern.startswith("^") else 0
+    while i < len(pattern):
+        char = pattern[i]
+        atom = None  # Literal character or None for other regex syntax
+        if char == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            if escaped and not escaped.isalnum():
+                atom = escaped
+            i += 2
+        elif char == "[":
+            i = _skip_class(pattern, i)
+        elif char == "(":
+            depth += 1
+            i += 1
+        elif char == ")":
+            depth -= 1
+            i += 1
+        elif char == "|":
+            if depth == 0:
+                return "", []
+            i += 1
+        elif char in ".^$*+?{}":
+            i += 1
+        else:
+            atom = char
+            i += 1
+        if depth > 0 or char == ")":
+            atom = (
+                None  # Groups can be optional or repeated, their content isn't required
+            )
+        optional = i < len(pattern) and pattern[i] in _OPTIONAL_QUANTIFIERS
+        if atom is not None and not optional:
+            literal.append(atom)
+        if atom is None or optional or (i < len(pattern) and pattern[i] == "+"):
+            if prefix is None:
+                prefix = "".join(literal)
+            if literal:
+                literals.append("".join(literal))
+                literal = []
+        if i < len(pattern) and pattern[i] in "*?{+" and depth == 0:
+            i = _skip_quantifier(pattern, i)
+    if prefix is None:
+        prefix = "".join(literal)
+    if literal:
+        literals.append("".join(literal))
+    return prefix, literals
+
+
+def regex_literal_prefix(pattern: str) -> str:
+    """Literal beginning of regex, ex: '/url-equalty/' for '/url-equalty/[a-z]*'."""
+    return regex_literals(pattern)[0]
+
+
+def _value_sample(pattern: dict) -> Optional[str]:
+    """Value which satisfies WireMock string value pattern or None if the value should be absent."""
+    if pattern.get("absent"):
+        return None
+    if "equalTo" in pattern:
+        return str(pattern["equalTo"])
+    if "contains" in pattern:
+        return str(pattern["contains"])
+    if "matches" in pattern:
+        return _required_sample(pattern["matches"])
+    if "equalToJson" in pattern:
+        expected = pattern["equalToJson"]
+        return expected if isinstance(expected, str) else json.dumps(expected)
+    if "and" in pattern:
+        return _value_sample(pattern["and"][0])
+    if "or" in pattern:
+        return _value_sample(pattern["or"][0])
+    return ""
+
+
+def probe_request(request_pattern: dict) -> Optional[IncomingRequest]:
+    """Representative request which should be matched by the request pattern of a mapping.
+
+    None if some regex of the pattern can't be sampled.
+    """
+    try:
+        return _probe_request(request_pattern)
+    except _NoSample:
+        return None
+
+
+def _probe_request(request_pattern: dict) -> IncomingRequest:
+    method = request_pattern.get("method") or ANY_METHOD
+    if method == ANY_METHOD:
+        method = "GET"
+
+    if request_pattern.get("url") is not None:
+        url = request_pattern["url"]
+    elif request_pattern.get("urlPath") is not None:
+        url = request_pattern["urlPath"]
+    elif request_pattern.get("urlPattern") is not None:
+        url = _required_sample(request_pattern["urlPattern"])
+    elif request_pattern.get("urlPathPattern") is not None:
+        url = _required_sample(request_pattern["urlPathPattern"])
+    else:
+        url = "/"
+
+    query = {}
+    for name, pattern in (request_pattern.get("queryParameters") or {}).items():
+        value = _value_sample(pattern)
+        if value is not None:
+            query[name] = value
+    if query and not urlsplit(url).query:
+        url = f"{url}?{urlencode(query)}"
+
+    headers = {}
+    for name, pattern in (request_pattern.get("headers") or {}).items():
+        value = _value_sample(pattern)
+        if value is not None:
+            headers[name] = value
+    cookies = []
+    for name, pattern in (request_pattern.get("cookies") or {}).items():
+        value = _value_sample(pattern)
+        if value is not None:
+            cookies.append(f"{name}={value}")
+    if cookies:
+        headers["Cookie"] = "; ".join(cookies)
+
+    body_patterns = request_pattern.get("bodyPatterns") or []
+    body = _value_sample(body_patterns[0]) if body_patterns else ""
+    return IncomingRequest(method, url, headers=headers, body=body or "")
+
+
+def _method(mapping: dict) -> str:
+    return ((mapping.get("request") or {}).get("method") or ANY_METHOD).upper()
+
+
+class Conflict:
+    """Pair of mappings which both match the probe request of `mapping`, `winner` is the one WireMock prefers."""
+
+    def __init__(
+        self, mapping: dict, request: Optional[IncomingRequest], matched: List[dict]
+    ):
+        self.mapping = mapping
+        self.request = request
+        self.matched = matched
+        self.winner = matched[0]
+
+    @property
+    def ambiguous(self) -> bool:
+        """Winner is chosen only by the order of creation (priorities are equal)."""
+        priorities = {m.get("priority") or DEFAULT_PRIORITY for m in self.matched[:2]}
+        return len(priorities) == 1
+
+    def __repr__(self):
+        names = [m.get("name") or m.get("id") for m in self.matched]
+        return f"Conflict({self.request}: {names}, winner={names[0]!r}, ambiguous={self.ambiguous})"
+
+
+class MappingAnalyzer:
+    """Offline analyzer of overlaps between mappings, without WireMock server.
+
+    Mappings are indexed by method, exact url path and literal prefix of url regex,
+    or by a substring of NGRAM chars of url regex literals if it has no literal prefix (ex: ".*/items/1"),
+    so only a few candidates are matched for each request instead of all mappings.
+
+    >>> analyzer = MappingAnalyzer(mappings)
+    >>> analyzer.conflicts()
+    >>> analyzer.predict("GET", "/url-equalty/mytestregex")
+    """
+
+    def __init__(self, mappings: Iterable[Union[Mapping, dict]]):
+        # Position of mapping in the input is its creation order: the later, the newer
+        self.mappings: List[dict] = []
+        self._by_path: Dict[str, Dict[str, List[int]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        self._by_prefix: Dict[str, Dict[str, List[int]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        self._by_ngram: Dict[str, Dict[str, List[int]]] = defaultdict(
+            lambda: defaultdict(list)
+        )
+        for mapping in mappings:
+            self.add(mapping)
+
+    def add(self, mapping: Union[Mapping, dict]):
+        if isinstance(mapping, Mapping):
+            mapping = mapping.model_dump()
+        index = len(self.mappings)
+        self.mappings.append(mapping)
+
+        request_pattern = mapping.get("request") or {}
+        method = (request_pattern.get("method") or ANY_METHOD).upper()
+        if request_pattern.get("url") is not None:
+            self._by_path[method][urlsplit(request_pattern["url"]).path].append(index)
+        elif request_pattern.get("urlPath") is not None:
+            self._by_path[method][request_pattern["urlPath"]].append(index)
+        else:
+            pattern = request_pattern.get("urlPattern") or request_pattern.get(
+                "urlPathPattern"
+            )
+            prefix, literals = regex_literals(pattern) if pattern else ("", [])
+            ngrams = {
+                literal[i : i + NGRAM]
+                for literal in literals
+                for i in range(len(literal) - NGRAM + 1)
+            }
+            if len(prefix) >= NGRAM or not ngrams:
+                self._by_prefix[method][prefix].append(index)
+            else:
+                # The least used n-gram keeps buckets small for regexes with common parts
+                by_ngram = self._by_ngram[method]
+                ngram = min(ngrams, key=lambda ngram: (len(by_ngram[ngram]), ngram))
+                by_ngram[ngram].append(index)
+
+    def _candidates(self, request: IncomingRequest) -> List[int]:
+        candidates = []
+        for method in {request.method, ANY_METHOD}:
+            candidates.extend(self._by_path[method].get(request.path, ()))
+            prefixes = self._by_prefix.get(method)
+            if prefixes:
+                for i in range(len(request.url) + 1):
+                    candidates.extend(prefixes.get(request.url[:i], ()))
+            ngrams = self._by_ngram.get(method)
+            if ngrams:
+                url = request.url
+                for ngram in {url[i : i + NGRAM] for i in range(len(url) - NGRAM + 1)}:
+                    candidates.extend(ngrams.get(ngram, ()))
+        return candidates
+
+    def _matched_indexes(self, request: IncomingRequest) -> List[int]:
+        matched = [
+            i
+            for i in set(self._candidates(request))
+            if match_request(self.mappings[i].get("request") or {}, request)
+        ]
+        matched.sort(key=self._preference)
+        return matched
+
+    def _preference(self, i: int) -> tuple:
+        return self.mappings[i].get("priority") or DEFAULT_PRIORITY, -i
+
+    def _same_method_indexes(self, i: int) -> List[int]:
+        """Mappings which may match requests of mapping `i` when it has no probe."""
+        method = _method(self.mappings[i])
+        same_method = [
+            j
+            for j, other in enumerate(self.mappings)
+            if ANY_METHOD in (method, _method(other)) or _method(other) == method
+        ]
+        return sorted(same_method, key=self._preference)
+
+    def matches(self, request: IncomingRequest) -> List[dict]:
+        """All mappings which match the request, in order of WireMock preference (the first one wins)."""
+        return [self.mappings[i] for i in self._matched_indexes(request)]
+
+    def predict(
+        self, method: str, url: str, headers: dict = None, body: str = ""
+    ) -> Optional[dict]:
+        """Mapping which WireMock will return for the request or None if nothing matches."""
+        matched = self.matches(IncomingRequest(method, url, headers=headers, body=body))
+        return matched[0] if matched else None
+
+    def conflicts(self, ambiguous_only: bool = False) -> List[Conflict]:
+        """Probe every mapping with a request it should match and report other mappings which match it too.
+
+        Every pair of mappings is reported once, by the probe of the mapping created earlier if both probes match.
+        A mapping whose regex can't be sampled has no probe (request of the conflict is None)
+        and is reported with every mapping of the same method.
+        """
+        conflicts = []
+        reported = set()
+        for i, mapping in enumerate(self.mappings):
+            request = probe_request(mapping.get("request") or {})
+            if request is None:
+                matched = self._same_method_indexes(i)
+            else:
+                matched = self._matched_indexes(request)
+            for j in matched:
+                pair = (min(i, j), max(i, j))
+                if j == i or pair in reported:
+                    continue
+                reported.add(pair)
+                # Pair in order of WireMock preference
+                pair_matched = [self.mappings[k] for k in matched if k in pair]
+                conflict = Conflict(mapping, request, pair_matched)
+                if not ambiguous_only or conflict.ambiguous:
+                    conflicts.append(conflict)
+        log.info(f"Found {len(conflicts)} conflicts in {len(self.mappings)} mappings")
+        return conflicts
@@ -1,49 +1,484 @@
+import hashlib
+import json
 import logging
+import os
+import re
+import uuid
+from functools import partial
+from itertools import count, islice
+from json.encoder import encode_basestring_ascii
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 
-from helpers.api.wiremock_api import WiremockApi
-from helpers.http_helper import HTTPHelper
+from helpers.delays import FAULTS, delay_percentile, validate_distribution
+
+if TYPE_CHECKING:
+    from helpers.api.wiremock_api import WiremockApi
 
 log = logging.getLogger(__name__)
 
+SYNC_NAMESPACE = uuid.UUID(
+    "5f0c3e0e-9d5b-4a44-9c2c-2d1f4f1b6a10"
+)  # For IDs of synced mappings
+CONTENT_HASH_KEY = "contentHash"  # Metadata key of synced mappings
+NAMESPACE_KEY = "namespace"  # Metadata key of namespace of mappings
+NAMESPACE_HEADER = "X-Mock-Namespace"  # Requests match only mappings of their namespace
+BODY_FILE_PREFIX = (
+    "body-"  # Body files uploaded by Mocker: body-<sha256 of content><extension>
+)
+BODY_FILE_CHUNK_SIZE = 64 * 1024
+
+_TEMPLATE_PARAM = re.compile(
+    r"\$\{(\w+)\}"
+)  # ${name} in string fields of MappingFactory template
+
 
 # Параметры запроса, по которому wiremock будет подбирать подходящую заглушку
 class Request(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     urlPath: str = None
-    method: str = HTTPHelper.POST
+    method: str = "POST"  # HTTPHelper.POST
     headers: dict = None
     urlPattern: str = None  # f".*{url}.*",
     queryParameters: dict = (
         None  # {"param_name": {"matches": f".*{param_value_pattern}.*"}}
     )
     bodyPatterns: list = None  # [{"matches": f".*{mapping.body_matcher}.*"}]
+    url: str = None  # Path with query, exact match
+    urlPathPattern: str = None
+    cookies: dict = None  # {"session": {"absent": true}}
 
 
 # Заглушка, которую должен вернуть wiremock
 class Response(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     body: str = None  # f"{json.dumps(mapping.response_data)}"
     jsonBody: dict = None
     status: int = 200
     headers: dict = {"Content-Type": "application/json"}
     transformers: list = None  # ["response-template"]
+    bodyFileName: str = None  # Файл тела ответа на сервере, см. Mocker.upload_body()
+    # Задержки и ошибки ответа, delay_percentile() - ожидаемая задержка для проверки
+    fixedDelayMilliseconds: int = None
+    delayDistribution: dict = None  # {"type": "lognormal", "median": 80, "sigma": 0.4} или {"type": "uniform", "lower": 0, "upper": 500}
+    chunkedDribbleDelay: dict = None  # {"numberOfChunks": 5, "totalDuration": 1000}
+    fault: str = None  # helpers.delays.FAULTS, ex: "EMPTY_RESPONSE"
+
+    @field_validator("delayDistribution")
+    @classmethod
+    def _check_distribution(cls, value):
+        if value is not None:
+            validate_distribution(value)
+        return value
+
+    @field_validator("fault")
+    @classmethod
+    def _check_fault(cls, value):
+        if value is not None and value not in FAULTS:
+            raise ValueError(f"Fault should be one of {FAULTS}")
+        return value
+
+    def delay_percentile(self, percent: float) -> float:
+        """Configured delay (seconds) before the response, which `percent` of responses shouldn't exceed."""
+        return delay_percentile(self.model_dump(), percent)
 
 
 # Маппинг - объект, который хранит взаимосвязь входящего запроса и соответствующего ему ответа от wiremock
 class Mapping(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     name: str
     request: Request
     response: Response
 
 
-class Mocker:
+class SerializedMapping(NamedTuple):
+    """Mapping content which is already serialized to JSON, see MappingFactory."""
+
+    id: str
+    name: str
+    data: bytes
+
+
+class MappingFactory:
+    """Fast creation of many similar mappings from one template.
+
+    The template is validated and serialized to JSON once, then variants are stamped out
+    by substitution of `${param}` placeholders in its string fields, without pydantic models.
+    Every variant gets unique `id` (the parameter name is reserved): random UUID of the factory
+    with the variant number in the last 12 hex digits, which is much cheaper than uuid4() per variant.
+
+    >>> factory = mocker.mapping_factory(
+    ...     Mapping(
+    ...         name="mapping ${i}",
+    ...         request=Request(method="GET", urlPath="/mapping/${i}"),
+    ...         response=Response(body="${body}"),
+    ...     )
+    ... )
+    >>> mocker.create_mappings(factory.build_many({"i": i, "body": "ok"} for i in range(100_000)))
+    """
+
+    def __init__(self, template: Mapping, prepare: Callable[[dict], dict] = None):
+        """
+        :param prepare: transformation of the template content before serialization (see Mocker.mapping_factory)
+        """
+        content = template.model_dump()
+        content["id"] = "${id}"
+        if prepare:
+            content = prepare(content)
+        # Even items are JSON literals, odd ones are parameter names
+        self._segments = _TEMPLATE_PARAM.split(json.dumps(content))
+        self._name_segments = _TEMPLATE_PARAM.split(template.name)
+        self.params = set(self._segments[1::2]) - {"id"}
+        self._id_prefix = str(uuid.uuid4())[:-12]
+        self._counter = count()
+
+    def build(self, **params) -> SerializedMapping:
+        missing = self.params - params.keys()
+        if missing:
+            raise ValueError(f"Missing mapping parameters: {sorted(missing)}")
+        params["id"] = f"{self._id_prefix}{next(self._counter):012x}"
+
+        segments = list(self._segments)
+        for i in range(1, len(segments), 2):
+            # Value is escaped as a part of JSON string
+            segments[i] = encode_basestring_ascii(str(params[segments[i]]))[1:-1]
+        name = list(self._name_segments)
+        for i in range(1, len(name), 2):
+            name[i] = str(params[name[i]])
+        return SerializedMapping(
+            id=params["id"], name="".join(name), data="".join(segments).encode()
+        )
+
+    def build_many(self, params: Iterable[dict]) -> Iterable[SerializedMapping]:
+        return (self.build(**p) for p in params)
+
+
+class ImportResult:
+    """Result of bulk mappings creation.
+
+    `ids` are in the same order as input mappings (None for mappings from failed chunks),
+    `failures` - list of (chunk_start_index, mapping_names, error).
+    """
+
     def __init__(self):
-        self.api = WiremockApi()
+        self.ids: List[str] = []
+        self.failures: list = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+class SyncResult:
+    """IDs of mappings which were created/updated/deleted by Mocker.sync()."""
+
+    def __init__(self):
+        self.created: List[str] = []
+        self.updated: List[str] = []
+        self.deleted: List[str] = []
+        self.unchanged = 0
+        self.import_result: Optional[ImportResult] = None
+
+    def __repr__(self):
+        return (
+            f"SyncResult(created={len(self.created)}, updated={len(self.updated)}, "
+            f"deleted={len(self.deleted)}, unchanged={self.unchanged})"
+        )
+
+
+class Mocker:
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = None,
+        namespace: str = None,
+        body_file_threshold: int = None,
+    ):
+        """
+        :param port: WireMock port, WiremockApi.DEFAULT_PORT by default.
+        :param namespace: if set, all mappings are tagged with it and match only requests
+            with the header `X-Mock-Namespace: <namespace>` (see `namespace_headers`).
+            Ex: pytest-xdist worker ID, so parallel workers don't match and delete stubs of each other.
+        :param body_file_threshold: if set, response bodies of this size (bytes) and larger are uploaded
+            as body files (see upload_body()) and mappings refer to them instead of inlined bodies.
+        """
+        # Imported here, so models can be used without requests/urllib3 (ex: offline rendering, analysis)
+        from helpers.api.wiremock_api import WiremockApi
+
+        self.api: "WiremockApi" = WiremockApi(host=host, port=port)
+        self.namespace = namespace
+        self.body_file_threshold = body_file_threshold
+        self._body_files: Optional[set] = None  # Names of body files on the server
+
+    @property
+    def namespace_headers(self) -> dict:
+        """Headers which requests to stubs of this Mocker should have."""
+        return {NAMESPACE_HEADER: self.namespace} if self.namespace else {}
+
+    def delete_namespace_mappings(self):
+        """Delete all mappings of the namespace in one request."""
+        if not self.namespace:
+            raise ValueError("Mocker has no namespace")
+        self.api.remove_mappings_by_metadata(
+            {
+                "matchesJsonPath": {
+                    "expression": f"$.{NAMESPACE_KEY}",
+                    "equalTo": self.namespace,
+                }
+            }
+        )
+        log.info(f"Mappings of namespace '{self.namespace}' were deleted")
+
+    def close(self):
+        self.api.close()
 
     def create_mapping(self, mapping: Mapping):
         log.info(f"Creating mapping with name '{mapping.name}'")
-        if mapping.response.body:
-            mapping.response.body = f'"{mapping.response.body}"'
-        mapping_id = self.api.post_mapping(content=mapping.model_dump())
+        mapping_id = self.api.post_mapping(
+            content=self._prepare_content(mapping.model_dump())
+        )
         log.info(f"Mapping '{mapping.name}' was created: ID={mapping_id}")
         return mapping_id
+
+    def mapping_factory(self, template: Mapping) -> MappingFactory:
+        """MappingFactory which variants are prepared like in create_mapping() (including namespace).
+
+        Template bodies have placeholders, so they are never uploaded as body files.
+        """
+        return MappingFactory(
+            template, prepare=partial(self._prepare_content, body_files=False)
+        )
+
+    def upload_body(self, source: Union[str, bytes], extension: str = None) -> str:
+        """Upload response body once and return its name for `Response.bodyFileName`.
+
+        `source` is a path of file (streamed from disk, not read into memory) or the body itself.
+        File name is derived from the content hash, so the same body is uploaded only once
+        and any number of mappings refer to it.
+
+        >>> mapping.response.bodyFileName = mocker.upload_body("fixtures/large.json")
+        """
+        if isinstance(source, bytes):
+            digest = hashlib.sha256(source).hexdigest()
+        else:
+            sha256 = hashlib.sha256()
+            with open(source, "rb") as f:
+                for chunk in iter(partial(f.read, BODY_FILE_CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+            if extension is None:
+                extension = os.path.splitext(source)[1]
+        name = f"{BODY_FILE_PREFIX}{digest}{extension or ''}"
+
+        if self._body_files is None:
+            self._body_files = set(self.api.get_files())
+        if name in self._body_files:
+            log.info(f"Body file '{name}' is already uploaded")
+            return name
+        if isinstance(source, bytes):
+            self.api.put_file(name, source)
+        else:
+            with open(source, "rb") as f:
+                self.api.put_file(name, f)
+        self._body_files.add(name)
+        log.info(f"Body file '{name}' was uploaded")
+        return name
+
+    def delete_unused_body_files(self) -> List[str]:
+        """Delete body files uploaded by upload_body() which no mapping refers to, return their names.
+
+        Mappings of all namespaces are checked, but don't call it while other clients create mappings:
+        a file can be uploaded by them and not referenced yet.
+        """
+        # Mappings cache isn't invalidated by other clients, so they are read from the server
+        used = {
+            (mapping.get("response") or {}).get("bodyFileName")
+            for mapping in self.api.get_mappings(cached=False)["mappings"]
+        }
+        deleted = []
+        for name in self.api.get_files():
+            if name.startswith(BODY_FILE_PREFIX) and name not in used:
+                self.api.delete_file(name)
+                deleted.append(name)
+        if self._body_files is not None:
+            self._body_files.difference_update(deleted)
+        log.info(f"Deleted {len(deleted)} unused body files")
+        return deleted
+
+    def create_mappings(
+        self,
+        mappings: Iterable[Union[Mapping, SerializedMapping]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> ImportResult:
+        """Create mappings via /__admin/mappings/import in chunks of `batch_size`.
+
+        Mappings are Mapping objects or variants from mapping_factory(), which are sent as is.
+        Caller's Mapping objects are not modified. A failed chunk is logged and reported in the result,
+        the other chunks are still imported.
+        """
+        return self._import_contents(
+            (
+                mapping
+                if isinstance(mapping, SerializedMapping)
+                else self._to_content(mapping)
+                for mapping in mappings
+            ),
+            batch_size,
+        )
+
+    def _import_contents(
+        self,
+        contents: Iterable[Union[dict, SerializedMapping]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> ImportResult:
+        result = ImportResult()
+        contents = iter(contents)
+        start = 0
+        while chunk := list(islice(contents, batch_size)):
+            ids = [_content_field(content, "id") for content in chunk]
+            try:
+                self.api.import_mappings(
+                    [
+                        content.data
+                        if isinstance(content, SerializedMapping)
+                        else content
+                        for content in chunk
+                    ]
+                )
+            except Exception as e:
+                names = [_content_field(content, "name") for content in chunk]
+                log.error(
+                    f"Mappings import failed for chunk [{start}:{start + len(chunk)}]: {e}"
+                )
+                result.failures.append((start, names, e))
+                ids = [None] * len(chunk)
+            result.ids.extend(ids)
+            start += len(chunk)
+        log.info(f"Imported {start - result.ids.count(None)} of {start} mappings")
+        return result
+
+    def sync(
+        self,
+        mappings: Iterable[Mapping],
+        delete_unknown: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> SyncResult:
+        """Converge mappings on the server to `mappings` sending only changed ones.
+
+        Every mapping gets ID derived from its name and content hash in metadata,
+        so after fetching the server state once only new mappings are imported, changed ones are PUT
+        and (if `delete_unknown`) synced earlier mappings which are absent in `mappings` are deleted.
+        Mappings created not by sync are left untouched. Mapping names should be unique.
+        """
+        contents = {}
+        for mapping in mappings:
+            content = self._to_content(mapping)
+            content["id"] = str(
+                uuid.uuid5(SYNC_NAMESPACE, f"{self.namespace or ''}/{mapping.name}")
+            )
+            if content["id"] in contents:
+                raise ValueError(f"Mapping name '{mapping.name}' is not unique")
+            content["metadata"] = {
+                **(content.get("metadata") or {}),
+                CONTENT_HASH_KEY: self.content_hash(mapping),
+            }
+            contents[content["id"]] = content
+
+        server_hashes = {}
+        for server_mapping in self.api.get_mappings()["mappings"]:
+            metadata = server_mapping.get("metadata") or {}
+            if metadata.get(NAMESPACE_KEY) == self.namespace:
+                server_hashes[server_mapping["id"]] = metadata.get(CONTENT_HASH_KEY)
+
+        result = SyncResult()
+        to_create = []
+        for id, content in contents.items():
+            if id not in server_hashes:
+                to_create.append(content)
+            elif server_hashes[id] != content["metadata"][CONTENT_HASH_KEY]:
+                self.api.put_mapping(id, content)
+                result.updated.append(id)
+            else:
+                result.unchanged += 1
+        if to_create:
+            result.import_result = self._import_contents(to_create, batch_size)
+            result.created = [id for id in result.import_result.ids if id]
+
+        if delete_unknown:
+            for id, content_hash in server_hashes.items():
+                if content_hash and id not in contents:
+                    self.api.delete_mapping(id)
+                    result.deleted.append(id)
+        log.info(f"Mappings were synced: {result}")
+        return result
+
+    @staticmethod
+    def content_hash(mapping: Mapping) -> str:
+        """Stable hash of mapping content."""
+        dump = json.dumps(mapping.model_dump(), sort_keys=True, default=str)
+        return hashlib.sha256(dump.encode()).hexdigest()
+
+    def _to_content(self, mapping: Mapping) -> dict:
+        content = mapping.model_dump()
+        content["id"] = str(uuid.uuid4())
+        return self._prepare_content(content)
+
+    def _prepare_content(self, content: dict, body_files: bool = True) -> dict:
+        """Content of mapping as it's sent to WireMock: string body in quotes and namespace applied.
+
+        Large bodies are replaced by body files (see `body_file_threshold`) if `body_files`.
+        """
+        if content["response"].get("body"):
+            content["response"]["body"] = f'"{content["response"]["body"]}"'
+        if body_files and self.body_file_threshold is not None:
+            content["response"] = self._to_body_file(content["response"])
+        return self._apply_namespace(content)
+
+    def _to_body_file(self, response: dict) -> dict:
+        if response.get("jsonBody") is not None:
+            field, extension = "jsonBody", ".json"
+            data = json.dumps(response["jsonBody"]).encode()
+        elif response.get("body"):
+            field, extension = "body", ""
+            data = response["body"].encode()
+        else:
+            return response
+        if len(data) < self.body_file_threshold:
+            return response
+        return {
+            **response,
+            field: None,
+            "bodyFileName": self.upload_body(data, extension=extension),
+        }
+
+    def _apply_namespace(self, content: dict) -> dict:
+        if not self.namespace:
+            return content
+        content["metadata"] = {
+            **(content.get("metadata") or {}),
+            NAMESPACE_KEY: self.namespace,
+        }
+        content["request"] = dict(content["request"])
+        content["request"]["headers"] = {
+            **(content["request"].get("headers") or {}),
+            NAMESPACE_HEADER: {"equalTo": self.namespace},
+        }
+        return content
+
+
+def _content_field(content: Union[dict, SerializedMapping], field: str) -> str:
+    if isinstance(content, SerializedMapping):
+        return getattr(content, field)
+    return content[field]
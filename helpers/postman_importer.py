@@ -0,0 +1,256 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from functools import partial
+from typing import Iterator, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from helpers.delays import delay_percentile
+from helpers.mapping_analyzer import MappingAnalyzer
+from helpers.mocker import Mapping, Request, Response
+from helpers.request_matcher import IncomingRequest
+from helpers.streamed_response import iter_json_items
+
+log = logging.getLogger(__name__)
+
+MAPPING_PREFIXES = ("[stub]", "[mapping]")
+CHECK_PREFIX = "[check"  # [check], [check success], ...
+SCENARIO_PREFIX = "[scenario"  # Stateful scenarios aren't imported
+ADMIN_MAPPINGS_PATH = "/__admin/mappings"
+CHUNK_SIZE = 64 * 1024
+SLOW_DELAY = 1  # Seconds of configured delay (p99) which make a case slow
+CACHE_VERSION = 2  # Increment when format of compiled cases is changed
+
+# Postman allows comments in raw JSON bodies, strings are matched to keep "//" inside them
+_JSON_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+# Fields of mapping JSON which aren't used by stubs themselves
+_IGNORED_MAPPING_FIELDS = {"id", "uuid", "name", "persistent", "metadata"}
+
+
+class PostmanCase(NamedTuple):
+    """Case for pytest-cases: mapping from a [stub]/[mapping] request and a [check] request which it answers.
+
+    `expected_response` is what HTTPHelper.requester() returns for the check request
+    (None if it can't be known in advance, ex: response templating).
+    `slow` - the stub delays the response for seconds.
+    """
+
+    id: str
+    mapping: Mapping
+    check_request: dict
+    expected_response: object
+    requires_wiremock: bool
+    slow: bool = False
+
+    def to_dict(self) -> dict:
+        return {**self._asdict(), "mapping": self.mapping.model_dump()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PostmanCase":
+        # Cached mappings were validated on compilation
+        mapping = data["mapping"]
+        data = {
+            **data,
+            "mapping": Mapping.model_construct(
+                name=mapping["name"],
+                request=Request.model_construct(**mapping["request"]),
+                response=Response.model_construct(**mapping["response"]),
+            ),
+        }
+        return cls(**data)
+
+
+def cache_key(path: str) -> str:
+    """Hash of the collection file and of fields of mapping models, which decide what can be imported."""
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(partial(f.read, CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    for model in (Mapping, Request, Response):
+        sha256.update(",".join(model.model_fields).encode())
+    return sha256.hexdigest()
+
+
+def load_postman_cases(path: str, cache_dir: str = None) -> List[PostmanCase]:
+    """Cases of Postman collection, compiled cases are cached in `cache_dir` by hash of the collection file.
+
+    >>> cases = load_postman_cases("wiremock-demo.postman_collection.json", cache_dir=".pytest_cache/postman")
+    """
+    if not cache_dir:
+        return list(iter_postman_cases(path))
+
+    cache_path = os.path.join(
+        cache_dir, f"postman-v{CACHE_VERSION}-{cache_key(path)}.json"
+    )
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cases = [PostmanCase.from_dict(data) for data in json.load(f)]
+        log.info(f"{len(cases)} Postman cases were loaded from cache {cache_path}")
+        return cases
+
+    cases = list(iter_postman_cases(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written to a temporary file first, so parallel sessions never read a partial cache
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump([case.to_dict() for case in cases], f)
+    os.replace(tmp_path, cache_path)
+    log.info(f"{len(cases)} Postman cases were compiled to cache {cache_path}")
+    return cases
+
+
+def iter_postman_cases(path: str) -> Iterator[PostmanCase]:
+    """Cases of Postman collection: folders are decoded one by one from the file, not the whole collection."""
+    with open(path, "rb") as f:
+        chunks = iter(partial(f.read, CHUNK_SIZE), b"")
+        root = []  # Requests at the top level of the collection
+        for item in iter_json_items(chunks, key="item"):
+            if "item" in item:
+                yield from _folder_cases(item["item"], prefix=item["name"])
+            else:
+                root.append(item)
+        yield from _folder_cases(root, prefix="")
+
+
+def _folder_cases(items: list, prefix: str) -> Iterator[PostmanCase]:
+    """Every [check] request is paired with the mapping WireMock would answer it with among preceding mappings.
+
+    Mappings, checks and scenario requests which can't be imported are skipped with a warning.
+    """
+    analyzer = MappingAnalyzer(())
+    mappings = {}  # id(mapping content) -> Mapping, validated once it's needed
+    for item in items:
+        name = item["name"].strip()
+        if "item" in item:
+            yield from _folder_cases(item["item"], prefix=f"{prefix} {name}".strip())
+            continue
+        request = item.get("request") or {}
+        if name.startswith(MAPPING_PREFIXES):
+            content = _mapping_content(name, request)
+            if content is not None:
+                analyzer.add(content)
+        elif name.startswith(CHECK_PREFIX):
+            check_request = _check_request(request)
+            if check_request is None:
+                log.warning(
+                    f"Postman request '{name}' isn't a request to a stub, skipped"
+                )
+                continue
+            matched = analyzer.matches(
+                IncomingRequest(
+                    check_request["method"],
+                    check_request["rel_url"],
+                    headers=check_request.get("headers"),
+                    body=check_request.get("data", ""),
+                )
+            )
+            if not matched:
+                log.warning(
+                    f"Postman request '{name}' doesn't match any mapping, skipped"
+                )
+                continue
+            content = matched[0]
+            if id(content) not in mappings:
+                mappings[id(content)] = Mapping.model_validate(content)
+            response = content.get("response") or {}
+            yield PostmanCase(
+                id=f"Postman {prefix} {name}".strip(),
+                mapping=mappings[id(content)],
+                check_request=check_request,
+                expected_response=_expected_response(response),
+                requires_wiremock=bool(response.get("transformers")),
+                slow=_is_slow(response),
+            )
+        elif name.startswith(SCENARIO_PREFIX):
+            log.warning(f"Postman scenario request '{name}' isn't supported, skipped")
+
+
+def _mapping_content(name: str, request: dict) -> Optional[dict]:
+    """Mapping from the body of POST /__admin/mappings request or None if it can't be used."""
+    if request.get("method") != "POST" or _url_path(request) != ADMIN_MAPPINGS_PATH:
+        log.warning(
+            f"Mapping '{name}' isn't created by POST {ADMIN_MAPPINGS_PATH}, skipped"
+        )
+        return None
+    try:
+        content = json.loads(
+            _strip_comments((request.get("body") or {}).get("raw") or "")
+        )
+    except ValueError:
+        log.warning(f"Postman request '{name}' has invalid mapping JSON, skipped")
+        return None
+    unsupported = (
+        (content.keys() - Mapping.model_fields.keys() - _IGNORED_MAPPING_FIELDS)
+        | (content.get("request", {}).keys() - Request.model_fields.keys())
+        | (content.get("response", {}).keys() - Response.model_fields.keys())
+    )
+    if unsupported:
+        log.warning(
+            f"Mapping '{name}' has unsupported fields {sorted(unsupported)}, skipped"
+        )
+        return None
+    return {**content, "name": name}
+
+
+def _check_request(request: dict) -> Optional[dict]:
+    """HTTPHelper.requester() kwargs of Postman request or None if it isn't a request to a stub."""
+    url = _raw_url(request)
+    split_url = urlsplit(url)
+    path = split_url.path or "/"
+    if "{{" in url or path.startswith("/__admin"):
+        return None
+    check_request = dict(
+        method=request.get("method") or "GET",
+        rel_url=f"{path}?{split_url.query}" if split_url.query else path,
+    )
+    headers = {
+        header["key"]: header["value"]
+        for header in request.get("header") or []
+        if not header.get("disabled")
+    }
+    if headers:
+        check_request["headers"] = headers
+    body = (request.get("body") or {}).get("raw")
+    if body:
+        check_request["data"] = body
+    return check_request
+
+
+def _is_slow(response: dict) -> bool:
+    dribble = response.get("chunkedDribbleDelay") or {}
+    delay = delay_percentile(response, 99) + dribble.get("totalDuration", 0) / 1000
+    return delay >= SLOW_DELAY
+
+
+def _expected_response(response: dict):
+    if response.get("fault"):
+        return None
+    if response.get("transformers") or (response.get("status") or 200) >= 300:
+        return None
+    if response.get("jsonBody") is not None:
+        return response["jsonBody"]
+    if response.get("body"):
+        # Mocker sends string body in quotes, so it's parsed as JSON string
+        try:
+            return json.loads(f'"{response["body"]}"')
+        except ValueError:
+            return None
+    return None
+
+
+def _raw_url(request: dict) -> str:
+    url = request.get("url") or ""
+    return url.get("raw", "") if isinstance(url, dict) else url
+
+
+def _url_path(request: dict) -> str:
+    return urlsplit(_raw_url(request)).path.rstrip("/") or "/"
+
+
+def _strip_comments(text: str) -> str:
+    return _JSON_COMMENT.sub(
+        lambda m: m.group(0) if m.group(0).startswith('"') else "", text
+    )
@@ -0,0 +1,94 @@
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from helpers.request_matcher import IncomingRequest, match_request
+
+if TYPE_CHECKING:
+    from helpers.stub_server import StubResponse
+
+
+def format_logged_date(logged_date: int) -> str:
+    """ISO 8601 string of journal timestamp (milliseconds since epoch), as WireMock `loggedDateString`."""
+    date = datetime.fromtimestamp(logged_date / 1000, tz=timezone.utc)
+    return date.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def parse_logged_date(value: str) -> int:
+    return round(
+        datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000
+    )
+
+
+class RequestJournal:
+    """Log of stubbed requests (admin API calls aren't logged), the oldest entries are dropped above `max_entries`."""
+
+    def __init__(self, max_entries: int = None):
+        # (WireMock-like entry, request for matching by request patterns)
+        self._entries = deque(maxlen=max_entries)
+        self._by_id: Dict[str, dict] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def log(
+        self,
+        request: IncomingRequest,
+        response: "StubResponse",
+        mapping: Optional[dict],
+        headers: dict,
+    ) -> dict:
+        logged_date = int(time.time() * 1000)
+        entry = {
+            "id": str(uuid.uuid4()),
+            "request": {
+                "url": request.url,
+                "method": request.method,
+                "headers": headers,
+                "body": request.body,
+                "loggedDate": logged_date,
+                "loggedDateString": format_logged_date(logged_date),
+            },
+            "responseDefinition": {"status": response.status},
+            "wasMatched": mapping is not None,
+        }
+        if mapping is not None:
+            entry["stubMapping"] = {"id": mapping["id"], "name": mapping.get("name")}
+        if len(self._entries) == self._entries.maxlen:
+            self._by_id.pop(self._entries[0][0]["id"], None)
+        self._entries.append((entry, request))
+        self._by_id[entry["id"]] = entry
+        return entry
+
+    def get(self, id: str) -> Optional[dict]:
+        return self._by_id.get(id)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_id.clear()
+
+    def since(self, since: int = None, limit: int = None) -> List[dict]:
+        """Entries logged after `since` (milliseconds), the newest first."""
+        result = []
+        for entry, _ in reversed(self._entries):
+            if limit is not None and len(result) >= limit:
+                break
+            if since is not None and entry["request"]["loggedDate"] <= since:
+                break
+            result.append(entry)
+        return result
+
+    def count(self, request_pattern: dict) -> int:
+        return sum(
+            1 for _, request in self._entries if match_request(request_pattern, request)
+        )
+
+    def find(self, request_pattern: dict) -> List[dict]:
+        """Logged requests which match the request pattern, the oldest first."""
+        return [
+            entry["request"]
+            for entry, request in self._entries
+            if match_request(request_pattern, request)
+        ]
@@ -0,0 +1,195 @@
+import json
+import logging
+import re
+from functools import lru_cache
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+log = logging.getLogger(__name__)
+
+ANY_METHOD = "ANY"
+DEFAULT_PRIORITY = 5  # Priority of mappings without `priority`, as in WireMock
+
+
+@lru_cache(maxsize=4096)
+def _regex(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.DOTALL)
+
+
+class IncomingRequest:
+    """Request received by a stub, in the form which is convenient for matching."""
+
+    __slots__ = ("method", "url", "path", "query", "headers", "body")
+
+    def __init__(
+        self, method: str, url: str, headers: Dict[str, str] = None, body: str = ""
+    ):
+        self.method = method.upper()
+        self.url = url
+        split_url = urlsplit(url)
+        self.path = split_url.path
+        self.query: Dict[str, List[str]] = parse_qs(
+            split_url.query, keep_blank_values=True
+        )
+        # Header names are case-insensitive
+        self.headers: Dict[str, str] = {
+            name.lower(): value for name, value in (headers or {}).items()
+        }
+        self.body = body or ""
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        cookie = SimpleCookie()
+        cookie.load(self.headers.get("cookie", ""))
+        return {name: morsel.value for name, morsel in cookie.items()}
+
+    def __repr__(self):
+        return f"IncomingRequest({self.method} {self.url})"
+
+
+def match_value(pattern: dict, value: Optional[str]) -> bool:
+    """Match value by WireMock string value pattern, ex: {"equalTo": "1"}, {"matches": ".*"}, {"absent": true}."""
+    if "absent" in pattern:
+        return (value is None) == bool(pattern["absent"])
+    if value is None:
+        return False
+    if "equalTo" in pattern:
+        if pattern.get("caseInsensitive"):
+            return value.lower() == str(pattern["equalTo"]).lower()
+        return value == str(pattern["equalTo"])
+    if "contains" in pattern:
+        return str(pattern["contains"]) in value
+    if "doesNotContain" in pattern:
+        return str(pattern["doesNotContain"]) not in value
+    if "matches" in pattern:
+        return bool(_regex(pattern["matches"]).fullmatch(value))
+    if "doesNotMatch" in pattern:
+        return not _regex(pattern["doesNotMatch"]).fullmatch(value)
+    if "equalToJson" in pattern:
+        return _match_json(pattern, value)
+    if "matchesJsonPath" in pattern:
+        return _match_json_path(pattern["matchesJsonPath"], value)
+    if "and" in pattern:
+        return all(match_value(p, value) for p in pattern["and"])
+    if "or" in pattern:
+        return any(match_value(p, value) for p in pattern["or"])
+    log.warning(f"Unsupported value pattern: {pattern}")
+    return False
+
+
+def _match_json(pattern: dict, value: str) -> bool:
+    expected = pattern["equalToJson"]
+    if isinstance(expected, str):
+        expected = json.loads(expected)
+    try:
+        actual = json.loads(value)
+    except ValueError:
+        return False
+    return _json_equal(
+        expected,
+        actual,
+        ignore_array_order=pattern.get("ignoreArrayOrder", False),
+        ignore_extra_elements=pattern.get("ignoreExtraElements", False),
+    )
+
+
+_MISSING = object()
+
+
+def _match_json_path(pattern, value: str) -> bool:
+    """Only simple paths are supported: $.a.b, $.a[0].b"""
+    expression = pattern["expression"] if isinstance(pattern, dict) else pattern
+    try:
+        data = json.loads(value)
+    except ValueError:
+        return False
+    for key in re.findall(r"[^.\[\]$]+", expression):
+        if isinstance(data, list) and key.isdigit() and int(key) < len(data):
+            data = data[int(key)]
+        elif isinstance(data, dict) and key in data:
+            data = data[key]
+        else:
+            return False
+    if not isinstance(pattern, dict):
+        return True
+    value_pattern = {k: v for k, v in pattern.items() if k != "expression"}
+    if not value_pattern:
+        return True
+    return match_value(
+        value_pattern, data if isinstance(data, str) else json.dumps(data)
+    )
+
+
+def _json_equal(expected, actual, ignore_array_order, ignore_extra_elements) -> bool:
+    if isinstance(expected, dict):
+        if not isinstance(actual, dict):
+            return False
+        if not ignore_extra_elements and expected.keys() != actual.keys():
+            return False
+        return all(
+            key in actual
+            and _json_equal(
+                value, actual[key], ignore_array_order, ignore_extra_elements
+            )
+            for key, value in expected.items()
+        )
+    if isinstance(expected, list):
+        if not isinstance(actual, list) or len(expected) != len(actual):
+            return False
+        if not ignore_array_order:
+            return all(
+                _json_equal(e, a, ignore_array_order, ignore_extra_elements)
+                for e, a in zip(expected, actual)
+            )
+        remaining = list(actual)
+        for e in expected:
+            for i, a in enumerate(remaining):
+                if _json_equal(e, a, ignore_array_order, ignore_extra_elements):
+                    del remaining[i]
+                    break
+            else:
+                return False
+        return True
+    return expected == actual
+
+
+def match_url(request_pattern: dict, request: IncomingRequest) -> bool:
+    if request_pattern.get("url") is not None:
+        return request.url == request_pattern["url"]
+    if request_pattern.get("urlPath") is not None:
+        return request.path == request_pattern["urlPath"]
+    if request_pattern.get("urlPattern") is not None:
+        return bool(_regex(request_pattern["urlPattern"]).fullmatch(request.url))
+    if request_pattern.get("urlPathPattern") is not None:
+        return bool(_regex(request_pattern["urlPathPattern"]).fullmatch(request.path))
+    return True
+
+
+def match_request(request_pattern: dict, request: IncomingRequest) -> bool:
+    """Check if request matches `request` part of WireMock mapping (Mapping.request.model_dump())."""
+    method = request_pattern.get("method") or ANY_METHOD
+    if method != ANY_METHOD and method.upper() != request.method:
+        return False
+    if not match_url(request_pattern, request):
+        return False
+
+    for name, pattern in (request_pattern.get("queryParameters") or {}).items():
+        values = request.query.get(name) or [None]
+        if not any(match_value(pattern, value) for value in values):
+            return False
+
+    for name, pattern in (request_pattern.get("headers") or {}).items():
+        if not match_value(pattern, request.headers.get(name.lower())):
+            return False
+
+    if request_pattern.get("cookies"):
+        cookies = request.cookies
+        for name, pattern in request_pattern["cookies"].items():
+            if not match_value(pattern, cookies.get(name)):
+                return False
+
+    for pattern in request_pattern.get("bodyPatterns") or []:
+        if not match_value(pattern, request.body):
+            return False
+    return True
@@ -0,0 +1,646 @@
+import json
+import logging
+import operator
+import random
+import re
+import string
+import uuid
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List
+
+from helpers.mocker import Mapping
+from helpers.request_matcher import IncomingRequest
+
+log = logging.getLogger(__name__)
+
+RESPONSE_TEMPLATE = "response-template"
+DEFAULT_BASE_URL = "http://localhost:8080"
+TEMPLATE_CACHE_SIZE = 4096
+
+# Handlebars tags: comment which can contain "}}", triple-stash (not escaped), double-stash
+_TAG = re.compile(r"\{\{!--.*?--\}\}|\{\{\{(.*?)\}\}\}|\{\{(.*?)\}\}", re.DOTALL)
+_TOKEN = re.compile(
+    r"""\s*(?:(?P<open>\()|(?P<close>\))|'(?P<single>(?:[^'\\]|\\.)*)'|"(?P<double>(?:[^"\\]|\\.)*)"|"""
+    r"""as\s+\|(?P<block_params>[^|]*)\||(?P<key>[\w@-]+)=|(?P<word>[^\s()]+))"""
+)
+_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+_WORD_START = re.compile(r"(^|\s)(\S)")
+# HTML escaping of {{...}} values, as WireMock does it
+_ESCAPES = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "'": "&#x27;",
+        "`": "&#x60;",
+    }
+)
+_LITERALS = {"true": True, "false": False, "null": None, "undefined": None}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class _Scope:
+    """Lookup of template names: block params and `this` of blocks (innermost first), then assigned variables."""
+
+    __slots__ = ("frames", "variables")
+
+    def __init__(self, context: dict):
+        self.frames: List[dict] = [{"this": context}]
+        self.variables: Dict[str, object] = {}
+
+    @property
+    def this(self):
+        return self.frames[-1]["this"]
+
+    def lookup(self, parts: List[str]):
+        head, *tail = parts
+        if head == "this":
+            value = self.this
+        else:
+            for frame in reversed(self.frames):
+                if head in frame:
+                    value = frame[head]
+                    break
+                this = frame["this"]
+                if isinstance(this, dict) and head in this:
+                    value = this[head]
+                    break
+            else:
+                value = self.variables.get(head)
+        for key in tail:
+            value = _get(value, key)
+        return value
+
+
+def _get(value, key: str):
+    if isinstance(value, dict):
+        return value.get(key)
+    if isinstance(value, (list, tuple)) and key.lstrip("-").isdigit():
+        index = int(key)
+        return value[index] if -len(value) <= index < len(value) else None
+    return None
+
+
+def _to_str(value) -> str:
+    """String of value as WireMock (Java) renders it."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return f"[{', '.join(_to_str(v) for v in value)}]"
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def _truthy(value) -> bool:
+    if isinstance(value, str):
+        return value != ""
+    return bool(value)
+
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    text = _to_str(value).strip()
+    if not _NUMBER.fullmatch(text):
+        raise TemplateError(f"Not a number: {value!r}")
+    return float(text) if "." in text else int(text)
+
+
+def _comparable(a, b):
+    try:
+        return _number(a), _number(b)
+    except TemplateError:
+        return _to_str(a), _to_str(b)
+
+
+def _conditional(check: Callable) -> Callable:
+    """Helper which returns `yes`/`no` hash values if they are passed, like eq, gt."""
+
+    def helper(scope, params, hash):
+        result = check(*params)
+        return hash.get("yes", True) if result else hash.get("no", False)
+
+    return helper
+
+
+def _comparison(compare: Callable) -> Callable:
+    """Conditional helper which compares numbers (or numeric strings) as numbers, other values as strings."""
+    return _conditional(lambda a, b: compare(*_comparable(a, b)))
+
+
+def _math(scope, params, hash):
+    if len(params) != 3:
+        raise TemplateError("math needs 3 parameters: {{math a '+' b}}")
+    a, sign, b = params
+    a, b = _number(a), _number(b)
+    if sign == "+":
+        result = a + b
+    elif sign == "-":
+        result = a - b
+    elif sign == "*":
+        result = a * b
+    elif sign == "/":
+        result = a / b
+    elif sign == "%":
+        result = a % b
+    else:
+        raise TemplateError(f"Unknown math operator: {sign!r}")
+    return int(result) if float(result).is_integer() else result
+
+
+def _val(scope, params, hash):
+    value = params[0] if params else None
+    if value is None:
+        value = hash.get("default")
+    if hash.get("assign"):
+        scope.variables[hash["assign"]] = value
+        return ""
+    return value
+
+
+def _parse_json(scope, params, hash):
+    value = json.loads(_to_str(params[0]))
+    if len(params) > 1:
+        scope.variables[params[1]] = value
+        return ""
+    return value
+
+
+def _json_path(scope, params, hash):
+    """Only simple paths are supported: $.a.b, $.a[0].b"""
+    data, expression = params
+    if isinstance(data, str):
+        data = json.loads(data)
+    for key in re.findall(r"[^.\[\]$]+", expression):
+        data = _get(data, key)
+    return data
+
+
+def _abbreviate(value, width):
+    value, width = _to_str(value), int(width)
+    return value if len(value) <= width else f"{value[: width - 3]}..."
+
+
+def _random_value(scope, params, hash):
+    kind = hash.get("type", "ALPHANUMERIC")
+    if kind == "UUID":
+        return str(uuid.uuid4())
+    alphabets = {
+        "ALPHANUMERIC": string.ascii_letters + string.digits,
+        "ALPHABETIC": string.ascii_letters,
+        "NUMERIC": string.digits,
+        "HEXADECIMAL": string.hexdigits[:16],
+        "ALPHANUMERIC_AND_SYMBOLS": string.ascii_letters
+        + string.digits
+        + string.punctuation,
+    }
+    if kind not in alphabets:
+        raise TemplateError(f"Unknown randomValue type: {kind!r}")
+    value = "".join(random.choices(alphabets[kind], k=int(hash.get("length", 36))))
+    return value.upper() if hash.get("uppercase") else value
+
+
+def _pick_random(scope, params, hash):
+    items = params[0] if len(params) == 1 and isinstance(params[0], list) else params
+    if "count" in hash:
+        return random.sample(items, int(hash["count"]))
+    return random.choice(items)
+
+
+def _simple(function: Callable) -> Callable:
+    """Helper which uses only positional params."""
+    return lambda scope, params, hash: function(*params)
+
+
+# Helpers of WireMock (Handlebars.java) which are supported: (scope, params, hash) -> value
+HELPERS: Dict[str, Callable] = {
+    "if": lambda scope, params, hash: params[0] if params else scope.this,
+    "unless": lambda scope, params, hash: not _truthy(params[0]),
+    "eq": _comparison(operator.eq),
+    "neq": _comparison(operator.ne),
+    "gt": _comparison(operator.gt),
+    "gte": _comparison(operator.ge),
+    "lt": _comparison(operator.lt),
+    "lte": _comparison(operator.le),
+    "and": _conditional(lambda *values: all(map(_truthy, values))),
+    "or": _conditional(lambda *values: any(map(_truthy, values))),
+    "not": lambda scope, params, hash: not _truthy(params[0]),
+    "contains": _simple(
+        lambda container, item: (
+            _to_str(item) in _to_str(container)
+            if isinstance(container, str)
+            else item in (container or ())
+        )
+    ),
+    "matches": _simple(
+        lambda value, pattern: re.fullmatch(_to_str(pattern), _to_str(value))
+        is not None
+    ),
+    "val": _val,
+    "math": _math,
+    "array": lambda scope, params, hash: list(params),
+    "size": _simple(lambda value: len(value) if value is not None else 0),
+    "parseJson": _parse_json,
+    "jsonPath": _json_path,
+    "capitalize": _simple(
+        lambda value: _WORD_START.sub(
+            lambda m: m.group(1) + m.group(2).upper(), _to_str(value)
+        )
+    ),
+    "abbreviate": _simple(_abbreviate),
+    "replace": _simple(
+        lambda value, target, replacement: _to_str(value).replace(
+            _to_str(target), _to_str(replacement)
+        )
+    ),
+    "cut": _simple(lambda value, target: _to_str(value).replace(_to_str(target), "")),
+    "stringFormat": _simple(lambda value, *args: _to_str(value) % args),
+    "defaultIfEmpty": _simple(
+        lambda value, default: value if _truthy(value) else default
+    ),
+    "upper": _simple(lambda value: _to_str(value).upper()),
+    "lower": _simple(lambda value: _to_str(value).lower()),
+    "trim": _simple(lambda value: _to_str(value).strip()),
+    "randomValue": _random_value,
+    "randomInt": lambda scope, params, hash: random.randint(
+        int(hash.get("lower", 0)), int(hash.get("upper", 2**31 - 1)) - 1
+    ),
+    "randomDecimal": lambda scope, params, hash: random.uniform(
+        float(hash.get("lower", 0)), float(hash.get("upper", 1))
+    ),
+    "pickRandom": _pick_random,
+}
+
+
+# Compiled nodes are closures: expressions (scope) -> value, sections (scope, out: list) -> None
+_Expression = Callable[[_Scope], object]
+_Section = Callable[[_Scope, list], None]
+
+
+def _tokens(source: str) -> List[tuple]:
+    tokens = []
+    position = 0
+    while position < len(source):
+        match = _TOKEN.match(source, position)
+        if not match or match.end() == position:
+            if source[position:].strip():
+                raise TemplateError(f"Invalid expression: {source!r}")
+            break
+        position = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+def _compile_value(kind: str, value: str) -> _Expression:
+    if kind in ("single", "double"):
+        text = re.sub(r"\\(.)", r"\1", value)
+        return lambda scope: text
+    if value in _LITERALS:
+        literal = _LITERALS[value]
+        return lambda scope: literal
+    if _NUMBER.fullmatch(value):
+        number = float(value) if "." in value else int(value)
+        return lambda scope: number
+    # Path: request.pathSegments.[1] -> ["request", "pathSegments", "1"]
+    parts = [part.strip("[]") for part in value.split(".")]
+    return lambda scope: scope.lookup(parts)
+
+
+def _compile_call(tokens: List[tuple], position: int = 0, nested: bool = False):
+    """Parse `name param... key=value... [as |a b|]` into (name, params, hash, block params, next position)."""
+    name = None
+    params, hash, block_params = [], {}, []
+    while position < len(tokens):
+        kind, value = tokens[position]
+        position += 1
+        if kind == "close":
+            if not nested:
+                raise TemplateError("Unexpected ')'")
+            break
+        if kind == "block_params":
+            block_params = value.split()
+            continue
+        key = None
+        if kind == "key":
+            key = value
+            if position >= len(tokens):
+                raise TemplateError(f"No value of {key}=")
+            kind, value = tokens[position]
+            position += 1
+        if kind == "open":
+            sub_name, sub_params, sub_hash, _, position = _compile_call(
+                tokens, position, nested=True
+            )
+            expression = _compile_helper(sub_name, sub_params, sub_hash)
+        elif kind == "close":
+            raise TemplateError("Unexpected ')'")
+        else:
+            expression = _compile_value(kind, value)
+        if key:
+            hash[key] = expression
+        elif name is None and kind == "word" and not params:
+            name = value
+        else:
+            params.append(expression)
+    else:
+        if nested:
+            raise TemplateError("Missing ')'")
+    return name, params, hash, block_params, position
+
+
+def _compile_helper(name: str, params: list, hash: dict) -> _Expression:
+    helper = HELPERS.get(name)
+    if helper is None:
+        raise TemplateError(f"Helper '{name}' isn't supported by offline renderer")
+
+    def call(scope):
+        return helper(
+            scope,
+            [param(scope) for param in params],
+            {key: value(scope) for key, value in hash.items()},
+        )
+
+    return call
+
+
+def _compile_expression(source: str) -> _Expression:
+    name, params, hash, _, _ = _compile_call(_tokens(source))
+    if name is None:
+        raise TemplateError(f"Empty expression: {source!r}")
+    if params or hash or name in HELPERS:
+        return _compile_helper(name, params, hash)
+    return _compile_value("word", name)
+
+
+def _text_section(text: str) -> _Section:
+    return lambda scope, out: out.append(text)
+
+
+def _mustache_section(source: str, escape: bool) -> _Section:
+    expression = _compile_expression(source)
+    if escape:
+        return lambda scope, out: out.append(
+            _to_str(expression(scope)).translate(_ESCAPES)
+        )
+    return lambda scope, out: out.append(_to_str(expression(scope)))
+
+
+def _render_all(sections: List[_Section], scope: _Scope, out: list):
+    for section in sections:
+        section(scope, out)
+
+
+def _block_section(
+    source: str, body: List[_Section], inverse: List[_Section]
+) -> _Section:
+    name, params, hash, block_params, _ = _compile_call(_tokens(source))
+    if name == "each":
+        if len(params) != 1:
+            raise TemplateError("#each needs one parameter")
+        return _each_section(params[0], block_params, body, inverse)
+    condition = _compile_helper(name, params, hash)
+
+    def render(scope, out):
+        _render_all(body if _truthy(condition(scope)) else inverse, scope, out)
+
+    return render
+
+
+def _each_section(
+    items: _Expression,
+    block_params: List[str],
+    body: List[_Section],
+    inverse: List[_Section],
+) -> _Section:
+    def render(scope, out):
+        value = items(scope)
+        if isinstance(value, dict):
+            entries = list(value.items())
+        else:
+            entries = list(enumerate(value or ()))
+        if not entries:
+            _render_all(inverse, scope, out)
+            return
+        for i, (key, item) in enumerate(entries):
+            frame = {
+                "this": item,
+                "@index": i,
+                "@key": key,
+                "@first": i == 0,
+                "@last": i == len(entries) - 1,
+            }
+            for name, param in zip(block_params, (item, key)):
+                frame[name] = param
+            scope.frames.append(frame)
+            try:
+                _render_all(body, scope, out)
+            finally:
+                scope.frames.pop()
+
+    return render
+
+
+class Template:
+    """Compiled Handlebars template: the subset of syntax and helpers of WireMock response templating.
+
+    Supported: {{path}}, {{{path}}}, helpers with params, hash (key=value) and subexpressions,
+    blocks {{#helper}}...{{else}}...{{/helper}} of conditional helpers and {{#each list as |item|}}.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._sections = self._compile(source)
+
+    @staticmethod
+    def _compile(source: str) -> List[_Section]:
+        # Stack of open blocks: (tag source, body, inverse, list which the block is added to)
+        root: List[_Section] = []
+        stack = []
+        current = root
+        position = 0
+        for match in _TAG.finditer(source):
+            if match.start() > position:
+                current.append(_text_section(source[position : match.start()]))
+            position = match.end()
+            if match.group(1) is not None:
+                current.append(_mustache_section(match.group(1).strip(), escape=False))
+                continue
+            tag = (match.group(2) or "").strip()
+            if not tag or tag.startswith("!"):
+                continue
+            if tag.startswith("#"):
+                body, inverse = [], []
+                stack.append((tag[1:].strip(), body, inverse, current))
+                current = body
+            elif tag in ("else", "^"):
+                if not stack:
+                    raise TemplateError("{{else}} outside of a block")
+                current = stack[-1][2]
+            elif tag.startswith("/"):
+                if not stack:
+                    raise TemplateError(f"Unexpected {{{{{tag}}}}}")
+                block, body, inverse, current = stack.pop()
+                name = tag[1:].strip()
+                if block.split()[0] != name:
+                    raise TemplateError(f"{{{{/{name}}}}} closes {{{{#{block}}}}}")
+                current.append(_block_section(block, body, inverse))
+            elif tag.startswith(">"):
+                raise TemplateError("Partials aren't supported by offline renderer")
+            else:
+                current.append(_mustache_section(tag, escape=True))
+        if stack:
+            raise TemplateError(f"Block {{{{#{stack[-1][0]}}}}} isn't closed")
+        if position < len(source):
+            root.append(_text_section(source[position:]))
+        return root
+
+    def render(self, context: dict) -> str:
+        out = []
+        _render_all(self._sections, _Scope(context), out)
+        return "".join(out)
+
+    def __repr__(self):
+        return f"Template({self.source!r})"
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(source: str) -> Template:
+    """Compile template once, results are kept in LRU cache by source."""
+    return Template(source)
+
+
+def render_template(source: str, context: dict) -> str:
+    return compile_template(source).render(context)
+
+
+def request_model(
+    method: str,
+    rel_url: str,
+    headers: dict = None,
+    body: str = "",
+    base_url: str = DEFAULT_BASE_URL,
+) -> dict:
+    """`request` of WireMock template context: values of repeated query params/headers are lists."""
+    request = IncomingRequest(method, rel_url, headers=headers, body=body)
+    return {
+        "id": str(uuid.uuid4()),
+        "url": rel_url,
+        "path": request.path,
+        "pathSegments": [segment for segment in request.path.split("/") if segment],
+        "query": {
+            name: values[0] if len(values) == 1 else values
+            for name, values in request.query.items()
+        },
+        "method": request.method,
+        "baseUrl": base_url,
+        "headers": _CaseInsensitiveDict(request.headers),
+        "cookies": request.cookies,
+        "body": request.body,
+    }
+
+
+class _CaseInsensitiveDict(dict):
+    """Header names are case-insensitive, keys are stored in lower case."""
+
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
+
+    def __contains__(self, key):
+        return super().__contains__(key.lower())
+
+    def __getitem__(self, key):
+        return super().__getitem__(key.lower())
+
+
+def mapping_templates(mapping: Mapping) -> Dict[str, str]:
+    """Templates of the mapping response: {"body": ..., "headers.<name>": ...}, empty if it isn't templated."""
+    response = mapping.response
+    if RESPONSE_TEMPLATE not in (response.transformers or []):
+        return {}
+    if response.bodyFileName:
+        raise TemplateError("bodyFileName isn't supported by offline renderer")
+    templates = {
+        f"headers.{name}": value
+        for name, value in (response.headers or {}).items()
+        if isinstance(value, str)
+    }
+    if response.jsonBody is not None:
+        templates["body"] = json.dumps(response.jsonBody)
+    elif response.body:
+        # Mocker sends string body in quotes
+        templates["body"] = f'"{response.body}"'
+    return templates
+
+
+def render_mapping(
+    mapping: Mapping, check_request: dict, base_url: str = DEFAULT_BASE_URL
+):
+    """Data which HTTPHelper.requester(**check_request) receives from the mapping created by Mocker,
+    rendered without WireMock. The request isn't matched against the mapping and status isn't checked.
+
+    >>> render_mapping(mapping, dict(method="POST", rel_url="/response/templating", data="4"))
+    """
+    # Imported here, so templates are validated without requests/urllib3
+    from helpers.http_helper import HTTPHelper
+
+    headers = check_request.get("headers") or HTTPHelper.HEADERS
+    data = check_request.get("data")
+    if check_request.get("json") is not None:
+        data = json.dumps(check_request["json"])
+    context = {
+        "request": request_model(
+            check_request["method"],
+            check_request["rel_url"],
+            headers=headers,
+            body=data if isinstance(data, str) else "",
+            base_url=base_url,
+        )
+    }
+    response = mapping.response
+    templates = mapping_templates(mapping)
+    if "body" in templates:
+        body = render_template(templates["body"], context)
+    elif response.jsonBody is not None:
+        body = json.dumps(response.jsonBody)
+    else:
+        body = f'"{response.body}"' if response.body else ""
+    response_headers = {
+        name: render_template(templates[f"headers.{name}"], context)
+        if f"headers.{name}" in templates
+        else value
+        for name, value in (response.headers or {}).items()
+    }
+
+    # Parsed like HTTPHelper._parse()
+    content_type = response_headers.get("Content-Type")
+    if content_type in (
+        "application/json",
+        "application/json;charset=UTF-8",
+        "text/plain; charset=utf-8",
+    ) or "application/json" in str(headers):
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return body.encode()
+
+
+def validate_templates(mappings: Iterable[Mapping]) -> Dict[str, TemplateError]:
+    """Compile templates of mappings before upload: {mapping name: error} of invalid ones."""
+    errors = {}
+    for mapping in mappings:
+        try:
+            for template in mapping_templates(mapping).values():
+                compile_template(template)
+        except TemplateError as e:
+            errors[mapping.name] = e
+    log.info(f"{len(errors)} mappings have invalid templates")
+    return errors
@@ -0,0 +1,72 @@
+import logging
+from typing import Dict, Sequence
+
+from helpers.hash_ring import HashRing, shard_key
+from helpers.http_helper import HTTPHelper
+
+log = logging.getLogger(__name__)
+
+
+def parse_endpoint(endpoint: str):
+    host, _, port = endpoint.rpartition(":")
+    return host, int(port)
+
+
+class ShardedHTTPHelper:
+    """HTTPHelper counterpart which sends every request to the shard owning its method and url path.
+
+    Shards are chosen with the same consistent hashing as ShardedWiremockApi uses for mappings,
+    so a check request reaches the WireMock instance which has the stub for it.
+
+    >>> http = ShardedHTTPHelper(["localhost:8080", "localhost:8081"], protocol=HTTPHelper.HTTP)
+    >>> http.get("/my-first-string-mapping")
+    """
+
+    GET = HTTPHelper.GET
+    POST = HTTPHelper.POST
+    PUT = HTTPHelper.PUT
+    DELETE = HTTPHelper.DELETE
+
+    def __init__(
+        self,
+        endpoints: Sequence[str],
+        replicas: int = HashRing.DEFAULT_REPLICAS,
+        **kwargs,
+    ):
+        """
+        :param endpoints: "host:port" of shards
+        :param kwargs: HTTPHelper arguments for every shard
+        """
+        self.ring = HashRing(endpoints, replicas=replicas)
+        self.shards: Dict[str, HTTPHelper] = {}
+        for endpoint in endpoints:
+            host, port = parse_endpoint(endpoint)
+            self.shards[endpoint] = HTTPHelper(host, port=port, **kwargs)
+
+    def shard(self, method: str, rel_url: str) -> HTTPHelper:
+        return self.shards[self.ring.node(shard_key(method, rel_url))]
+
+    def requester(self, method: str, rel_url: str, **kwargs):
+        return self.shard(method, rel_url).requester(method, rel_url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.requester(self.GET, url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.requester(self.POST, url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.requester(self.PUT, url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.requester(self.DELETE, url, **kwargs)
+
+    def close(self):
+        for http in self.shards.values():
+            http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
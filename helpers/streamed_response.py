@@ -0,0 +1,241 @@
+import codecs
+import hashlib
+import json
+import logging
+import re
+from tempfile import SpooledTemporaryFile
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+log = logging.getLogger(__name__)
+
+
+class StreamedResponse:
+    """Response body which is read from the socket by chunks instead of loading it into memory.
+
+    Body can be consumed only once: by chunks, by JSON array items or by spooling to a temporary file.
+    Size and hash of the body are calculated on the fly during any kind of consumption.
+
+    >>> with http.get("/large-file", stream=True) as response:
+    ...     spooled_file = response.spool()
+    ...     assert response.hexdigest() == expected_sha256
+    """
+
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+    DEFAULT_SPOOL_MAX_SIZE = 10 * 1024 * 1024  # Body is kept in memory until this size
+
+    def __init__(
+        self,
+        response: "requests.Response",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        hash_algorithm: str = "sha256",
+    ):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.chunk_size = chunk_size
+        self.size = 0
+        self._hash = hashlib.new(hash_algorithm)
+        self._content: Optional[Iterator[bytes]] = None
+
+    def iter_content(self) -> Iterator[bytes]:
+        if self._content is not None:
+            raise RuntimeError("Response body has already been consumed")
+        self._content = self._read_content()
+        return self._content
+
+    def _read_content(self) -> Iterator[bytes]:
+        try:
+            for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                self.size += len(chunk)
+                self._hash.update(chunk)
+                yield chunk
+        finally:
+            self.close()
+
+    def iter_json_items(self, key: str = None) -> Iterator[Any]:
+        """Decode items of a top-level JSON array one by one, see iter_json_items()."""
+        return iter_json_items(
+            self.iter_content(), key=key, encoding=self.response.encoding
+        )
+
+    def spool(self, max_size: int = DEFAULT_SPOOL_MAX_SIZE) -> SpooledTemporaryFile:
+        """Read body into file-like object, which is moved to a temporary file on disk above `max_size`."""
+        spooled_file = SpooledTemporaryFile(max_size=max_size)
+        for chunk in self.iter_content():
+            spooled_file.write(chunk)
+        spooled_file.seek(0)
+        log.debug(f"RESPONSE DATA: spooled {self.size} bytes")
+        return spooled_file
+
+    def hexdigest(self) -> str:
+        """Hash of the body, the rest of the body is read if it hasn't been consumed (completely) yet."""
+        if self._content is None:
+            self.iter_content()
+        for _ in self._content:
+            pass
+        return self._hash.hexdigest()
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_json_items(
+    chunks: Iterable[bytes], key: str = None, encoding: str = None
+) -> Iterator[Any]:
+    """Decode items of a top-level JSON array from chunks of bytes one by one.
+
+    With `key` items of the array under this key of a top-level object are decoded,
+    ex: key="requests" for {"requests": [...], "meta": {...}}. The rest of the document isn't parsed.
+    """
+    reader = _JSONReader(iter(chunks), encoding)
+    if key is not None:
+        reader.expect("{")
+        while True:
+            if reader.peek() == "}":
+                raise ValueError(f"JSON document has no '{key}' key")
+            name = reader.value()
+            reader.expect(":")
+            if name == key:
+                break
+            reader.value()
+    if reader.peek() != "[":
+        raise ValueError("JSON document is not an array")
+    reader.expect("[")
+    while reader.peek() != "]":
+        yield reader.value()
+
+
+class _JSONReader:
+    """Incremental reader of JSON values from chunks of bytes, only the unread part is kept in memory.
+
+    The end of a value is found by scanning every char once (see _ValueScanner), then the value is decoded once,
+    so a large value split into many chunks costs O(size) instead of re-decoding it after every chunk.
+    """
+
+    _SEPARATORS = " \t\r\n,"
+
+    def __init__(self, chunks: Iterator[bytes], encoding: str = None):
+        self._chunks = chunks
+        self._text_decoder = codecs.getincrementaldecoder(encoding or "utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._exhausted = False
+
+    def _read(self) -> Optional[str]:
+        """Text of the next chunk or None at the end of the document."""
+        while not self._exhausted:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._exhausted = True
+                text = self._text_decoder.decode(b"", final=True)
+            else:
+                text = self._text_decoder.decode(chunk)
+            if text:
+                return text
+        return None
+
+    def peek(self) -> str:
+        """The next char after whitespaces and separators between items."""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in self._SEPARATORS
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            text = self._read()
+            if text is None:
+                raise ValueError("Unexpected end of JSON")
+            self._buffer, self._position = text, 0
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in JSON")
+        self._position += 1
+
+    def value(self) -> Any:
+        first = self.peek()
+        if first in "]}:":
+            raise ValueError(f"Unexpected '{first}' in JSON")
+        scanner = _ValueScanner(first)
+        # Text of the value is collected from pieces and joined once
+        pieces = []
+        text, start = self._buffer, self._position
+        while True:
+            end = scanner.scan(text, start)
+            if end >= 0:
+                break
+            pieces.append(text[start:])
+            text, start = self._read(), 0
+            if text is None:
+                if not scanner.scalar:
+                    raise ValueError("Unexpected end of JSON")
+                text, end = "", 0
+                break
+        pieces.append(text[start:end])
+        self._buffer, self._position = text, end
+        return self._decoder.decode("".join(pieces))
+
+
+class _ValueScanner:
+    """Finds the end of a JSON value in consecutive pieces of text, state is kept between pieces."""
+
+    _STRUCTURAL = re.compile(r'["{}\[\]]')
+    _STRING_SPECIAL = re.compile(r'["\\]')
+    _SCALAR_END = re.compile(r"[\s,\]}]")
+
+    def __init__(self, first_char: str):
+        # Numbers, true, false, null end with a separator (or the end of the document)
+        self.scalar = first_char not in '{["'
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def scan(self, text: str, start: int) -> int:
+        """Index after the end of the value in `text` or -1 if it continues in the next piece."""
+        if self.scalar:
+            match = self._SCALAR_END.search(text, start)
+            return match.start() if match else -1
+        position = start
+        while True:
+            if self.escape:
+                if position >= len(text):
+                    return -1
+                self.escape = False
+                position += 1
+            if self.in_string:
+                match = self._STRING_SPECIAL.search(text, position)
+                if not match:
+                    return -1
+                position = match.end()
+                if match.group() == "\\":
+                    self.escape = True
+                    continue
+                self.in_string = False
+                if self.depth == 0:
+                    return position
+                continue
+            match = self._STRUCTURAL.search(text, position)
+            if not match:
+                return -1
+            position = match.end()
+            char = match.group()
+            if char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return position
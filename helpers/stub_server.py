@@ -0,0 +1,519 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import socket
+import struct
+import tempfile
+import threading
+import uuid
+from http import HTTPStatus
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from helpers import delays
+from helpers.request_journal import (  # noqa: F401 - re-exported
+    RequestJournal,
+    format_logged_date,
+    parse_logged_date,
+)
+from helpers.request_matcher import (
+    DEFAULT_PRIORITY,
+    IncomingRequest,
+    match_request,
+    match_value,
+)
+
+log = logging.getLogger(__name__)
+
+ADMIN_PREFIX = "/__admin"
+
+NOT_MATCHED_BODY = "Request was not matched"
+
+
+class StubResponse:
+    __slots__ = ("status", "headers", "body", "delay", "dribble", "fault")
+
+    def __init__(
+        self,
+        status: int = 200,
+        headers: dict = None,
+        body: bytes = b"",
+        delay: float = 0,
+        dribble: dict = None,
+        fault: str = None,
+    ):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+        self.delay = delay  # Seconds before the response is sent
+        self.dribble = dribble  # chunkedDribbleDelay of mapping
+        self.fault = fault
+
+
+def _json_response(data, status: int = 200) -> StubResponse:
+    return StubResponse(
+        status=status,
+        headers={"Content-Type": "application/json"},
+        body=json.dumps(data).encode(),
+    )
+
+
+class FileStore:
+    """Files area of the server (`__files` of WireMock), which responses with bodyFileName are read from.
+
+    Files are kept on disk, not in memory: in `root` or in a temporary directory removed by close().
+    """
+
+    def __init__(self, root: str = None):
+        self._tmp_dir = None if root else tempfile.TemporaryDirectory(prefix="stubs-")
+        self.root = root or self._tmp_dir.name
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        if not name or name != os.path.basename(name) or name.startswith("."):
+            raise ValueError(f"Invalid file name: {name!r}")
+        return os.path.join(self.root, name)
+
+    def names(self) -> List[str]:
+        return sorted(os.listdir(self.root))
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Content of the file or None if there is no such file (or name is invalid)."""
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write(self, name: str, data: bytes):
+        path = self._path(name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, name: str) -> bool:
+        try:
+            os.remove(self._path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def close(self):
+        if self._tmp_dir:
+            self._tmp_dir.cleanup()
+
+
+class MappingStore:
+    """In-memory storage of mappings with WireMock-like selection: by priority, then the newest first."""
+
+    def __init__(self):
+        self._mappings: Dict[str, dict] = {}
+        self._sorted: Optional[List[dict]] = None
+
+    def __len__(self):
+        return len(self._mappings)
+
+    def all(self) -> List[dict]:
+        return list(self._mappings.values())
+
+    def get(self, id: str) -> Optional[dict]:
+        return self._mappings.get(id)
+
+    def save(self, mapping: dict) -> dict:
+        mapping = dict(mapping)
+        mapping["id"] = mapping.get("id") or str(uuid.uuid4())
+        mapping["uuid"] = mapping["id"]
+        # Re-inserted mapping becomes the newest one, as in WireMock
+        self._mappings.pop(mapping["id"], None)
+        self._mappings[mapping["id"]] = mapping
+        self._sorted = None
+        return mapping
+
+    def delete(self, id: str) -> Optional[dict]:
+        self._sorted = None
+        return self._mappings.pop(id, None)
+
+    def clear(self):
+        self._mappings.clear()
+        self._sorted = None
+
+    def find(self, request: IncomingRequest) -> Optional[dict]:
+        if self._sorted is None:
+            newest_first = list(reversed(self._mappings.values()))
+            self._sorted = sorted(
+                newest_first, key=lambda m: m.get("priority") or DEFAULT_PRIORITY
+            )
+        for mapping in self._sorted:
+            if match_request(mapping.get("request") or {}, request):
+                return mapping
+        return None
+
+
+class StubServer:
+    """Embedded WireMock-compatible stub server for tests: asyncio event loop in a background thread.
+
+    Supports /__admin/mappings API used by WiremockApi and request matching
+    by url/urlPath/urlPattern/urlPathPattern, queryParameters, headers, cookies and bodyPatterns.
+    Delays (fixedDelayMilliseconds, delayDistribution, chunkedDribbleDelay) and faults are supported.
+    Response bodies can be read from files of /__admin/files API (bodyFileName).
+    Stubbed requests are logged to the journal, which is available via /__admin/requests API.
+    Response templating isn't supported.
+
+    >>> with StubServer() as server:
+    ...     api = WiremockApi(port=server.port)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        journal_max_entries: int = None,
+        files_dir: str = None,
+    ):
+        """
+        :param files_dir: directory of body files, temporary one (removed on stop) by default
+        """
+        self.host = host
+        self.port = port
+        self.mappings = MappingStore()
+        self.journal = RequestJournal(max_entries=journal_max_entries)
+        self.files = FileStore(files_dir)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Set[asyncio.Task] = set()  # Tasks of open client connections
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "StubServer":
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_server(self._handle_connection, self.host, self.port)
+                )
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            # Keep-alive connections of pooled clients are still waiting for requests,
+            # wait_closed() waits for them (since Python 3.12), so they're cancelled first
+            connections = list(self._connections)
+            for task in connections:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*connections, return_exceptions=True)
+            )
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="stub-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        log.info(f"Stub server was started on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._loop and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self.files.close()
+        log.info(f"Stub server on {self.base_url} was stopped")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as e:
+                    # Malformed request line, header or chunk size
+                    log.warning(f"Bad request: {e}")
+                    await self._write_response(
+                        writer,
+                        StubResponse(status=400, body=b"Bad request"),
+                        keep_alive=False,
+                        head=False,
+                    )
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                response = self.handle(method, target, headers, body)
+                if response.delay:
+                    await asyncio.sleep(response.delay)
+                if response.fault:
+                    self._write_fault(writer, response.fault)
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(
+                    writer, response, keep_alive, head=method == "HEAD"
+                )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server is stopped, the task ends normally: start_server() callback
+            # calls task.exception(), which raises for a cancelled task
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader) -> Optional[Tuple[str, str, dict, bytes]]:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            await reader.readline()
+            body = b"".join(chunks)
+        else:
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+        return method, target, headers, body
+
+    @staticmethod
+    async def _write_response(
+        writer, response: StubResponse, keep_alive: bool, head: bool
+    ):
+        try:
+            reason = HTTPStatus(response.status).phrase
+        except ValueError:
+            reason = ""
+        lines = [f"HTTP/1.1 {response.status} {reason}"]
+        for name, value in response.headers.items():
+            if name.lower() not in (
+                "content-length",
+                "connection",
+                "transfer-encoding",
+            ):
+                lines.append(f"{name}: {value}")
+        lines.append(f"Content-Length: {len(response.body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if head:
+            pass
+        elif response.dribble:
+            for chunk, pause in delays.dribble_chunks(response.body, response.dribble):
+                await writer.drain()
+                await asyncio.sleep(pause)
+                writer.write(chunk)
+        else:
+            writer.write(response.body)
+        await writer.drain()
+
+    @staticmethod
+    def _write_fault(writer, fault: str):
+        """Break the connection like WireMock does for the fault, the caller closes the writer."""
+        if fault == delays.CONNECTION_RESET_BY_PEER:
+            sock = writer.get_extra_info("socket")
+            # Zero linger timeout makes close() send RST instead of FIN
+            sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+            )
+            writer.transport.abort()
+        elif fault == delays.RANDOM_DATA_THEN_CLOSE:
+            writer.write(os.urandom(64))
+        elif fault == delays.MALFORMED_RESPONSE_CHUNK:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                + os.urandom(32)
+            )
+
+    def handle(
+        self, method: str, target: str, headers: dict, body: bytes
+    ) -> StubResponse:
+        """Process one request: admin API call or stubbed request."""
+        if target.startswith(ADMIN_PREFIX):
+            try:
+                return self._handle_admin(method, target, body)
+            except (ValueError, KeyError) as e:
+                return _json_response({"errors": [{"title": str(e)}]}, status=422)
+
+        request = IncomingRequest(
+            method, target, headers, body.decode("utf-8", errors="replace")
+        )
+        mapping = self.mappings.find(request)
+        if mapping is None:
+            log.warning(f"Stub server: {request} was not matched")
+            response = StubResponse(
+                status=404,
+                headers={"Content-Type": "text/plain"},
+                body=NOT_MATCHED_BODY.encode(),
+            )
+        else:
+            response = self._render_response(mapping.get("response") or {})
+        self.journal.log(request, response, mapping, headers)
+        return response
+
+    def _render_response(self, response: dict) -> StubResponse:
+        headers = dict(response.get("headers") or {})
+        if response.get("jsonBody") is not None:
+            body = json.dumps(response["jsonBody"]).encode()
+        elif response.get("base64Body") is not None:
+            body = base64.b64decode(response["base64Body"])
+        elif response.get("bodyFileName"):
+            body = self.files.read(response["bodyFileName"])
+            if body is None:
+                log.warning(f"Body file '{response['bodyFileName']}' doesn't exist")
+                return StubResponse(status=500, body=b"Body file doesn't exist")
+        else:
+            body = (response.get("body") or "").encode()
+        return StubResponse(
+            status=response.get("status") or 200,
+            headers=headers,
+            body=body,
+            delay=delays.sample_delay(response),
+            dribble=response.get("chunkedDribbleDelay"),
+            fault=response.get("fault"),
+        )
+
+    def _handle_admin(self, method: str, target: str, body: bytes) -> StubResponse:
+        split_target = urlsplit(target)
+        path = split_target.path.rstrip("/")
+        if path == f"{ADMIN_PREFIX}/files" or path.startswith(f"{ADMIN_PREFIX}/files/"):
+            return self._handle_files(method, path, body)
+        content = json.loads(body) if body else None
+
+        if path == f"{ADMIN_PREFIX}/mappings":
+            if method == "GET":
+                query = parse_qs(split_target.query)
+                mappings = self.mappings.all()
+                offset = int(query.get("offset", [0])[0])
+                limit = int(query.get("limit", [len(mappings)])[0])
+                return _json_response(
+                    {
+                        "mappings": mappings[offset : offset + limit],
+                        "meta": {"total": len(mappings)},
+                    }
+                )
+            if method == "POST":
+                return _json_response(self.mappings.save(content), status=201)
+            if method == "DELETE":
+                self.mappings.clear()
+                return StubResponse()
+
+        if path == f"{ADMIN_PREFIX}/mappings/import" and method == "POST":
+            options = content.get("importOptions") or {}
+            if options.get("deleteAllNotInImport"):
+                self.mappings.clear()
+            for mapping in content["mappings"]:
+                exists = mapping.get("id") and self.mappings.get(mapping["id"])
+                if exists and options.get("duplicatePolicy") == "IGNORE":
+                    continue
+                self.mappings.save(mapping)
+            return StubResponse()
+
+        if path == f"{ADMIN_PREFIX}/mappings/remove-by-metadata" and method == "POST":
+            for mapping in self.mappings.all():
+                metadata = json.dumps(mapping.get("metadata") or {})
+                if match_value(content, metadata):
+                    self.mappings.delete(mapping["id"])
+            return StubResponse()
+
+        if path == f"{ADMIN_PREFIX}/reset" and method == "POST":
+            self.mappings.clear()
+            self.journal.clear()
+            return StubResponse()
+
+        if path == f"{ADMIN_PREFIX}/requests":
+            if method == "GET":
+                query = parse_qs(split_target.query)
+                since = query.get("since", [None])[0]
+                limit = query.get("limit", [None])[0]
+                return _json_response(
+                    {
+                        "requests": self.journal.since(
+                            since=parse_logged_date(since) if since else None,
+                            limit=int(limit) if limit else None,
+                        ),
+                        "meta": {"total": len(self.journal)},
+                        "requestJournalDisabled": False,
+                    }
+                )
+            if method == "DELETE":
+                self.journal.clear()
+                return StubResponse()
+
+        if path == f"{ADMIN_PREFIX}/requests/count" and method == "POST":
+            return _json_response({"count": self.journal.count(content)})
+
+        if path == f"{ADMIN_PREFIX}/requests/find" and method == "POST":
+            return _json_response({"requests": self.journal.find(content)})
+
+        if path.startswith(f"{ADMIN_PREFIX}/requests/") and method == "GET":
+            entry = self.journal.get(path.rsplit("/", 1)[1])
+            return _json_response(entry) if entry else StubResponse(status=404)
+
+        if path.startswith(f"{ADMIN_PREFIX}/mappings/"):
+            id = path.rsplit("/", 1)[1]
+            if method == "GET":
+                mapping = self.mappings.get(id)
+                return _json_response(mapping) if mapping else StubResponse(status=404)
+            if method == "PUT":
+                # WireMock doesn't create mappings by PUT
+                if not self.mappings.get(id):
+                    return StubResponse(status=404)
+                content["id"] = id
+                return _json_response(self.mappings.save(content))
+            if method == "DELETE":
+                mapping = self.mappings.delete(id)
+                return StubResponse() if mapping else StubResponse(status=404)
+
+        return StubResponse(status=404, body=b"Unknown admin API endpoint")
+
+    def _handle_files(self, method: str, path: str, body: bytes) -> StubResponse:
+        if path == f"{ADMIN_PREFIX}/files":
+            if method == "GET":
+                return _json_response(self.files.names())
+            return StubResponse(status=405)
+
+        name = path[len(f"{ADMIN_PREFIX}/files/") :]
+        if method == "GET":
+            data = self.files.read(name)
+            if data is None:
+                return StubResponse(status=404)
+            return StubResponse(
+                headers={"Content-Type": "application/octet-stream"}, body=data
+            )
+        if method == "PUT":
+            self.files.write(name, body)
+            return StubResponse()
+        if method == "DELETE":
+            return (
+                StubResponse() if self.files.delete(name) else StubResponse(status=404)
+            )
+        return StubResponse(status=405)
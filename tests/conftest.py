@@ -1,26 +1,209 @@
 import logging
 import os
-import sys
-
-sys.path.append(f"{os.path.dirname(os.path.abspath(__file__))}/..")
 
 import pytest
 from colorama import Fore, Style
+from pytest_cases import is_lazy
 
-from helpers.http_helper import HTTPHelper
-from helpers.mocker import Mocker
+# Helpers are imported in fixtures and hooks which need them: collection of tests
+# which don't use stubs (ex: test_dot_proxy.py) doesn't load pydantic, requests and asyncio
 
 log = logging.getLogger(__name__)
 
+EMBEDDED = "embedded"
+DOCKER = "docker"
+
+PRELOADED_STUBS = pytest.StashKey[dict]()  # {test nodeid: Mapping}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--wiremock",
+        choices=[EMBEDDED, DOCKER],
+        default=EMBEDDED,
+        help="Run tests against embedded stub server or WireMock from docker-compose.yml (localhost:8080)",
+    )
+    parser.addoption(
+        "--http-timings",
+        default=None,
+        help="Path to JSON file for per-endpoint latency histograms of HTTP requests",
+    )
+    parser.addoption(
+        "--run-slow",
+        action="store_true",
+        help="Run slow tests (ex: stubs with delays of seconds)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "requires_wiremock: test needs real WireMock server (ex: response templating)",
+    )
+    config.addinivalue_line(
+        "markers", "slow: test takes seconds (ex: delayed stub), run with --run-slow"
+    )
+    config.addinivalue_line(
+        "markers",
+        "preload_stubs: mappings of the test cases (the first item of a case) are created "
+        "in one batch before the tests, use `preloaded_stubs` fixture to check it",
+    )
+    config.addinivalue_line(
+        "markers",
+        "isolated_stub: the test (case) creates its mapping itself, it isn't preloaded",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--wiremock") == EMBEDDED:
+        skip = pytest.mark.skip(
+            reason="Needs real WireMock server: run with --wiremock=docker"
+        )
+        for item in items:
+            if item.get_closest_marker("requires_wiremock"):
+                item.add_marker(skip)
+    if not config.getoption("--run-slow"):
+        skip = pytest.mark.skip(reason="Slow test: run with --run-slow")
+        for item in items:
+            if item.get_closest_marker("slow"):
+                item.add_marker(skip)
+    config.stash[PRELOADED_STUBS] = _collect_preloaded_stubs(items)
+
+
+def _collect_preloaded_stubs(items) -> dict:
+    """Mappings of `preload_stubs` tests which can be created up front: {test nodeid: Mapping}.
+
+    Mappings which overlap with mappings of other tests are left to the tests themselves,
+    because the stub created the last wins in WireMock.
+    """
+    preload_items = [
+        item
+        for item in items
+        if item.get_closest_marker("preload_stubs")
+        and not item.get_closest_marker("skip")
+    ]
+    if not preload_items:
+        return {}
+    from helpers.mapping_analyzer import MappingAnalyzer
+    from helpers.mocker import Mapping
+
+    candidates = {}
+    for item in preload_items:
+        case = getattr(item, "callspec", None) and item.callspec.params.get("case")
+        if not is_lazy(case):
+            continue
+        # Value is cached for the test node, so the test gets the same mapping
+        mapping = case.get(item)[0]
+        if isinstance(mapping, Mapping):
+            candidates[item.nodeid] = (
+                mapping,
+                not item.get_closest_marker("isolated_stub"),
+            )
+
+    dumps = {}
+    analyzer = MappingAnalyzer(())
+    for nodeid, (mapping, _) in candidates.items():
+        dump = mapping.model_dump()
+        dumps[id(dump)] = nodeid
+        analyzer.add(dump)
+    overlapping = {
+        dumps[id(matched)]
+        for conflict in analyzer.conflicts()
+        for matched in conflict.matched
+    }
+    return {
+        nodeid: mapping
+        for nodeid, (mapping, preload) in candidates.items()
+        if preload and nodeid not in overlapping
+    }
+
 
 @pytest.fixture(scope="session")
-def mocker():
-    return Mocker()
+def wiremock(request):
+    """(host, port) of the stub server for the test session."""
+    if request.config.getoption("--wiremock") == DOCKER:
+        from helpers.api.wiremock_api import WiremockApi
+
+        yield "localhost", WiremockApi.DEFAULT_PORT
+        return
+    from helpers.stub_server import StubServer
+
+    with StubServer() as server:
+        yield server.host, server.port
+
+
+@pytest.fixture
+def stub_server():
+    """Separate embedded stub server for a test which needs clean state."""
+    from helpers.stub_server import StubServer
+
+    with StubServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def http_timings(request):
+    path = request.config.getoption("--http-timings")
+    if not path:
+        yield None
+        return
+    from helpers.http_timing import LatencyAggregator
+
+    aggregator = LatencyAggregator()
+    yield aggregator
+    aggregator.export_json(path)
 
 
 @pytest.fixture(scope="session")
-def http():
-    return HTTPHelper(host="localhost", protocol=HTTPHelper.HTTP, port=8080)
+def mocker(wiremock, http_timings):
+    from helpers.mocker import Mocker
+
+    host, port = wiremock
+    # Stubs of pytest-xdist workers are isolated from each other on the shared server
+    mocker = Mocker(
+        host=host, port=port, namespace=os.environ.get("PYTEST_XDIST_WORKER")
+    )
+    if http_timings:
+        mocker.api.http.add_timing_hook(http_timings)
+    yield mocker
+    if http_timings:
+        mocker.api.http.remove_timing_hook(http_timings)
+    if mocker.namespace:
+        mocker.delete_namespace_mappings()
+    mocker.close()
+
+
+@pytest.fixture(scope="session")
+def preloaded_stubs(request, mocker) -> set:
+    """Nodeids of tests which mappings were created in one batch at the start of the session."""
+    stubs = request.config.stash.get(PRELOADED_STUBS, {})
+    if not stubs:
+        return set()
+    result = mocker.create_mappings(stubs.values())
+    preloaded = {nodeid for nodeid, id in zip(stubs, result.ids) if id}
+    log.info(f"{len(preloaded)} of {len(stubs)} stubs were preloaded")
+    return preloaded
+
+
+@pytest.fixture(scope="session")
+def http(wiremock, mocker, http_timings):
+    from helpers.http_helper import HTTPHelper
+
+    host, port = wiremock
+    http = HTTPHelper(
+        host=host,
+        protocol=HTTPHelper.HTTP,
+        port=port,
+        common_headers=mocker.namespace_headers,
+    )
+    if http_timings:
+        http.add_timing_hook(http_timings)
+    yield http
+    if http_timings:
+        http.remove_timing_hook(http_timings)
+    log.info(f"HTTP connection pool stats: {http.pool_stats.as_dict()}")
+    http.close()
 
 
 def log_info_blue(msg):
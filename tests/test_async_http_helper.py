@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+import requests
+from assertpy import assert_that
+
+from helpers.api.async_wiremock_api import AsyncWiremockApi
+from helpers.async_http_helper import AsyncHTTPHelper, gather
+from helpers.http_helper import HTTPHelper
+
+COUNT = 10
+DELAY = 50  # Milliseconds of the stub response
+
+
+@pytest.fixture
+def delayed_stub(stub_server):
+    async def create():
+        async with AsyncWiremockApi(
+            host=stub_server.host, port=stub_server.port
+        ) as api:
+            return await api.post_mappings(
+                [
+                    {
+                        "request": {"method": "GET", "urlPath": f"/delayed/{i}"},
+                        "response": {"body": str(i), "fixedDelayMilliseconds": DELAY},
+                    }
+                    for i in range(COUNT)
+                ]
+            )
+
+    return asyncio.run(create())
+
+
+class TestGather:
+    def test_order(self):
+        async def value(i):
+            await asyncio.sleep(0.001 * (5 - i))
+            return i
+
+        assert_that(asyncio.run(gather(value(i) for i in range(5)))).is_equal_to(
+            [0, 1, 2, 3, 4]
+        )
+
+    def test_limit(self):
+        running = 0
+        max_running = 0
+
+        async def task():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+
+        asyncio.run(gather((task() for _ in range(20)), limit=3))
+
+        assert_that(max_running).is_equal_to(3)
+
+    def test_error(self):
+        async def task(i):
+            if i == 3:
+                raise ValueError(i)
+            return i
+
+        with pytest.raises(ValueError):
+            asyncio.run(gather(task(i) for i in range(5)))
+
+
+class TestAsyncHTTPHelper:
+    def test_post_mappings(self, stub_server, delayed_stub):
+        assert_that(delayed_stub).is_length(COUNT)
+        # IDs are in the order of contents, though mappings are created concurrently
+        paths = [
+            stub_server.mappings.get(id)["request"]["urlPath"] for id in delayed_stub
+        ]
+        assert_that(paths).is_equal_to([f"/delayed/{i}" for i in range(COUNT)])
+
+    def test_concurrent_calls_are_faster_than_sync(self, stub_server, delayed_stub):
+        kwargs = dict(host=stub_server.host, protocol=HTTPHelper.HTTP)
+        start = time.perf_counter()
+        with HTTPHelper(port=stub_server.port, **kwargs) as http:
+            sync_bodies = [http.get(f"/delayed/{i}") for i in range(COUNT)]
+        sync_elapsed = time.perf_counter() - start
+
+        async def check():
+            async with AsyncHTTPHelper(
+                port=stub_server.port, concurrency=COUNT, **kwargs
+            ) as http:
+                return await http.gather(
+                    http.get(f"/delayed/{i}") for i in range(COUNT)
+                )
+
+        start = time.perf_counter()
+        async_bodies = asyncio.run(check())
+        async_elapsed = time.perf_counter() - start
+
+        assert_that(async_bodies).is_equal_to(sync_bodies)
+        # Sync requests wait for the delays one after another
+        assert_that(sync_elapsed).is_greater_than_or_equal_to(COUNT * DELAY / 1000)
+        assert_that(async_elapsed).is_less_than(sync_elapsed / 2)
+
+    def test_error_propagation(self, stub_server, delayed_stub):
+        async def check():
+            async with AsyncHTTPHelper(
+                host=stub_server.host, protocol=HTTPHelper.HTTP, port=stub_server.port
+            ) as http:
+                await http.gather(
+                    [
+                        http.get("/delayed/0"),
+                        http.get("/unknown"),
+                        http.get("/delayed/1"),
+                    ]
+                )
+
+        with pytest.raises(requests.HTTPError):
+            asyncio.run(check())
@@ -0,0 +1,78 @@
+import pytest
+from assertpy import assert_that
+
+from helpers.dot_proxy import DotProxy, compile_path, copy_along_paths
+
+
+@pytest.fixture
+def data():
+    return {"a": {"b": 1}, "c": 3, "d": [{"e": 1}, {"e": 2}, {"x": 3}]}
+
+
+class TestDotProxy:
+    @pytest.mark.parametrize(
+        "path, expected",
+        [("a.b", 1), ("c", 3), ("d.[].e", [1, 2]), ("d.e", [1, 2]), ("d.[]", None)],
+    )
+    def test_get(self, data, path, expected):
+        expected = data["d"] if expected is None else expected
+        assert_that(DotProxy(data)[path]).is_equal_to(expected)
+
+    def test_get_strict_raises_on_miss(self, data):
+        with pytest.raises(
+            KeyError, match=r"keys=\['d', '\[\]', 'e'\]: error in key 'e'"
+        ):
+            DotProxy(data, strict=True)["d.[].e"]
+
+    def test_get_missing_key(self, data):
+        with pytest.raises(KeyError, match=r"keys=\['a', 'd'\]: error in key 'd'"):
+            DotProxy(data)["a.d"]
+
+    def test_set(self, data):
+        proxy = DotProxy(data)
+        proxy["a.d"] = "4"
+        proxy["d.[].e"] = 0
+        assert_that(proxy["a.d"]).is_equal_to("4")
+        assert_that(proxy["d.e"]).is_equal_to([0, 0, 0])
+
+    def test_custom_delimiter(self, data):
+        assert_that(DotProxy(data, delimiter="/")["a/b"]).is_equal_to(1)
+
+    def test_compiled_path_is_cached(self):
+        assert_that(compile_path("a.b")).is_same_as(compile_path("a.b"))
+        assert_that(compile_path("a.b")).is_not_same_as(compile_path("a.b", "/"))
+
+    def test_get_many(self, data):
+        proxy = DotProxy(data)
+        assert_that(proxy.get_many(["a.b", "c", "d.[].e", "d.x"])).is_equal_to(
+            {"a.b": 1, "c": 3, "d.[].e": [1, 2], "d.x": [3]}
+        )
+
+    def test_get_many_missing(self, data):
+        proxy = DotProxy(data)
+        assert_that(proxy.get_many(["a.b", "a.z"], default=None)).is_equal_to(
+            {"a.b": 1, "a.z": None}
+        )
+        with pytest.raises(KeyError, match=r"keys=\['a', 'z'\]: error in key 'z'"):
+            proxy.get_many(["a.b", "a.z"])
+
+    def test_set_many(self, data):
+        proxy = DotProxy(data)
+        proxy.set_many({"a.b": 2, "d.[].e": 0, "c": 4})
+        assert_that(proxy.get_many(["a.b", "d.e", "c"])).is_equal_to(
+            {"a.b": 2, "d.e": [0, 0, 0], "c": 4}
+        )
+
+    def test_set_many_nested_paths(self, data):
+        proxy = DotProxy(data)
+        proxy.set_many({"a": {}, "a.b": 5})
+        assert_that(proxy["a"]).is_equal_to({"b": 5})
+
+    def test_copy_along_paths(self, data):
+        copy = copy_along_paths(data, ["d.[].e"])
+        DotProxy(copy).set_many({"d.[].e": "****"})
+        assert_that(copy["d"]).is_equal_to(
+            [{"e": "****"}, {"e": "****"}, {"x": 3, "e": "****"}]
+        )
+        assert_that(data["d"]).is_equal_to([{"e": 1}, {"e": 2}, {"x": 3}])
+        assert_that(copy["a"]).is_same_as(data["a"])
@@ -0,0 +1,150 @@
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from assertpy import assert_that
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.http_helper import HTTPHelper
+
+
+@pytest.fixture
+def api(stub_server):
+    api = WiremockApi(host=stub_server.host, port=stub_server.port)
+    api.post_mapping(
+        {
+            "request": {"method": "GET", "urlPath": "/pooled"},
+            "response": {"body": "pooled", "headers": {"Set-Cookie": "session=1"}},
+        }
+    )
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def http(stub_server, api):
+    with HTTPHelper(
+        host=stub_server.host, protocol=HTTPHelper.HTTP, port=stub_server.port
+    ) as http:
+        yield http
+
+
+def pooled_connections(http: HTTPHelper) -> list:
+    pools = http.session.get_adapter(http.base_url).poolmanager.pools
+    return [
+        conn
+        for key in pools.keys()
+        for conn in pools[key].pool.queue
+        if conn is not None
+    ]
+
+
+class TestConnectionPool:
+    def test_keep_alive_connection_is_reused(self, http):
+        for _ in range(5):
+            http.get("/pooled")
+
+        assert_that(http.pool_stats.as_dict()).is_equal_to({"hits": 4, "misses": 1})
+
+    def test_reconnect_is_miss(self, http):
+        http.get("/pooled")
+        # Peer-closed connection is detected as dropped when it's taken from the pool
+        for conn in pooled_connections(http):
+            if conn.sock:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+        http.get("/pooled")
+        http.get("/pooled")
+
+        assert_that(http.pool_stats.as_dict()).is_equal_to({"hits": 1, "misses": 2})
+
+    def test_cookies_are_not_persisted(self, http):
+        http.get("/pooled")
+
+        assert_that(http.session.cookies).is_empty()
+
+    def test_close(self, stub_server, api):
+        with HTTPHelper(
+            host=stub_server.host, protocol=HTTPHelper.HTTP, port=stub_server.port
+        ) as http:
+            http.get("/pooled")
+            adapter = http.session.get_adapter(http.base_url)
+            assert_that(adapter.poolmanager.pools).is_length(1)
+
+        assert_that(adapter.poolmanager.pools).is_empty()
+        # Closed helper opens a new session on the next request
+        http.get("/pooled")
+        assert_that(http.pool_stats.as_dict()).is_equal_to({"hits": 0, "misses": 2})
+        http.close()
+
+
+class TestErrorResponse:
+    @pytest.fixture
+    def error_http(self, stub_server, api):
+        api.post_mapping(
+            {
+                "request": {"method": "GET", "urlPath": "/error"},
+                "response": {"status": 500, "body": "e" * 10_000},
+            }
+        )
+        with HTTPHelper(
+            host=stub_server.host,
+            protocol=HTTPHelper.HTTP,
+            port=stub_server.port,
+            log_body_limit=100,
+        ) as http:
+            yield http
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_connection_is_released(self, error_http, stream):
+        for _ in range(3):
+            response = error_http.get("/error", expected_error="500", stream=stream)
+            assert_that(response).is_none()
+
+        # Connections which aren't released are missing in the queue of the pool
+        pools = error_http.session.get_adapter(error_http.base_url).poolmanager.pools
+        for key in pools.keys():
+            assert_that(pools[key].pool.qsize()).is_equal_to(pools[key].pool.maxsize)
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_body_is_truncated_in_log(self, error_http, stream, caplog):
+        with pytest.raises(requests.HTTPError):
+            error_http.get("/error", stream=stream)
+
+        assert_that(caplog.messages).contains(
+            f"{'e' * 100}... [truncated at 100 chars]"
+        )
+
+
+class TestTimingHooks:
+    def test_measure_delays_doesnt_mutate_hooks(self, http):
+        hooks_during_requests = []
+
+        def hook(timing):
+            hooks_during_requests.append(list(hooks))
+
+        http.add_timing_hook(hook)
+        hooks = http.timing_hooks
+        delays = http.measure_delays("GET", "/pooled", count=2)
+
+        # Lists of hooks which requests of other threads iterate are never changed
+        assert_that(hooks_during_requests).is_equal_to([[hook], [hook]])
+        assert_that(http.timing_hooks).is_equal_to([hook])
+        assert_that(delays["total"].count).is_equal_to(2)
+
+    def test_concurrent_measure_delays(self, stub_server, api):
+        with HTTPHelper(
+            host=stub_server.host,
+            protocol=HTTPHelper.HTTP,
+            port=stub_server.port,
+            pool_maxsize=8,
+        ) as http:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                futures = [
+                    executor.submit(http.measure_delays, "GET", "/pooled", count=20)
+                    for _ in range(8)
+                ]
+                counts = [future.result()["total"].count for future in futures]
+
+        assert_that(counts).is_equal_to([20] * 8)
+        assert_that(http.timing_hooks).is_empty()
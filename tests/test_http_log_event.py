@@ -0,0 +1,121 @@
+import logging
+
+import pytest
+from assertpy import assert_that
+
+from helpers.http_helper import HTTPHelper
+from helpers.http_log_event import HTTPLogEvent, truncate
+
+
+class Unprintable:
+    def __repr__(self):
+        raise AssertionError("Value after the limit was serialized")
+
+
+@pytest.fixture
+def debug_log(caplog):
+    caplog.set_level(logging.DEBUG, logger="helpers.http_helper")
+    return caplog
+
+
+class TestTruncate:
+    @pytest.mark.parametrize(
+        "value",
+        [
+            {"a": [1, "x", None], "b": {"c": (1,)}, 1: b"bytes"},
+            [1.5, True, ("t", 2)],
+            "text",
+            42,
+        ],
+    )
+    def test_not_truncated(self, value):
+        assert_that(truncate(value, 1000)).is_equal_to(str(value))
+
+    def test_truncated_container(self):
+        value = {"items": [{"id": i, "name": f"item {i}"} for i in range(1000)]}
+        assert_that(truncate(value, 50)).is_equal_to(
+            f"{str(value)[:50]}... [truncated at 50 chars]"
+        )
+
+    def test_serialization_stops_at_limit(self):
+        value = ["x" * 100, Unprintable()]
+        assert_that(truncate(value, 10)).starts_with("['xxxxxxxx")
+
+    def test_long_string(self):
+        assert_that(truncate("abcdef", 3)).is_equal_to("abc... [truncated at 3 chars]")
+
+    @pytest.mark.parametrize(
+        "value, limit, expected",
+        [
+            ("тело".encode(), 100, "тело"),
+            (b"abcdef", 3, "abc... [truncated at 3 chars]"),
+            (b"\xffab", None, "\ufffdab"),
+        ],
+    )
+    def test_bytes_are_decoded(self, value, limit, expected):
+        assert_that(truncate(value, limit)).is_equal_to(expected)
+
+    def test_no_limit(self):
+        value = {"a": "x" * 100}
+        assert_that(truncate(value, None)).is_equal_to(str(value))
+
+
+class TestHTTPLogEvent:
+    def test_format(self):
+        event = HTTPLogEvent("POST", "http://host/a", json={"a": 1}, body_limit=100)
+        event.headers = None
+        event.status_code = 200
+        event.response_data = {"b": 2}
+
+        assert_that(str(event).splitlines()[1:-1]).is_equal_to(
+            [
+                "URL: http://host/a",
+                "METHOD: POST",
+                "JSON: {'a': 1}",
+                "HEADERS: None",
+                "RESPONSE CODE: 200",
+                "RESPONSE DATA: {'b': 2}",
+            ]
+        )
+
+    def test_headers_before_response(self):
+        event = HTTPLogEvent("GET", "http://host/a")
+        assert_that(str(event)).does_not_contain("HEADERS")
+
+    def test_headers_are_sanitized_on_format(self):
+        calls = []
+
+        def sanitizer(headers):
+            calls.append(headers)
+            return {**headers, "Authorization": "****"}
+
+        event = HTTPLogEvent("GET", "http://host/a", headers_sanitizer=sanitizer)
+        headers = {"Authorization": "secret"}
+        event.headers = headers
+        assert_that(calls).is_empty()
+
+        assert_that(str(event)).contains("'Authorization': '****'").does_not_contain(
+            "secret"
+        )
+        assert_that(headers["Authorization"]).is_equal_to("secret")
+
+
+class TestLazyLogEvent:
+    def test_no_event_above_debug(self, caplog):
+        caplog.set_level(logging.INFO, logger="helpers.http_helper")
+        http = HTTPHelper("host")
+        assert_that(http._create_log_event("GET", "http://host/a")).is_none()
+
+    def test_event_at_debug(self, debug_log):
+        http = HTTPHelper("host", header_sanitizers=["Authorization"])
+        event = http._create_log_event("GET", "http://host/a")
+        event.headers = {"Authorization": "secret"}
+
+        assert_that(str(event)).contains("'Authorization': '****'")
+
+    @pytest.mark.parametrize("rate, created", [(0.0, False), (1.0, True)])
+    def test_sampling(self, debug_log, rate, created):
+        http = HTTPHelper("host", log_sample_rate=rate)
+        events = [http._create_log_event("GET", "http://host/a") for _ in range(20)]
+        assert_that(all(event is not None for event in events)).is_equal_to(created)
+        assert_that(any(event is not None for event in events)).is_equal_to(created)
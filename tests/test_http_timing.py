@@ -0,0 +1,134 @@
+import json
+import logging
+
+import pytest
+from assertpy import assert_that
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.http_helper import HTTPHelper
+from helpers.http_timing import (
+    BODY_READ,
+    CONNECT,
+    PARSE,
+    SANITIZE,
+    SEND,
+    TOTAL,
+    TTFB,
+    LatencyAggregator,
+    LatencyHistogram,
+    RequestTiming,
+)
+
+BASE = LatencyHistogram.BASE
+MIN_VALUE = LatencyHistogram.MIN_VALUE
+
+
+def histogram(*values) -> LatencyHistogram:
+    result = LatencyHistogram()
+    for value in values:
+        result.add(value)
+    return result
+
+
+class TestLatencyHistogram:
+    @pytest.mark.parametrize(
+        "value, index",
+        [
+            (0.0, LatencyHistogram.ZERO_BUCKET),
+            (MIN_VALUE / 10, 0),
+            (MIN_VALUE, 0),
+            (MIN_VALUE * 1.01, 1),
+            (MIN_VALUE * BASE**10 * 0.99, 10),
+            (MIN_VALUE * BASE**10 * 1.01, 11),
+        ],
+    )
+    def test_buckets(self, value, index):
+        assert_that(dict(histogram(value).buckets)).is_equal_to({index: 1})
+
+    def test_percentiles(self):
+        values = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+        result = histogram(*values)
+
+        # Percentile is the upper bound of its bucket: relative error is below BASE - 1
+        for percent in (50, 95, 99):
+            expected = values[percent - 1]
+            assert_that(result.percentile(percent)).is_between(
+                expected, expected * BASE
+            )
+        assert_that(result.percentile(100)).is_equal_to(0.1)
+
+    def test_percentile_is_capped_by_max(self):
+        assert_that(histogram(0.0123).percentile(50)).is_equal_to(0.0123)
+
+    def test_zeros_and_empty(self):
+        assert_that(histogram(0.0, 0.0, 1.0).percentile(50)).is_equal_to(0.0)
+        assert_that(LatencyHistogram().percentile(99)).is_equal_to(0.0)
+        assert_that(LatencyHistogram().summary()["mean"]).is_equal_to(0.0)
+
+    def test_merge(self):
+        merged = histogram(0.001, 0.002)
+        merged.merge(histogram(0.5, 0.003))
+
+        expected = histogram(0.001, 0.002, 0.5, 0.003)
+        assert_that(dict(merged.buckets)).is_equal_to(dict(expected.buckets))
+        assert_that(merged.summary()).is_equal_to(expected.summary())
+
+    def test_summary(self):
+        summary = histogram(0.001, 0.003).summary()
+        assert_that(summary).contains_entry({"count": 2}, {"max": 0.003})
+        assert_that(summary["mean"]).is_close_to(0.002, 1e-12)
+
+
+class TestLatencyAggregator:
+    def test_export_json(self, tmp_path):
+        aggregator = LatencyAggregator()
+        for ttfb in (0.01, 0.02):
+            timing = RequestTiming("GET", "/a")
+            timing.phases[TTFB] = ttfb
+            timing.phases[TOTAL] = ttfb * 2
+            aggregator(timing)
+        path = tmp_path / "timings.json"
+        aggregator.export_json(str(path))
+
+        exported = json.loads(path.read_text())
+        assert_that(exported).contains_only("GET /a")
+        assert_that(exported["GET /a"]).contains_only(TTFB, TOTAL)
+        assert_that(exported["GET /a"][TTFB]).contains_entry(
+            {"count": 2}, {"max": 0.02}
+        )
+
+    def test_request_phases(self, stub_server, caplog):
+        api = WiremockApi(host=stub_server.host, port=stub_server.port)
+        api.post_mapping(
+            {
+                "request": {"method": "GET", "urlPath": "/timed"},
+                "response": {
+                    "jsonBody": {"ok": True},
+                    "headers": {"Content-Type": "application/json"},
+                },
+            }
+        )
+        api.close()
+        # Headers are sanitized when the log record is formatted, at DEBUG level
+        caplog.set_level(logging.DEBUG, logger="helpers.http_helper")
+        aggregator = LatencyAggregator()
+        with HTTPHelper(
+            host=stub_server.host,
+            protocol=HTTPHelper.HTTP,
+            port=stub_server.port,
+            header_sanitizers=["Authorization"],
+        ) as http:
+            http.add_timing_hook(aggregator)
+            http.get("/timed?x=1")
+
+        phases = aggregator.summary()["GET /timed"]
+        assert_that(phases).contains_only(
+            CONNECT, SEND, TTFB, BODY_READ, PARSE, SANITIZE, TOTAL
+        )
+        for phase in phases.values():
+            assert_that(phase["count"]).is_equal_to(1)
+            assert_that(phase["max"]).is_greater_than(0)
+        measured = sum(
+            phases[phase]["max"] for phase in (CONNECT, SEND, TTFB, BODY_READ, PARSE)
+        )
+        assert_that(phases[TOTAL]["max"]).is_greater_than_or_equal_to(measured)
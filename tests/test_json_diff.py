@@ -0,0 +1,144 @@
+import pytest
+from assertpy import assert_that
+
+from helpers import json_diff as json_diff_module
+from helpers.json_diff import (
+    MISSING,
+    Difference,
+    assert_json_equal,
+    json_diff,
+    resolve_path,
+)
+
+
+@pytest.fixture
+def document():
+    return {
+        "id": 1,
+        "updated": "2024-01-01",
+        "items": [{"id": i, "tags": ["a", "b"], "updated": i} for i in range(3)],
+    }
+
+
+class TestJsonDiff:
+    def test_equal(self, document):
+        assert_that(json_diff(document, {**document})).is_empty()
+
+    def test_paths(self, document):
+        actual = {**document, "id": 2, "extra": True, "items": document["items"][:2]}
+        del actual["updated"]
+        actual["items"][1] = {**actual["items"][1], "tags": ["a", "c"]}
+
+        assert_that(json_diff(document, actual)).is_equal_to(
+            [
+                Difference("id", 1, 2),
+                Difference("updated", "2024-01-01", MISSING),
+                Difference("items.[1].tags.[1]", "b", "c"),
+                Difference("items.[2]", document["items"][2], MISSING),
+                Difference("extra", MISSING, True),
+            ]
+        )
+
+    def test_ignore_paths(self, document):
+        actual = {**document, "updated": "now"}
+        actual["items"] = [{**item, "updated": 0} for item in document["items"]]
+
+        differences = json_diff(
+            document, actual, ignore_paths=["updated", "items.[].updated"]
+        )
+        assert_that(differences).is_empty()
+
+    def test_unordered_paths(self, document):
+        actual = {**document, "items": document["items"][::-1]}
+        actual["items"][0] = {**actual["items"][0], "tags": ["b", "a"]}
+
+        differences = json_diff(
+            document, actual, unordered_paths=["items", "items.[].tags"]
+        )
+        assert_that(differences).is_empty()
+        assert_that(json_diff(document, actual)).is_not_empty()
+
+    def test_unordered_changed_element(self, document):
+        actual = {**document, "items": document["items"][::-1]}
+        actual["items"][2] = {**actual["items"][2], "id": 5}
+
+        differences = json_diff(
+            document, actual, unordered_paths=["items"], ignore_paths=["id"]
+        )
+        assert_that(differences).is_equal_to([Difference("items.[0].id", 0, 5)])
+
+    def test_numbers_with_equal_hashes(self):
+        # hash(-1) == hash(-2) in CPython
+        assert_that(json_diff([-1], [-2], unordered_paths=[""])).is_length(1)
+
+    def test_max_differences(self):
+        expected = {str(i): i for i in range(100)}
+        actual = {str(i): -i for i in range(1, 101)}
+
+        assert_that(json_diff(expected, actual, max_differences=5)).is_length(5)
+        with pytest.raises(AssertionError, match=r"the first 5 differences"):
+            assert_json_equal(actual, expected, max_differences=5)
+
+    @pytest.mark.parametrize(
+        "expected, actual",
+        [
+            ({}, {str(i): i for i in range(10)}),
+            ({str(i): i for i in range(10)}, {}),
+            ([], list(range(10))),
+        ],
+    )
+    def test_max_differences_of_missing_values(self, expected, actual):
+        assert_that(json_diff(expected, actual, max_differences=3)).is_length(3)
+
+    def test_exactly_max_differences(self):
+        with pytest.raises(AssertionError, match=r"Documents differ \(5 differences\)"):
+            assert_json_equal(list(range(5)), [-1] * 5, max_differences=5)
+
+    def test_paths_are_resolvable(self, document):
+        actual = {
+            **document,
+            "items": [{**item, "id": -1} for item in document["items"]],
+        }
+        actual["items"][1]["tags"] = ["a"]
+
+        differences = json_diff(document, actual)
+        assert_that(differences).is_length(4)
+        for difference in differences:
+            for data, value in (
+                (document, difference.expected),
+                (actual, difference.actual),
+            ):
+                if value is MISSING:
+                    with pytest.raises(KeyError):
+                        resolve_path(data, difference.path)
+                else:
+                    assert_that(resolve_path(data, difference.path)).is_equal_to(value)
+
+    def test_ignore_index_paths(self, document):
+        actual = {**document, "items": [dict(item) for item in document["items"]]}
+        actual["items"][2]["updated"] = "now"
+        actual["items"][1]["tags"] = ["a", "b", "c"]
+
+        differences = json_diff(
+            document, actual, ignore_paths=["items.[2].updated", "items.[1].tags.[2]"]
+        )
+        assert_that(differences).is_empty()
+        assert_that(json_diff(document, actual)).is_length(2)
+
+    def test_index_under_unordered_path(self, document):
+        with pytest.raises(ValueError, match=r"items\.\[0\]"):
+            json_diff(
+                document,
+                document,
+                unordered_paths=["items"],
+                ignore_paths=["items.[0].id"],
+            )
+
+    def test_unordered_digest_collision(self, document, monkeypatch):
+        # Elements with equal digests are compared before they are matched
+        monkeypatch.setattr(json_diff_module, "_digest", lambda value, rules=None: 0)
+        actual = {**document, "items": document["items"][::-1]}
+        actual["items"][0] = {**actual["items"][0], "id": 5}
+
+        differences = json_diff(document, actual, unordered_paths=["items"])
+        assert_that(differences).is_equal_to([Difference("items.[2].id", 2, 5)])
@@ -0,0 +1,141 @@
+import pytest
+from assertpy import assert_that
+
+from helpers.http_helper import HTTPHelper
+from helpers.http_timing import TOTAL, LatencyHistogram
+from helpers.load_runner import (
+    UNEXPECTED_RESPONSE,
+    LoadRequest,
+    LoadRunner,
+    compare_reports,
+)
+from helpers.mocker import Mapping, Mocker, Request, Response
+
+BASE = LatencyHistogram.BASE
+
+
+class FakeClock:
+    """Clock of LoadRunner which moves only by `sleep`."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, delay: float):
+        self.now += delay
+
+
+@pytest.fixture
+def local_http(stub_server):
+    mocker = Mocker(host=stub_server.host, port=stub_server.port)
+    mocker.create_mapping(
+        Mapping(
+            name="load",
+            request=Request(method="GET", urlPath="/load"),
+            response=Response(body="ok"),
+        )
+    )
+    mocker.close()
+    with HTTPHelper(
+        host=stub_server.host,
+        protocol=HTTPHelper.HTTP,
+        port=stub_server.port,
+        pool_maxsize=4,
+    ) as http:
+        yield http
+
+
+class TestLoadRunner:
+    def test_closed_loop(self, local_http):
+        runner = LoadRunner(
+            local_http,
+            [
+                dict(method=HTTPHelper.GET, rel_url="/load"),
+                (dict(method=HTTPHelper.GET, rel_url="/missing"), 0.5),
+            ],
+            concurrency=4,
+        )
+        report = runner.run(count=60).as_dict()
+
+        assert_that(report["requests"]).is_equal_to(60)
+        assert_that(report["latency"]).contains_key("total", "GET /load")
+        assert_that(report["latency"]["total"]["p99"]).is_positive()
+        assert_that(report["errors"]).contains_only("GET /missing: HTTPError")
+
+    def test_unexpected_response(self, local_http):
+        runner = LoadRunner(
+            local_http,
+            [
+                LoadRequest(
+                    dict(method=HTTPHelper.GET, rel_url="/load"), expected="ok"
+                ),
+                LoadRequest(
+                    dict(method=HTTPHelper.GET, rel_url="/load"),
+                    name="wrong body",
+                    expected="other",
+                ),
+            ],
+            concurrency=2,
+        )
+        report = runner.run(count=20).as_dict()
+
+        assert_that(report["errors"]).contains_only(
+            f"wrong body: {UNEXPECTED_RESPONSE}"
+        )
+        assert_that(report["error_rate"]).is_greater_than(0)
+
+    def test_rate(self, local_http):
+        clock = FakeClock()
+        runner = LoadRunner(
+            local_http,
+            [dict(method=HTTPHelper.GET, rel_url="/load")],
+            concurrency=1,
+            rate=200,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+        report = runner.run(duration=0.1)
+
+        # Requests are scheduled every 5 ms from the start: the last one at 95 ms
+        assert_that(report.requests).is_equal_to(20)
+        assert_that(report.duration).is_close_to(0.095, 1e-9)
+
+    def test_latency_from_scheduled_time(self, local_http):
+        clock = FakeClock()
+        requester = local_http.requester
+
+        def stalled_requester(**kwargs):
+            # The first response takes 23 ms: requests 2-5 are sent late
+            if clock.now == 0.0:
+                clock.sleep(0.023)
+            return requester(**kwargs)
+
+        local_http.requester = stalled_requester
+        runner = LoadRunner(
+            local_http,
+            [dict(method=HTTPHelper.GET, rel_url="/load")],
+            concurrency=1,
+            rate=200,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+        total = runner.run(count=6).histograms[TOTAL]
+
+        # Latencies: 23, 18, 13, 8, 3, 0 ms
+        assert_that(total.count).is_equal_to(6)
+        assert_that(total.max).is_close_to(0.023, 1e-9)
+        assert_that(total.percentile(50)).is_between(0.008, 0.008 * BASE)
+
+    def test_compare_reports(self):
+        def report(throughput, p99):
+            summary = {"p50": 0.001, "p95": 0.002, "p99": p99}
+            return {
+                "throughput": throughput,
+                "error_rate": 0.0,
+                "latency": {"total": summary},
+            }
+
+        assert_that(compare_reports(report(100, 0.003), report(95, 0.0031))).is_empty()
+        assert_that(compare_reports(report(100, 0.003), report(50, 0.01))).is_length(2)
@@ -0,0 +1,130 @@
+import pytest
+from assertpy import assert_that
+
+from helpers import mapping_analyzer
+from helpers.mapping_analyzer import (
+    MappingAnalyzer,
+    probe_request,
+    regex_literal_prefix,
+    regex_literals,
+    regex_sample,
+)
+from helpers.mocker import Mapping, Request, Response
+from helpers.request_matcher import IncomingRequest
+
+
+def mapping(name, priority=None, **request):
+    mapping = Mapping(
+        name=name, request=Request(**request), response=Response(body=name)
+    )
+    content = mapping.model_dump()
+    content["priority"] = priority
+    return content
+
+
+class TestMappingAnalyzer:
+    def test_regex_helpers(self):
+        assert_that(regex_literal_prefix("/url-equalty/[a-z]*")).is_equal_to(
+            "/url-equalty/"
+        )
+        assert_that(regex_sample(r"/items/\d+/(a|b)")).is_equal_to("/items/0/a")
+
+    @pytest.mark.parametrize(
+        "pattern, prefix, literals",
+        [
+            (".*/items/a?b", "", ["/items/", "b"]),
+            (r"^/a\.b+c$", "/a.b", ["/a.b", "c"]),
+            ("/x(/y|/z)?/w", "/x", ["/x", "/w"]),
+            ("/a{2,3}bc", "/", ["/", "bc"]),
+            ("/a[]x]+yz", "/a", ["/a", "yz"]),
+            ("(?i)/abc", "", []),
+            ("/a|/b", "", []),
+            (".*", "", []),
+        ],
+    )
+    def test_regex_literals(self, pattern, prefix, literals):
+        assert_that(regex_literals(pattern)).is_equal_to((prefix, literals))
+
+    def test_conflicts(self):
+        analyzer = MappingAnalyzer(
+            [
+                mapping("exact", method="GET", urlPath="/items/abc"),
+                mapping("regex", method="GET", urlPattern="/items/[a-z]+"),
+                mapping("post", method="POST", urlPath="/items/abc"),
+                mapping(
+                    "prioritized", priority=1, method="GET", urlPattern="/other/.*"
+                ),
+                mapping("other", method="GET", urlPath="/other/x"),
+            ]
+        )
+        conflicts = {c.mapping["name"]: c for c in analyzer.conflicts()}
+
+        assert_that(conflicts).contains_only("exact", "other")
+        assert_that(conflicts["exact"].winner["name"]).is_equal_to("regex")
+        assert_that(conflicts["exact"].ambiguous).is_true()
+        assert_that(conflicts["other"].winner["name"]).is_equal_to("prioritized")
+        assert_that(conflicts["other"].ambiguous).is_false()
+
+    def test_conflicts_without_regex_parser(self, monkeypatch):
+        """Regex mappings without probe overlap with all mappings of the same method."""
+        monkeypatch.setattr(mapping_analyzer, "sre_parse", None)
+        analyzer = MappingAnalyzer(
+            [
+                mapping("exact", method="GET", urlPath="/items/abc"),
+                mapping("regex", method="GET", urlPattern="/items/[a-z]+"),
+                mapping("post", method="POST", urlPath="/items/abc"),
+                mapping("any", method="ANY", urlPath="/other"),
+            ]
+        )
+        assert_that(regex_sample("/items/[a-z]+")).is_none()
+        assert_that(probe_request({"urlPattern": "/items/[a-z]+"})).is_none()
+
+        pairs = {tuple(m["name"] for m in c.matched) for c in analyzer.conflicts()}
+        assert_that(pairs).is_equal_to({("regex", "exact"), ("any", "regex")})
+
+    def test_predict(self):
+        analyzer = MappingAnalyzer(
+            [
+                mapping(
+                    "limit",
+                    method="GET",
+                    urlPath="/items",
+                    queryParameters={"limit": {"equalTo": "1"}},
+                ),
+                mapping("any", method="ANY", urlPattern="/items.*"),
+            ]
+        )
+        assert_that(analyzer.predict("GET", "/items?limit=1")["name"]).is_equal_to(
+            "any"
+        )
+        assert_that(analyzer.predict("POST", "/items")["name"]).is_equal_to("any")
+        assert_that(analyzer.predict("GET", "/unknown")).is_none()
+
+    def test_conflict_pair_is_reported_once(self):
+        analyzer = MappingAnalyzer(
+            [
+                mapping("first", method="GET", urlPath="/same"),
+                mapping("second", method="GET", urlPath="/same"),
+            ]
+        )
+        conflicts = analyzer.conflicts()
+
+        assert_that(conflicts).is_length(1)
+        assert_that(conflicts[0].mapping["name"]).is_equal_to("first")
+        assert_that([m["name"] for m in conflicts[0].matched]).is_equal_to(
+            ["second", "first"]
+        )
+
+    def test_regexes_without_prefix_are_indexed(self):
+        analyzer = MappingAnalyzer(
+            [
+                mapping(str(i), method="GET", urlPattern=f".*/items/{i}")
+                for i in range(500)
+            ]
+        )
+        candidates = set(analyzer._candidates(IncomingRequest("GET", "/api/items/7")))
+
+        assert_that(len(candidates)).is_less_than(20)
+        assert_that(analyzer.predict("GET", "/api/items/7")["name"]).is_equal_to("7")
+        assert_that(analyzer.predict("GET", "/v2/items/321")["name"]).is_equal_to("321")
+        assert_that(analyzer.conflicts()).is_empty()
@@ -0,0 +1,201 @@
+import pytest
+import requests
+from assertpy import assert_that
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.http_helper import HTTPHelper
+from helpers.mocker import Mapping, Mocker, Request, Response
+
+
+def mappings(count, body="body"):
+    return [
+        Mapping(
+            name=f"mapping {i}",
+            request=Request(method="GET", urlPath=f"/mapping/{i}"),
+            response=Response(body=body),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def local_mocker(stub_server):
+    mocker = Mocker(host=stub_server.host, port=stub_server.port)
+    yield mocker
+    mocker.close()
+
+
+class TestMocker:
+    def test_create_mappings(self, local_mocker):
+        source = mappings(5)
+        result = local_mocker.create_mappings(source, batch_size=2)
+
+        assert_that(result.ok).is_true()
+        server_ids = [m["id"] for m in local_mocker.api.get_mappings()["mappings"]]
+        assert_that(server_ids).is_equal_to(result.ids)
+        assert_that(source[0].response.body).is_equal_to("body")
+
+    def test_create_mappings_failed_chunk(self, local_mocker, monkeypatch):
+        import_mappings = local_mocker.api.import_mappings
+
+        def reject_second_chunk(contents, **kwargs):
+            if any(content["name"] == "mapping 2" for content in contents):
+                raise requests.HTTPError("422 Client Error: Unprocessable Entity")
+            return import_mappings(contents, **kwargs)
+
+        monkeypatch.setattr(local_mocker.api, "import_mappings", reject_second_chunk)
+        result = local_mocker.create_mappings(mappings(5), batch_size=2)
+
+        assert_that(result.ok).is_false()
+        assert_that(result.ids).is_length(5)
+        assert_that(result.ids[2:4]).is_equal_to([None, None])
+        assert_that(result.failures).is_length(1)
+        start, names, error = result.failures[0]
+        assert_that(start).is_equal_to(2)
+        assert_that(names).is_equal_to(["mapping 2", "mapping 3"])
+        assert_that(error).is_instance_of(requests.HTTPError)
+        # The other chunks are imported
+        server_ids = [m["id"] for m in local_mocker.api.get_mappings()["mappings"]]
+        assert_that(server_ids).is_equal_to([id for id in result.ids if id is not None])
+
+    def test_create_mapping_keeps_mapping(self, local_mocker):
+        mapping = mappings(1)[0]
+        local_mocker.create_mapping(mapping)
+        assert_that(mapping.response.body).is_equal_to("body")
+
+    def test_mapping_factory(self, local_mocker, stub_server):
+        template = Mapping(
+            name="mapping ${i}",
+            request=Request(method="GET", urlPath="/mapping/${i}"),
+            response=Response(body="${body}"),
+        )
+        factory = local_mocker.mapping_factory(template)
+        assert_that(factory.params).is_equal_to({"i", "body"})
+        assert_that(factory.build).raises(ValueError).when_called_with(i=0)
+
+        variants = list(
+            factory.build_many({"i": i, "body": f"body {i}"} for i in range(3))
+        )
+        result = local_mocker.create_mappings(variants)
+
+        assert_that(result.ids).is_equal_to([v.id for v in variants])
+        assert_that([v.name for v in variants]).contains("mapping 2")
+        assert_that(template.request.urlPath).is_equal_to("/mapping/${i}")
+        with HTTPHelper(
+            host=stub_server.host, protocol=HTTPHelper.HTTP, port=stub_server.port
+        ) as http:
+            assert_that(http.get("/mapping/2")).is_equal_to("body 2")
+
+    def test_sync(self, local_mocker):
+        result = local_mocker.sync(mappings(3))
+        assert_that(result.created).is_length(3)
+
+        result = local_mocker.sync(mappings(3))
+        assert_that(result.unchanged).is_equal_to(3)
+        assert_that(result.created + result.updated + result.deleted).is_empty()
+
+        changed = mappings(2)
+        changed[1].response.body = "changed"
+        result = local_mocker.sync(changed)
+        assert_that(result.updated).is_length(1)
+        assert_that(result.deleted).is_length(1)
+        assert_that(result.unchanged).is_equal_to(1)
+        assert_that(local_mocker.api.get_mappings()["mappings"]).is_length(2)
+
+    def test_sync_keeps_not_synced_mappings(self, local_mocker):
+        local_mocker.create_mapping(mappings(1)[0])
+        local_mocker.sync(mappings(2))
+        local_mocker.sync([])
+        assert_that(local_mocker.api.get_mappings()["mappings"]).is_length(1)
+
+    def test_body_files(self, stub_server, tmp_path):
+        mocker = Mocker(
+            host=stub_server.host, port=stub_server.port, body_file_threshold=100
+        )
+        large = {"items": list(range(100))}
+        for i in range(3):
+            mocker.create_mapping(
+                Mapping(
+                    name=f"large {i}",
+                    request=Request(method="GET", urlPath=f"/large/{i}"),
+                    response=Response(jsonBody=large),
+                )
+            )
+        mocker.create_mapping(mappings(1)[0])
+        fixture = tmp_path / "fixture.txt"
+        fixture.write_bytes(b"fixture")
+        name = mocker.upload_body(str(fixture))
+        file_mapping = Mapping(
+            name="file",
+            request=Request(method="GET", urlPath="/file"),
+            response=Response(bodyFileName=name),
+        )
+        mapping_id = mocker.create_mapping(file_mapping)
+
+        # The same body is uploaded once for all mappings, small bodies are inlined
+        assert_that(mocker.api.get_files()).is_length(2).contains(name)
+        assert_that(mocker.api.get_file(name)).is_equal_to(b"fixture")
+        with HTTPHelper(
+            host=stub_server.host, protocol=HTTPHelper.HTTP, port=stub_server.port
+        ) as http:
+            assert_that(http.get("/large/2")).is_equal_to(large)
+            assert_that(http.get("/mapping/0")).is_equal_to("body")
+            assert_that(http.get("/file", headers={})).is_equal_to(b"fixture")
+
+        assert_that(mocker.delete_unused_body_files()).is_empty()
+        mocker.api.delete_mapping(mapping_id)
+        assert_that(mocker.delete_unused_body_files()).is_equal_to([name])
+        assert_that(mocker.api.get_files()).is_length(1)
+        mocker.close()
+
+    def test_delete_unused_body_files_with_cache(self, stub_server, tmp_path):
+        mocker = Mocker(host=stub_server.host, port=stub_server.port)
+        mocker.api = WiremockApi(
+            host=stub_server.host, port=stub_server.port, cache_ttl=60
+        )
+        fixture = tmp_path / "body.bin"
+        fixture.write_bytes(b"fixture")
+        name = mocker.upload_body(str(fixture))
+        mocker.api.get_mappings()  # The cache has no mapping with the file
+
+        # Other client refers to the file, the cache of this one isn't invalidated
+        other = Mocker(host=stub_server.host, port=stub_server.port)
+        other.create_mapping(
+            Mapping(
+                name="other",
+                request=Request(method="GET", urlPath="/other"),
+                response=Response(bodyFileName=name),
+            )
+        )
+        other.close()
+
+        assert_that(mocker.delete_unused_body_files()).is_empty()
+        assert_that(mocker.api.get_files()).contains(name)
+        mocker.close()
+
+    def test_namespaces(self, stub_server):
+        mockers = {
+            namespace: Mocker(
+                host=stub_server.host, port=stub_server.port, namespace=namespace
+            )
+            for namespace in ["gw0", "gw1"]
+        }
+        for namespace, mocker in mockers.items():
+            mocker.create_mapping(mappings(1, body=namespace)[0])
+
+        for namespace, mocker in mockers.items():
+            with HTTPHelper(
+                host=stub_server.host,
+                protocol=HTTPHelper.HTTP,
+                port=stub_server.port,
+                common_headers=mocker.namespace_headers,
+            ) as http:
+                assert_that(http.get("/mapping/0")).is_equal_to(namespace)
+
+        mockers["gw0"].delete_namespace_mappings()
+        remaining = mockers["gw1"].api.get_mappings()["mappings"]
+        assert_that([m["metadata"]["namespace"] for m in remaining]).is_equal_to(
+            ["gw1"]
+        )
+        for mocker in mockers.values():
+            mocker.close()
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+import pytest
+from assertpy import assert_that
+
+import helpers
+
+
+def loaded_modules(code: str) -> set:
+    """Names of modules loaded by the code in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}; import sys; print(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+class TestPackage:
+    def test_lazy_exports(self):
+        for name in helpers.__all__:
+            assert_that(getattr(helpers, name).__name__).is_equal_to(name)
+
+    def test_unknown_name(self):
+        with pytest.raises(AttributeError):
+            helpers.Unknown
+
+    @pytest.mark.parametrize(
+        "code, not_loaded",
+        [
+            ("import helpers", {"pydantic", "requests", "asyncio"}),
+            (
+                "from helpers import DotProxy, assert_json_equal",
+                {"pydantic", "requests"},
+            ),
+            ("import helpers.mocker", {"requests", "urllib3"}),
+            ("import helpers.response_template", {"requests", "urllib3"}),
+            ("import helpers.api.wiremock_api", {"asyncio"}),
+        ],
+    )
+    def test_heavy_modules_are_not_loaded(self, code, not_loaded):
+        assert_that(loaded_modules(code) & not_loaded).is_empty()
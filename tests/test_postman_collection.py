@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+
+import pytest
+import requests
+from assertpy import assert_that
+from pytest_cases import case, parametrize_with_cases
+
+from helpers.http_helper import HTTPHelper
+from helpers.json_diff import assert_json_equal
+from helpers.mocker import Mocker
+from helpers.postman_importer import PostmanCase, iter_postman_cases, load_postman_cases
+from tests.conftest import log_info_blue, log_info_magenta
+
+log = logging.getLogger(__name__)
+
+ROOT_DIR = f"{os.path.dirname(os.path.abspath(__file__))}/.."
+COLLECTION_PATH = f"{ROOT_DIR}/wiremock-demo.postman_collection.json"
+CACHE_DIR = f"{ROOT_DIR}/.pytest_cache/postman"
+
+
+def _case_function(postman_case: PostmanCase):
+    marks = [pytest.mark.requires_wiremock] if postman_case.requires_wiremock else []
+    if postman_case.slow:
+        marks.append(pytest.mark.slow)
+
+    @case(id=postman_case.id, marks=marks)
+    def case_postman():
+        return (
+            postman_case.mapping.model_copy(deep=True),
+            dict(postman_case.check_request),
+            postman_case.expected_response,
+        )
+
+    return case_postman
+
+
+# Cases are generated from the collection, so both are not maintained by hand
+POSTMAN_CASES = [
+    _case_function(postman_case)
+    for postman_case in load_postman_cases(COLLECTION_PATH, cache_dir=CACHE_DIR)
+]
+
+
+class TestPostmanCollection:
+    @pytest.mark.preload_stubs
+    @parametrize_with_cases("case", cases=POSTMAN_CASES)
+    def test_postman_case(
+        self,
+        mocker: Mocker,
+        http: HTTPHelper,
+        preloaded_stubs: set,
+        request,
+        case,
+        current_cases,
+    ):
+        mapping, check_request, expected_response = case
+        log_info_magenta(f"Test title: {current_cases['case'].id}")
+
+        if request.node.nodeid in preloaded_stubs:
+            log_info_blue("1. Stub was preloaded")
+        else:
+            log_info_blue("1. Create stub")
+            mocker.create_mapping(mapping)
+
+        log_info_blue("2. Check stub")
+        log.info(f"\nRequest: {json.dumps(check_request, indent=2)}")
+        if mapping.response.fault:
+            # Connection is broken by the stub, there is no response
+            with pytest.raises(requests.RequestException):
+                http.requester(**check_request)
+            return
+        data = http.requester(**check_request)
+        if expected_response is not None:
+            assert_json_equal(data, expected_response)
+
+    def test_cache(self, tmp_path):
+        cases = load_postman_cases(COLLECTION_PATH, cache_dir=str(tmp_path))
+        cached_cases = load_postman_cases(COLLECTION_PATH, cache_dir=str(tmp_path))
+
+        assert_that(os.listdir(tmp_path)).is_length(1)
+        assert_that([c.to_dict() for c in cached_cases]).is_equal_to(
+            [c.to_dict() for c in cases]
+        )
+
+    def test_skipped_items_are_logged(self, tmp_path, caplog):
+        def item(name, method, url, body=None):
+            request = {"method": method, "url": {"raw": f"http://localhost:8080{url}"}}
+            if body is not None:
+                request["body"] = {"mode": "raw", "raw": json.dumps(body)}
+            return {"name": name, "request": request}
+
+        collection = {
+            "item": [
+                item(
+                    "[mapping] state",
+                    "POST",
+                    "/__admin/mappings",
+                    {
+                        "scenarioName": "list",
+                        "request": {"method": "GET", "url": "/state"},
+                        "response": {"body": "[]"},
+                    },
+                ),
+                item(
+                    "[mapping] cookies",
+                    "POST",
+                    "/__admin/mappings",
+                    {
+                        "request": {
+                            "method": "GET",
+                            "url": "/cookies",
+                            "cookies": {"session": {"contains": "1"}},
+                        },
+                        "response": {"body": "ok"},
+                    },
+                ),
+                item("[check] state", "GET", "/state"),
+                item("[check] cookies", "GET", "/cookies"),
+                item("[scenario] reset", "POST", "/__admin/scenarios/reset"),
+            ]
+        }
+        path = tmp_path / "collection.json"
+        path.write_text(json.dumps(collection))
+
+        with caplog.at_level(logging.WARNING, logger="helpers.postman_importer"):
+            cases = list(iter_postman_cases(str(path)))
+
+        assert_that(cases).is_empty()
+        skipped = [r.getMessage() for r in caplog.records]
+        assert_that(skipped).is_length(4)
+        assert_that(skipped[0]).contains("[mapping] state", "scenarioName")
+        assert_that(skipped[1]).contains("[check] state")
+        assert_that(skipped[2]).contains("[check] cookies")
+        assert_that(skipped[3]).contains("[scenario] reset")
@@ -0,0 +1,105 @@
+import pytest
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import pytest
+from pytest_cases import case, parametrize_with_cases
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.mocker import Mapping, Request, Response
+
+IMPORTED = []
+
+
+def mapping(name, **request):
+    return Mapping(
+        name=name, request=Request(method="GET", **request), response=Response(body=name)
+    )
+
+
+class Cases:
+    def case_first(self):
+        return mapping("first", urlPath="/first"), "/first"
+
+    def case_second(self):
+        return mapping("second", urlPath="/second"), "/second"
+
+    def case_exact(self):
+        return mapping("exact", urlPath="/overlap/a"), "/overlap/a"
+
+    def case_regex(self):
+        return mapping("regex", urlPattern="/overlap/[a-z]"), "/overlap/b"
+
+    @case(marks=pytest.mark.isolated_stub)
+    def case_isolated(self):
+        return mapping("isolated", urlPath="/isolated"), "/isolated"
+
+
+class MarkedCases:
+    def case_marked(self):
+        return mapping("marked", urlPath="/marked"), "/marked"
+
+
+# Mapping name -> whether it should be preloaded
+EXPECTED = {
+    "first": True,
+    "second": True,
+    "exact": False,
+    "regex": False,
+    "isolated": False,
+    "marked": False,
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def count_imports():
+    import_mappings = WiremockApi.import_mappings
+
+    def counted(self, mappings, **kwargs):
+        IMPORTED.append(len(mappings))
+        return import_mappings(self, mappings, **kwargs)
+
+    WiremockApi.import_mappings = counted
+    yield
+    WiremockApi.import_mappings = import_mappings
+    print(f"IMPORTED={IMPORTED}")
+
+
+def check(mocker, http, preloaded_stubs, request, stub, url):
+    preloaded = request.node.nodeid in preloaded_stubs
+    assert preloaded == EXPECTED[stub.name]
+    if not preloaded:
+        mocker.create_mapping(stub)
+    assert http.get(url) == stub.response.body
+
+
+@pytest.mark.preload_stubs
+@parametrize_with_cases("case", cases=Cases)
+def test_stub(mocker, http, preloaded_stubs, request, case):
+    check(mocker, http, preloaded_stubs, request, *case)
+
+
+@pytest.mark.preload_stubs
+@pytest.mark.isolated_stub
+@parametrize_with_cases("case", cases=MarkedCases)
+def test_marked(mocker, http, preloaded_stubs, request, case):
+    check(mocker, http, preloaded_stubs, request, *case)
+"""
+
+
+@pytest.fixture
+def suite(pytester):
+    # Hooks and fixtures of the project conftest are imported into the generated one
+    pytester.makeconftest("from tests.conftest import *")
+    pytester.makepyfile(test_preload=TEST_MODULE)
+    return pytester
+
+
+class TestPreloadStubs:
+    def test_selection(self, suite):
+        result = suite.runpytest("-s", "-p", "no:cacheprovider")
+
+        result.assert_outcomes(passed=6)
+        # Only non-overlapping mappings without isolated_stub are imported, in one request
+        result.stdout.fnmatch_lines(["*IMPORTED=[[]2[]]*"])
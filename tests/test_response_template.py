@@ -0,0 +1,91 @@
+import pytest
+from assertpy import assert_that
+
+from helpers.json_diff import assert_json_equal
+from helpers.mocker import Mapping, Request, Response
+from helpers.response_template import (
+    TemplateError,
+    compile_template,
+    render_mapping,
+    render_template,
+    validate_templates,
+)
+from tests.test_stubbing import ResponseTemplatingCases
+
+# Cases which need real WireMock in test_stubbing.py are rendered offline here
+TEMPLATING_CASES = [
+    name for name in dir(ResponseTemplatingCases) if name.startswith("case_")
+]
+
+
+def templated_mapping(json_body: dict) -> Mapping:
+    return Mapping(
+        name="templated",
+        request=Request(method="GET", urlPath="/templated"),
+        response=Response(transformers=["response-template"], jsonBody=json_body),
+    )
+
+
+class TestResponseTemplate:
+    @pytest.mark.parametrize("case_name", TEMPLATING_CASES)
+    def test_templating_cases(self, case_name):
+        mapping, check_request, expected_response = getattr(
+            ResponseTemplatingCases(), case_name
+        )()
+        assert_json_equal(render_mapping(mapping, check_request), expected_response)
+
+    @pytest.mark.parametrize(
+        "template, expected",
+        [
+            ("{{request.pathSegments.[0]}}", "a"),
+            ("{{request.query.q}}", "[1, 2]"),
+            ("{{request.headers.x-header}}", "&lt;h&gt;"),
+            ("{{{request.headers.X-Header}}}", "<h>"),
+            (
+                "{{#each request.pathSegments as |s|}}{{@index}}={{s}};{{/each}}",
+                "0=a;1=b;",
+            ),
+            (
+                "{{#unless request.body}}empty{{else}}{{upper request.body}}{{/unless}}",
+                "BODY",
+            ),
+            ("{{#if (gt (size request.pathSegments) 1)}}many{{/if}}", "many"),
+            (
+                "{{parseJson '{\"a\": [1, 2]}' 'x'}}{{x.a.[1]}} {{jsonPath '{\"b\": 3}' '$.b'}}",
+                "2 3",
+            ),
+            ("{{math 7 '/' 2}} {{math 6 '/' 2}}", "3.5 3"),
+        ],
+    )
+    def test_render_template(self, template, expected):
+        mapping = templated_mapping({"value": template})
+        check_request = dict(
+            method="GET",
+            rel_url="/a/b?q=1&q=2",
+            headers={"X-Header": "<h>", "Accept": "application/json"},
+            data="body",
+        )
+        assert_that(render_mapping(mapping, check_request)).is_equal_to(
+            {"value": expected}
+        )
+
+    def test_compile_cache(self):
+        assert_that(compile_template("{{request.body}}")).is_same_as(
+            compile_template("{{request.body}}")
+        )
+        assert_that(
+            render_template("{{request.body}}", {"request": {"body": 1}})
+        ).is_equal_to("1")
+
+    def test_validate_templates(self):
+        mappings = [
+            templated_mapping({"ok": "{{capitalize request.body}}"}),
+            templated_mapping({"unknown": "{{unknownHelper request.body}}"}),
+            templated_mapping({"not_closed": "{{#if request.body}}"}),
+        ]
+        for i, mapping in enumerate(mappings):
+            mapping.name = f"mapping {i}"
+
+        errors = validate_templates(mappings)
+        assert_that(errors).contains_only("mapping 1", "mapping 2")
+        assert_that(errors["mapping 1"]).is_instance_of(TemplateError)
@@ -0,0 +1,110 @@
+import uuid
+from contextlib import ExitStack
+
+import pytest
+from assertpy import assert_that
+from requests import HTTPError
+
+from helpers.api.sharded_wiremock_api import ShardedWiremockApi
+from helpers.hash_ring import HashRing
+from helpers.http_helper import HTTPHelper
+from helpers.mocker import Mapping, Request, Response
+from helpers.stub_server import StubServer
+
+
+@pytest.fixture
+def sharded_api():
+    with ExitStack() as stack:
+        servers = [stack.enter_context(StubServer()) for _ in range(3)]
+        api = ShardedWiremockApi([f"{s.host}:{s.port}" for s in servers])
+        stack.callback(api.close)
+        yield api
+
+
+def mapping(path, body, method="GET"):
+    return Mapping(
+        name=path,
+        request=Request(method=method, urlPath=path),
+        response=Response(body=body, headers={"Content-Type": "text/plain"}),
+    ).model_dump()
+
+
+class TestShardedWiremockApi:
+    def test_hash_ring_moves_only_keys_of_removed_node(self):
+        keys = [f"GET /path/{i}" for i in range(1000)]
+        ring = HashRing(["a", "b", "c"])
+        smaller_ring = HashRing(["a", "b"])
+        owners = {key: ring.node(key) for key in keys}
+
+        assert_that(set(owners.values())).is_equal_to({"a", "b", "c"})
+        for key, owner in owners.items():
+            if owner != "c":
+                assert_that(smaller_ring.node(key)).is_equal_to(owner)
+
+    def test_routing(self, sharded_api):
+        sharded_api.import_mappings(
+            [mapping(f"/shard/{i}", f"body {i}") for i in range(30)]
+        )
+        ids = [
+            sharded_api.post_mapping(mapping(f"/post/{i}", "post")) for i in range(3)
+        ]
+        regex_id = sharded_api.post_mapping(
+            {
+                "request": {"method": "GET", "urlPattern": "/regex/.*"},
+                "response": {"body": "regex"},
+            }
+        )
+
+        per_shard = [
+            len(api.get_mappings()["mappings"]) for api in sharded_api.shards.values()
+        ]
+        assert_that(min(per_shard)).is_greater_than(1)
+        assert_that(sharded_api.get_mappings()["meta"]["total"]).is_equal_to(34)
+        assert_that(sharded_api.get_mapping(regex_id)["id"]).is_equal_to(regex_id)
+
+        with sharded_api.http_helper(protocol=HTTPHelper.HTTP) as http:
+            for i in range(30):
+                assert_that(http.get(f"/shard/{i}")).is_equal_to(f"body {i}".encode())
+            assert_that(http.get("/regex/a")).is_equal_to(b"regex")
+
+            sharded_api.put_mapping(ids[0], mapping("/moved", "moved"))
+            assert_that(http.get("/moved")).is_equal_to(b"moved")
+            assert_that(sharded_api.get_mappings()["meta"]["total"]).is_equal_to(34)
+            assert_that(
+                sharded_api.count_requests({"urlPathPattern": "/shard/.*"})
+            ).is_equal_to(30)
+
+        sharded_api.delete_mapping(ids[1])
+        sharded_api.delete_all_mappings()
+        assert_that(sharded_api.get_mappings()["mappings"]).is_empty()
+
+    def test_put_mapping_moves_mapping_between_shards(self, sharded_api):
+        id = sharded_api.post_mapping(mapping("/before", "before"))
+        (old_owner,) = sharded_api.shards_for(mapping("/before", "before"))
+        # Path which is routed to another shard
+        path = next(
+            f"/after/{i}"
+            for i in range(100)
+            if sharded_api.shards_for(mapping(f"/after/{i}", "after")) != [old_owner]
+        )
+        (new_owner,) = sharded_api.shards_for(mapping(path, "after"))
+
+        sharded_api.put_mapping(id, mapping(path, "after"))
+
+        holders = [
+            endpoint
+            for endpoint, api in sharded_api.shards.items()
+            if any(m["id"] == id for m in api.get_mappings()["mappings"])
+        ]
+        assert_that(holders).is_equal_to([new_owner])
+        assert_that(sharded_api.get_mapping(id)["request"]["urlPath"]).is_equal_to(path)
+        with sharded_api.http_helper(protocol=HTTPHelper.HTTP) as http:
+            assert_that(http.get(path)).is_equal_to(b"after")
+
+    def test_put_unknown_mapping(self, sharded_api):
+        with pytest.raises(HTTPError, match="404"):
+            sharded_api.put_mapping(str(uuid.uuid4()), mapping("/unknown", "body"))
+
+    def test_get_unknown_mapping(self, sharded_api):
+        with pytest.raises(HTTPError, match="404"):
+            sharded_api.get_mapping(str(uuid.uuid4()))
@@ -0,0 +1,118 @@
+import hashlib
+import json
+
+import pytest
+from assertpy import assert_that
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.http_helper import HTTPHelper
+from helpers.streamed_response import StreamedResponse, iter_json_items
+
+DOCUMENT = '[1.5, -22, 3e-2, {"a": "x\\\\\\"]}", "b": [true, null]}, "ü€", false, 7]'
+BODY = "".join(f"line {i}\n" for i in range(20_000))  # ~170 KB, several chunks
+
+
+def chunked(data: bytes, size: int) -> list:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.fixture
+def http(stub_server):
+    api = WiremockApi(host=stub_server.host, port=stub_server.port)
+    api.post_mapping(
+        {
+            "request": {"method": "GET", "urlPath": "/large"},
+            "response": {"body": BODY},
+        }
+    )
+    api.post_mapping(
+        {
+            "request": {"method": "GET", "urlPath": "/items"},
+            "response": {
+                "jsonBody": {
+                    "meta": {"total": 3},
+                    "items": [{"id": i} for i in range(3)],
+                }
+            },
+        }
+    )
+    api.close()
+    with HTTPHelper(
+        host=stub_server.host, protocol=HTTPHelper.HTTP, port=stub_server.port
+    ) as http:
+        yield http
+
+
+class TestIterJsonItems:
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+    def test_values_split_across_chunks(self, size):
+        # Numbers, strings with escapes and multibyte chars are split at every position
+        chunks = chunked(DOCUMENT.encode(), size)
+        assert_that(list(iter_json_items(chunks))).is_equal_to(json.loads(DOCUMENT))
+
+    def test_number_at_the_end_of_chunk(self):
+        assert_that(list(iter_json_items([b"[12", b"34.", b"5,6", b"]"]))).is_equal_to(
+            [1234.5, 6]
+        )
+
+    def test_key(self):
+        document = (
+            b'{"meta": {"items": "no", "x": [1]}, "items": [{"id": 1}, 2], "tail": 1}'
+        )
+        assert_that(
+            list(iter_json_items(chunked(document, 5), key="items"))
+        ).is_equal_to([{"id": 1}, 2])
+
+    def test_missing_key(self):
+        with pytest.raises(ValueError, match="no 'items' key"):
+            list(iter_json_items([b'{"meta": {"items": []}}'], key="items"))
+
+    def test_not_array(self):
+        with pytest.raises(ValueError):
+            list(iter_json_items([b'{"a": 1}']))
+
+    def test_truncated_document(self):
+        with pytest.raises(ValueError):
+            list(iter_json_items([b'[{"a": ', b"[1, 2"]))
+
+
+class TestStreamedResponse:
+    def test_stream(self, http):
+        with http.get("/large", stream=True) as response:
+            assert_that(response).is_instance_of(StreamedResponse)
+            assert_that(b"".join(response.iter_content())).is_equal_to(BODY.encode())
+            with pytest.raises(RuntimeError):
+                response.iter_content()
+
+    def test_spool_to_disk(self, http):
+        with http.get("/large", stream=True) as response:
+            spooled_file = response.spool(max_size=1024)
+
+        # Body above max_size is moved from memory to a temporary file
+        assert_that(spooled_file._rolled).is_true()
+        assert_that(spooled_file.read()).is_equal_to(BODY.encode())
+        assert_that(response.size).is_equal_to(len(BODY))
+
+    def test_spool_in_memory(self, http):
+        with http.get("/large", stream=True) as response:
+            spooled_file = response.spool()
+
+        assert_that(spooled_file._rolled).is_false()
+        assert_that(spooled_file.read()).is_equal_to(BODY.encode())
+
+    def test_hexdigest_after_partial_consumption(self, http):
+        with http.get("/large", stream=True) as response:
+            first = next(response.iter_content())
+            assert_that(response.size).is_equal_to(len(first))
+
+            # The rest of the body is read for the hash
+            assert_that(response.hexdigest()).is_equal_to(
+                hashlib.sha256(BODY.encode()).hexdigest()
+            )
+            assert_that(response.size).is_equal_to(len(BODY))
+
+    def test_iter_json_items(self, http):
+        with http.get("/items", stream=True) as response:
+            items = list(response.iter_json_items(key="items"))
+
+        assert_that(items).is_equal_to([{"id": i} for i in range(3)])
@@ -0,0 +1,276 @@
+import socket
+import threading
+import uuid
+
+import pytest
+import requests
+from assertpy import assert_that
+
+from helpers.api.wiremock_api import WiremockApi
+from helpers.delays import FAULTS
+from helpers.http_helper import HTTPHelper
+from helpers.mocker import Mapping, Request, Response
+from helpers.request_matcher import IncomingRequest, match_request
+from helpers.stub_server import StubServer
+
+
+@pytest.fixture
+def api(stub_server):
+    api = WiremockApi(host=stub_server.host, port=stub_server.port)
+    yield api
+    api.close()
+
+
+@pytest.fixture
+def http(stub_server):
+    with HTTPHelper(
+        host=stub_server.host, protocol=HTTPHelper.HTTP, port=stub_server.port
+    ) as http:
+        yield http
+
+
+class TestStubServer:
+    def test_admin_api(self, api):
+        mapping = Mapping(
+            name="admin", request=Request(urlPath="/a"), response=Response(body="a")
+        )
+        mapping_id = api.post_mapping(mapping.model_dump())
+        assert_that(api.get_mapping(mapping_id)["name"]).is_equal_to("admin")
+        assert_that(api.get_mappings()["meta"]["total"]).is_equal_to(1)
+
+        api.put_mapping(mapping_id, {**mapping.model_dump(), "name": "changed"})
+        assert_that(api.get_mapping(mapping_id)["name"]).is_equal_to("changed")
+
+        api.delete_mapping(mapping_id)
+        assert_that(api.get_mappings()["mappings"]).is_empty()
+
+    def test_put_unknown_mapping(self, api):
+        # As WireMock, PUT doesn't create mappings
+        with pytest.raises(requests.HTTPError) as error:
+            api.put_mapping(str(uuid.uuid4()), {"request": {}, "response": {}})
+        assert_that(error.value.response.status_code).is_equal_to(404)
+        assert_that(api.get_mappings()["mappings"]).is_empty()
+
+    @pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+    def test_stop_with_keep_alive_connections(self):
+        server = StubServer().start()
+        apis = [WiremockApi(host=server.host, port=server.port) for _ in range(3)]
+        for api in apis:
+            api.get_mappings()  # Pooled connection stays open
+
+        stopping = threading.Thread(target=server.stop)
+        stopping.start()
+        stopping.join(timeout=5)
+
+        assert_that(stopping.is_alive()).is_false()
+        assert_that(server._connections).is_empty()
+        assert_that(server._loop.is_closed()).is_true()
+        for api in apis:
+            api.close()
+
+    @pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+    @pytest.mark.parametrize(
+        "raw_request",
+        [
+            b"GARBAGE\r\n\r\n",
+            b"POST /a HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n",
+            b"POST /a HTTP/1.1\r\nContent-Length: x\r\n\r\n",
+        ],
+    )
+    def test_bad_request(self, stub_server, raw_request):
+        with socket.create_connection(
+            (stub_server.host, stub_server.port), timeout=5
+        ) as sock:
+            sock.sendall(raw_request)
+            response = sock.makefile("rb").read().decode("latin-1")
+
+        assert_that(response).starts_with("HTTP/1.1 400 Bad Request\r\n")
+        assert_that(response).contains("Connection: close")
+
+    def test_chunked_request(self, stub_server):
+        with socket.create_connection(
+            (stub_server.host, stub_server.port), timeout=5
+        ) as sock:
+            sock.sendall(
+                b"POST /__admin/mappings HTTP/1.1\r\nTransfer-Encoding: chunked\r\n"
+                b"Connection: close\r\n\r\n"
+                b'3\r\n{"r\r\n1c\r\nequest": {"urlPath": "/ch"}}\r\n0\r\n\r\n'
+            )
+            response = sock.makefile("rb").read().decode("latin-1")
+
+        assert_that(response).starts_with("HTTP/1.1 201")
+        assert_that(stub_server.mappings.all()[0]["request"]).is_equal_to(
+            {"urlPath": "/ch"}
+        )
+
+    def test_newest_mapping_wins(self, api, http):
+        for body in ["first", "second"]:
+            api.post_mapping(
+                {
+                    "request": {"method": "GET", "urlPath": "/same"},
+                    "response": {"body": body},
+                }
+            )
+        assert_that(http.get("/same")).is_equal_to(b"second")
+
+    def test_not_matched(self, http):
+        data = http.get("/unknown", expected_error="404")
+        assert_that(data).is_none()
+
+    def test_delays(self, api, http):
+        response = Response(
+            body="delayed",
+            fixedDelayMilliseconds=10,
+            delayDistribution={"type": "lognormal", "median": 20, "sigma": 0.3},
+        )
+        api.post_mapping(
+            Mapping(
+                name="delayed",
+                request=Request(urlPath="/delayed", method="GET"),
+                response=response,
+            ).model_dump()
+        )
+        ttfb = http.measure_delays("GET", "/delayed", count=30)["ttfb"]
+
+        assert_that(ttfb.count).is_equal_to(30)
+        assert_that(ttfb.percentile(50)).is_between(
+            response.delay_percentile(1), response.delay_percentile(99) + 0.05
+        )
+
+    def test_chunked_dribble_delay(self, api, http):
+        response = Response(
+            body="dribbled",
+            chunkedDribbleDelay={"numberOfChunks": 4, "totalDuration": 200},
+        )
+        api.post_mapping(
+            Mapping(
+                name="dribble",
+                request=Request(urlPath="/dribble", method="GET"),
+                response=response,
+            ).model_dump()
+        )
+        delays = http.measure_delays("GET", "/dribble", count=1)
+
+        assert_that(delays["total"].max).is_greater_than_or_equal_to(0.15)
+
+    @pytest.mark.parametrize("fault", FAULTS)
+    def test_fault(self, api, http, fault):
+        api.post_mapping(
+            Mapping(
+                name=fault,
+                request=Request(urlPath="/fault", method="GET"),
+                response=Response(fault=fault),
+            ).model_dump()
+        )
+        assert_that(http.get).raises(requests.RequestException).when_called_with(
+            "/fault"
+        )
+
+    def test_request_journal(self, api, http):
+        api.post_mapping(
+            {"request": {"method": "GET", "urlPath": "/journal"}, "response": {}}
+        )
+        cursor = api.journal_cursor()
+        for i in range(5):
+            http.get(f"/journal?i={i}")
+        http.get("/unknown", expected_error="404")
+
+        assert_that(api.get_requests(limit=2)["requests"]).is_length(2)
+        entries = list(api.iter_requests())
+        assert_that([e["request"]["url"] for e in entries]).is_equal_to(
+            ["/unknown"] + [f"/journal?i={i}" for i in reversed(range(5))]
+        )
+        assert_that(api.get_request(entries[0]["id"])["wasMatched"]).is_false()
+        assert_that(api.count_requests({"urlPath": "/journal"})).is_equal_to(5)
+        found = api.find_requests(
+            {"urlPath": "/journal", "queryParameters": {"i": {"equalTo": "3"}}}
+        )
+        assert_that([r["url"] for r in found]).is_equal_to(["/journal?i=3"])
+
+        # Stopped poll doesn't move the cursor
+        assert_that(next(cursor.poll())["id"]).is_equal_to(entries[0]["id"])
+        assert_that(list(cursor.poll())).is_equal_to(entries)
+        assert_that(list(cursor.poll())).is_empty()
+        http.get("/journal?i=5")
+        http.get("/journal?i=6")
+        assert_that([e["request"]["url"] for e in cursor.poll()]).is_equal_to(
+            ["/journal?i=6", "/journal?i=5"]
+        )
+
+        api.delete_all_requests()
+        assert_that(api.get_requests()["requests"]).is_empty()
+
+    def test_mappings_cache(self, stub_server, api):
+        cached_api = WiremockApi(
+            host=stub_server.host, port=stub_server.port, cache_ttl=60
+        )
+        mapping = {"request": {"urlPath": "/cached"}, "response": {"body": "a"}}
+        mapping_id = cached_api.post_mapping(mapping)
+
+        for _ in range(3):
+            assert_that(cached_api.get_mappings()["mappings"]).is_length(1)
+        assert_that(cached_api.get_mapping(mapping_id)["id"]).is_equal_to(mapping_id)
+        assert_that(cached_api.cache_stats.as_dict()).contains_entry(
+            {"hits": 3}, {"misses": 1}
+        )
+
+        cached_api.put_mapping(mapping_id, {**mapping, "name": "changed"})
+        assert_that(cached_api.get_mapping(mapping_id)["name"]).is_equal_to("changed")
+        cached_api.get_mappings()
+        # Changes of other clients are seen after TTL only
+        api.delete_all_mappings()
+        assert_that(cached_api.get_mappings()["mappings"]).is_length(1)
+        cached_api.delete_all_mappings()
+        assert_that(cached_api.get_mappings()["mappings"]).is_empty()
+        cached_api.close()
+
+    @pytest.mark.parametrize(
+        "request_pattern, incoming_request, expected",
+        [
+            (
+                {"urlPattern": "/items/[0-9]+"},
+                IncomingRequest("GET", "/items/12"),
+                True,
+            ),
+            (
+                {"urlPattern": "/items/[0-9]+"},
+                IncomingRequest("GET", "/items/x"),
+                False,
+            ),
+            ({"url": "/a?b=1"}, IncomingRequest("GET", "/a?b=1"), True),
+            (
+                {"queryParameters": {"b": {"absent": True}}},
+                IncomingRequest("GET", "/a?b=1"),
+                False,
+            ),
+            (
+                {"headers": {"X-Test": {"contains": "val"}}},
+                IncomingRequest("GET", "/", headers={"x-test": "my value"}),
+                True,
+            ),
+            (
+                {"cookies": {"session": {"equalTo": "1"}}},
+                IncomingRequest("GET", "/", headers={"Cookie": "session=1"}),
+                True,
+            ),
+            (
+                {"method": "POST", "bodyPatterns": [{"matches": ".*apple.*"}]},
+                IncomingRequest("POST", "/", body="green apple"),
+                True,
+            ),
+            (
+                {
+                    "bodyPatterns": [
+                        {"equalToJson": {"a": [1, 2]}, "ignoreArrayOrder": True}
+                    ]
+                },
+                IncomingRequest("POST", "/", body='{"a": [2, 1]}'),
+                True,
+            ),
+            ({"method": "GET"}, IncomingRequest("POST", "/"), False),
+        ],
+    )
+    def test_request_matching(self, request_pattern, incoming_request, expected):
+        assert_that(match_request(request_pattern, incoming_request)).is_equal_to(
+            expected
+        )
@@ -1,10 +1,11 @@
 import json
 import logging
 
-from assertpy import assert_that
+import pytest
 from pytest_cases import case, parametrize_with_cases
 
 from helpers.http_helper import HTTPHelper
+from helpers.json_diff import assert_json_equal
 from helpers.mocker import Mapping, Mocker, Request, Response
 from tests.conftest import log_info_blue, log_info_magenta
 
@@ -123,7 +124,10 @@ class RequestMatchingCases:
 
 
 class ResponseTemplatingCases:
-    @case(id="ResponseTemplatingCases [stub] request model")
+    @case(
+        id="ResponseTemplatingCases [stub] request model",
+        marks=pytest.mark.requires_wiremock,
+    )
     def case_request_model(self):
         mapping = Mapping(
             name="[stub] request model",
@@ -166,7 +170,10 @@ class ResponseTemplatingCases:
         }
         return mapping, check_request, expected_response
 
-    @case(id="ResponseTemplatingCases [stub] helpers math & vars")
+    @case(
+        id="ResponseTemplatingCases [stub] helpers math & vars",
+        marks=pytest.mark.requires_wiremock,
+    )
     def case_helpers_math_vars(self):
         mapping = Mapping(
             name="[stub] helpers math & vars",
@@ -194,7 +201,10 @@ class ResponseTemplatingCases:
         }
         return mapping, check_request, expected_response_start
 
-    @case(id="ResponseTemplatingCases [stub] helpers strings")
+    @case(
+        id="ResponseTemplatingCases [stub] helpers strings",
+        marks=pytest.mark.requires_wiremock,
+    )
     def case_helpers_strings(self):
         mapping = Mapping(
             name="[stub] helpers strings",
@@ -232,7 +242,10 @@ class ResponseTemplatingCases:
         }
         return mapping, check_request, expected_response
 
-    @case(id="ResponseTemplatingCases [stub] helpers conditions")
+    @case(
+        id="ResponseTemplatingCases [stub] helpers conditions",
+        marks=pytest.mark.requires_wiremock,
+    )
     def case_helpers_conditions(self):
         mapping = Mapping(
             name="[stub] helpers conditions",
@@ -268,19 +281,31 @@ class ResponseTemplatingCases:
 
 
 class TestMocking:
+    @pytest.mark.preload_stubs
     @parametrize_with_cases(
         "case", cases=[StubbingCases, RequestMatchingCases, ResponseTemplatingCases]
     )
-    def test_mocking(self, mocker: Mocker, http: HTTPHelper, case, current_cases):
+    def test_mocking(
+        self,
+        mocker: Mocker,
+        http: HTTPHelper,
+        preloaded_stubs: set,
+        request,
+        case,
+        current_cases,
+    ):
         mapping, check_request, expected_response = case
         log_info_magenta(f"Test title: {current_cases['case'].id}")
 
-        log_info_blue("1. Create stub")
         log.info(f"\nMapping: {mapping.model_dump_json(indent=2, exclude_none=True)}")
-        mocker.create_mapping(mapping)
+        if request.node.nodeid in preloaded_stubs:
+            log_info_blue("1. Stub was preloaded")
+        else:
+            log_info_blue("1. Create stub")
+            mocker.create_mapping(mapping)
 
         log_info_blue("2. Check stub")
         log.info(f"\nRequest: {json.dumps(check_request, indent=2, allow_nan=False)}")
         log.info(f"\nExpected response: {expected_response}")
         data = http.requester(**check_request)
-        assert_that(data).is_equal_to(expected_response)
+        assert_json_equal(data, expected_response)